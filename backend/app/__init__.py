@@ -68,62 +68,60 @@ def stop_background_sync():
         _sync_thread = None
 
 
-def _run_migrations(database):
-    """Add missing columns to existing tables (safe to run multiple times)."""
-    migrations = {
-        'pesajes': [
-            ('peso_unitario_teorico', 'FLOAT'),
-            ('operador', 'VARCHAR(100)'),
-            ('color', 'VARCHAR(50)'),
-            ('pieza_sku', 'VARCHAR(50)'),
-            ('pieza_nombre', 'VARCHAR(100)'),
-            ('sticker_impreso', 'BOOLEAN DEFAULT 0'),
-            ('fecha_impresion', 'DATETIME'),
-            ('sincronizado', 'BOOLEAN DEFAULT 0'),
-            ('fecha_sincronizacion', 'DATETIME'),
-            ('qr_data_original', 'VARCHAR(500)'),
-            ('deleted_at', 'DATETIME'),
-        ],
-        'correlativo_cache': [
-            ('maquina', 'VARCHAR(50)'),
-            ('turno', 'VARCHAR(20)'),
-            ('fecha_ot', 'VARCHAR(20)'),
-            ('operador', 'VARCHAR(100)'),
-            ('color', 'VARCHAR(50)'),
-        ],
-    }
-    for table, columns in migrations.items():
-        for col_name, col_type in columns:
-            try:
-                database.session.execute(
-                    database.text(f'ALTER TABLE {table} ADD COLUMN {col_name} {col_type}')
-                )
-            except Exception:
-                pass  # Column already exists
-    database.session.commit()
-
-
-def create_app():
+def create_app(config_overrides=None):
+    """
+    Crea la app.
+    
+    Args:
+        config_overrides: valores que reemplazan a Config antes de inicializar
+            las extensiones (p. ej. SQLALCHEMY_DATABASE_URI en tests)
+    """
     app = Flask(__name__)
     
     # Load config
     app.config.from_object('app.config.Config')
+    if config_overrides:
+        app.config.update(config_overrides)
+    
+    # JSON: orjson si está instalado (fechas en ISO 8601 sin isoformat() por fila)
+    from app.utils.json_provider import AppJSONProvider, SocketJSON
+    app.json = AppJSONProvider(app)
+    
+    # Perfil SQLite: pool + PRAGMAs (WAL, synchronous, cache, mmap, busy_timeout)
+    from app.utils import sqlite_profile
+    sqlite_tuning = (app.config.get('SQLITE_TUNING_ENABLED', True)
+                     and sqlite_profile.is_sqlite(app.config['SQLALCHEMY_DATABASE_URI']))
+    if sqlite_tuning:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **sqlite_profile.engine_options(app.config),
+            **app.config.get('SQLALCHEMY_ENGINE_OPTIONS', {}),
+        }
     
     # Initialize extensions
     db.init_app(app)
+    # Versión de datos por tabla (ETag en rutas de lectura)
+    from app.utils import data_version
+    data_version.install()
+    if sqlite_tuning:
+        with app.app_context():
+            sqlite_profile.install(db.engine, app.config)
     # Configure CORS - Permissive for dev
     CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=True)
-    # Initialize SocketIO
-    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading')
-    
-    # Register blueprints
+    # Importar las rutas antes de init_app: los @socketio.on de balanza quedan en
+    # socketio.handlers y se registran en el servidor de cada app (no solo la primera)
     from app.routes.pesajes import pesajes_bp
     from app.routes.balanza import balanza_bp
     from app.routes.sync import sync_bp
     from app.routes.orden_trabajo import orden_trabajo_bp
     from app.routes.avance import avance_bp
     from app.routes.ops import ops_bp
+    # Initialize SocketIO
+    socketio.init_app(app, cors_allowed_origins="*", async_mode='threading', json=SocketJSON)
+    # Compresión gzip / brotli de respuestas JSON grandes
+    from app.utils import compression
+    compression.install(app)
     
+    # Register blueprints
     app.register_blueprint(pesajes_bp, url_prefix='/api/pesajes')
     app.register_blueprint(balanza_bp, url_prefix='/api/balanza')
     app.register_blueprint(sync_bp)
@@ -131,11 +129,10 @@ def create_app():
     app.register_blueprint(avance_bp, url_prefix='/api/avance')
     app.register_blueprint(ops_bp, url_prefix='/api/ops')
     
-    # Create tables
+    # Create tables / aplicar migraciones pendientes (app/migrations.py)
     with app.app_context():
-        db.create_all()
-        # Migrate: add new columns to correlativo_cache if they don't exist
-        _run_migrations(db)
+        from app.migrations import run_migrations
+        run_migrations(db)
     
     # Start background sync (solo si está habilitado)
     if app.config.get('SYNC_ENABLED', True):
@@ -17,10 +17,53 @@ class Config:
         'sqlite:///pesajes.db'
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Perfil SQLite (solo aplica si la URI es sqlite://)
+    SQLITE_TUNING_ENABLED = os.getenv('SQLITE_TUNING_ENABLED', 'true').lower() == 'true'
+    SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')  # NORMAL es seguro con WAL
+    SQLITE_CACHE_SIZE_KB = int(os.getenv('SQLITE_CACHE_SIZE_KB', '20000'))
+    SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))  # Bytes
+    SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+    SQLITE_POOL_SIZE = int(os.getenv('SQLITE_POOL_SIZE', '10'))
+    SQLITE_POOL_MAX_OVERFLOW = int(os.getenv('SQLITE_POOL_MAX_OVERFLOW', '20'))
+    PESAJES_TOTAL_CACHE_SECONDS = float(os.getenv('PESAJES_TOTAL_CACHE_SECONDS', '10'))  # Cache de totales (incluir_total=1)
+    PESAJES_BATCH_MAX = int(os.getenv('PESAJES_BATCH_MAX', '5000'))  # Items por POST /api/pesajes/batch
+    PESAJES_PER_PAGE_MAX = int(os.getenv('PESAJES_PER_PAGE_MAX', '200'))  # Tope de ?per_page en listados
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'  # gzip / brotli en respuestas JSON
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', '1024'))  # No comprimir respuestas más chicas
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))  # 1-9
+    COMPRESSION_BROTLI_ENABLED = os.getenv('COMPRESSION_BROTLI_ENABLED', 'true').lower() == 'true'  # Requiere el paquete brotli
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))  # 0-11
+    EXPORT_JOBS_DIR = os.getenv('EXPORT_JOBS_DIR', '')  # Vacío = <tmp>/pesajes_exports
+    EXPORT_JOBS_WORKERS = int(os.getenv('EXPORT_JOBS_WORKERS', '2'))
+    EXPORT_JOBS_TTL_SECONDS = float(os.getenv('EXPORT_JOBS_TTL_SECONDS', '3600'))  # Vida de los archivos terminados
     
     # Scale (Balanza)
     SCALE_PORT = os.getenv('SCALE_PORT', 'COM4')
+    # Varias estaciones: "linea1=COM4,linea2=COM5@19200" (vacío = una estación 'default' en SCALE_PORT)
+    SCALE_STATIONS = os.getenv('SCALE_STATIONS', '')
     SCALE_BAUD_RATE = int(os.getenv('SCALE_BAUD_RATE', '9600'))
+    # Reconexión: primer reintento rápido con jitter, luego backoff exponencial hasta el máximo (segundos)
+    SCALE_RECONNECT_FIRST = float(os.getenv('SCALE_RECONNECT_FIRST', '0.25'))
+    SCALE_RECONNECT_BASE = float(os.getenv('SCALE_RECONNECT_BASE', '1'))
+    SCALE_RECONNECT_MAX = float(os.getenv('SCALE_RECONNECT_MAX', '30'))
+    # Identidad USB del adaptador (hex) para encontrarlo si cambia de puerto; vacío = se aprende al conectar
+    SCALE_USB_VID = os.getenv('SCALE_USB_VID', '')
+    SCALE_USB_PID = os.getenv('SCALE_USB_PID', '')
+    SCALE_USB_SERIAL = os.getenv('SCALE_USB_SERIAL', '')
+    SCALE_READ_MODE = os.getenv('SCALE_READ_MODE', 'blocking')  # blocking, polling (legacy)
+    SCALE_READ_TIMEOUT = float(os.getenv('SCALE_READ_TIMEOUT', '0.5'))  # Segundos (modo blocking)
+    SCALE_POLL_INTERVAL = float(os.getenv('SCALE_POLL_INTERVAL', '0.1'))  # Segundos (modo polling)
+    SCALE_PROTOCOL = os.getenv('SCALE_PROTOCOL', 'auto')  # auto, cascade, net_ticket, gn_prefixed, bare_number...
+    SCALE_DETECT_SAMPLES = int(os.getenv('SCALE_DETECT_SAMPLES', '10'))  # Líneas muestreadas para detectar protocolo
+    SCALE_DETECT_MAX_FAILURES = int(os.getenv('SCALE_DETECT_MAX_FAILURES', '5'))  # Fallos seguidos para re-detectar
+    SCALE_STABLE_WINDOW = int(os.getenv('SCALE_STABLE_WINDOW', '5'))  # Lecturas evaluadas para peso estable
+    SCALE_STABLE_TOLERANCE = float(os.getenv('SCALE_STABLE_TOLERANCE', '0.02'))  # kg
+    SCALE_STABLE_MIN_DWELL = float(os.getenv('SCALE_STABLE_MIN_DWELL', '0.5'))  # Segundos dentro de tolerancia
+    SCALE_EMIT_MAX_HZ = float(os.getenv('SCALE_EMIT_MAX_HZ', '10'))  # Máx. emisiones 'peso' por segundo
+    AUTO_CAPTURE_MIN_KG = float(os.getenv('AUTO_CAPTURE_MIN_KG', '1.0'))  # Peso mínimo para auto-captura
+    SCALE_CAPTURE_ENABLED = os.getenv('SCALE_CAPTURE_ENABLED', 'false').lower() == 'true'  # Captura cruda binaria
+    SCALE_CAPTURE_DIR = os.getenv('SCALE_CAPTURE_DIR', '')  # Vacío = logs/captures
     
     # Printer (Impresora)
     PRINTER_PORT = os.getenv('PRINTER_PORT', 'COM3')
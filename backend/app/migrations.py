@@ -0,0 +1,183 @@
+"""
+Migraciones de esquema versionadas.
+
+Cada migración tiene un número de versión y una lista de pasos. Las versiones
+aplicadas se registran en la tabla `schema_version`; al arrancar solo se
+ejecutan las pendientes, y si el esquema está al día el costo es una sola
+consulta (MAX(version)).
+
+- Base nueva o anterior al versionado (sin `schema_version`): `create_all()`
+  y luego todas las migraciones desde la 1. En una base nueva los pasos de
+  columnas/índices no hacen nada; los objetos que no están en los modelos
+  (índice de búsqueda, triggers) se crean igual.
+
+Los pasos deben ser idempotentes (columnas/índices "si no existen",
+backfills con WHERE) para que una migración interrumpida pueda repetirse.
+Una tabla nueva necesita su paso `create_tables()`: con el esquema al día
+`create_all()` ya no se ejecuta.
+"""
+from typing import Callable, List, Sequence
+from sqlalchemy import inspect, text
+
+from app.services.pesaje_agregados import create_aggregates
+from app.services.search_index import create_search_index
+from app.utils.logger import setup_logger
+
+log = setup_logger('migrations')
+
+
+# --- Pasos -----------------------------------------------------------------
+
+def add_columns(table: str, columns: Sequence[str]) -> Callable:
+    """
+    Agrega columnas del modelo que falten en la tabla.
+    El tipo se compila desde la definición del modelo para el dialecto en uso.
+    """
+    def step(database, engine):
+        existing = {c['name'] for c in inspect(engine).get_columns(table)}
+        model_table = database.metadata.tables[table]
+        with engine.begin() as conn:
+            for name in columns:
+                if name in existing:
+                    continue
+                col_type = model_table.c[name].type.compile(dialect=engine.dialect)
+                conn.execute(text(f'ALTER TABLE {table} ADD COLUMN {name} {col_type}'))
+                log.info(f"Columna agregada: {table}.{name} {col_type}")
+    return step
+
+
+def create_index(name: str, table: str, columns: Sequence[str], where: str = None,
+                 unique: bool = False) -> Callable:
+    """Crea un índice (opcionalmente parcial con `where`) si no existe."""
+    def step(database, engine):
+        sql = (f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} "
+               f"ON {table} ({', '.join(columns)})")
+        if where:
+            sql += f" WHERE {where}"
+        with engine.begin() as conn:
+            conn.execute(text(sql))
+    return step
+
+
+def create_model_indexes(table: str) -> Callable:
+    """Crea los índices declarados en el modelo (__table_args__) que falten."""
+    def step(database, engine):
+        for index in database.metadata.tables[table].indexes:
+            index.create(engine, checkfirst=True)
+    return step
+
+
+def create_tables() -> Callable:
+    """Crea las tablas de los modelos que aún no existan."""
+    def step(database, engine):
+        database.metadata.create_all(engine, checkfirst=True)
+    return step
+
+
+def backfill(table: str, set_sql: str, where: str, params: dict = None,
+             batch_size: int = 1000) -> Callable:
+    """
+    UPDATE por lotes: `UPDATE table SET set_sql WHERE where` de a `batch_size`
+    filas, con un commit por lote para no bloquear a los escritores.
+    `where` debe dejar de cumplirse para las filas ya actualizadas.
+    """
+    def step(database, engine):
+        sql = text(
+            f"UPDATE {table} SET {set_sql} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE {where} LIMIT :_batch)"
+        )
+        total = 0
+        while True:
+            with engine.begin() as conn:
+                count = conn.execute(sql, {**(params or {}), '_batch': batch_size}).rowcount
+            total += count
+            if count < batch_size:
+                break
+        if total:
+            log.info(f"Backfill {table}: {total} filas ({set_sql})")
+    return step
+
+
+# --- Migraciones -----------------------------------------------------------
+# (versión, descripción, pasos). Solo agregar al final; nunca renumerar.
+
+MIGRATIONS: List[tuple] = [
+    (1, 'Columnas agregadas antes del versionado', [
+        create_tables(),
+        add_columns('pesajes', [
+            'peso_unitario_teorico', 'operador', 'color', 'pieza_sku', 'pieza_nombre',
+            'sticker_impreso', 'fecha_impresion', 'sincronizado', 'fecha_sincronizacion',
+            'qr_data_original', 'deleted_at',
+        ]),
+        add_columns('correlativo_cache', ['maquina', 'turno', 'fecha_ot', 'operador', 'color']),
+    ]),
+    (2, 'Booleanos NULL en pesajes (filas previas a las columnas)', [
+        backfill('pesajes', 'sincronizado = :falso', 'sincronizado IS NULL', {'falso': False}),
+        backfill('pesajes', 'sticker_impreso = :falso', 'sticker_impreso IS NULL', {'falso': False}),
+    ]),
+    (3, 'Índices de consultas calientes en pesajes', [
+        create_model_indexes('pesajes'),
+    ]),
+    (4, 'Índice de búsqueda por subcadena (FTS5 trigram / pg_trgm)', [
+        create_search_index,
+    ]),
+    (5, 'Totales por (nro_op, molde, color) mantenidos por triggers', [
+        create_aggregates,
+    ]),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# --- Motor -----------------------------------------------------------------
+
+def current_version(engine):
+    """
+    Versión aplicada, o None si la tabla schema_version no existe.
+    
+    Cualquier otro error de la base (conexión, archivo dañado, bloqueo) se
+    propaga: no debe tomarse como una base nueva.
+    """
+    with engine.connect() as conn:
+        if not inspect(conn).has_table('schema_version'):
+            return None
+        return conn.execute(text('SELECT MAX(version) FROM schema_version')).scalar() or 0
+
+
+def _stamp(engine, versions):
+    from app.models.schema_version import SchemaVersion
+    
+    with engine.begin() as conn:
+        conn.execute(
+            SchemaVersion.__table__.insert(),
+            [{'version': v, 'descripcion': d} for v, d, _ in versions]
+        )
+
+
+def run_migrations(database) -> List[int]:
+    """
+    Aplica las migraciones pendientes (requiere app context).
+    
+    Returns:
+        Versiones aplicadas en esta llamada (vacía si el esquema estaba al día).
+    """
+    engine = database.engine
+    version = current_version(engine)
+    if version is not None and version >= LATEST_VERSION:
+        return []
+    
+    if version is None:
+        database.create_all()
+        version = 0
+    
+    applied = []
+    for number, description, steps in MIGRATIONS:
+        if number <= version:
+            continue
+        log.info(f"Migración {number}: {description}")
+        for step in steps:
+            step(database, engine)
+        _stamp(engine, [(number, description, steps)])
+        applied.append(number)
+    
+    return applied
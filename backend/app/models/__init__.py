@@ -1,5 +1,7 @@
 from app.models.pesaje import Pesaje
 from app.models.molde_cache import MoldePiezasCache
 from app.models.correlativo_cache import CorrelativoCache
+from app.models.schema_version import SchemaVersion
+from app.models.pesaje_agregado import PesajeAgregado
 
-__all__ = ['Pesaje', 'MoldePiezasCache', 'CorrelativoCache']
+__all__ = ['Pesaje', 'MoldePiezasCache', 'CorrelativoCache', 'SchemaVersion', 'PesajeAgregado']
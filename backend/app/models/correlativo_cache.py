@@ -53,9 +53,9 @@ class CorrelativoCache(db.Model):
     def to_dict(self):
         return {
             'correlativo': self.correlativo,
-            'fecha_reserva': self.fecha_reserva.isoformat() if self.fecha_reserva else None,
+            'fecha_reserva': self.fecha_reserva,
             'usado': self.usado,
-            'fecha_uso': self.fecha_uso.isoformat() if self.fecha_uso else None,
+            'fecha_uso': self.fecha_uso,
             'nro_op': self.nro_op,
             'molde': self.molde,
             'maquina': self.maquina,
@@ -64,7 +64,7 @@ class CorrelativoCache(db.Model):
             'operador': self.operador,
             'color': self.color,
             'anulado': self.anulado,
-            'fecha_anulacion': self.fecha_anulacion.isoformat() if self.fecha_anulacion else None,
+            'fecha_anulacion': self.fecha_anulacion,
             'motivo_anulacion': self.motivo_anulacion
         }
     
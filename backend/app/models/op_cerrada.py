@@ -19,7 +19,7 @@ class OpCerrada(db.Model):
             'nro_op': self.nro_op,
             'molde': self.molde,
             'motivo': self.motivo,
-            'fecha_cierre': self.fecha_cierre.isoformat() if self.fecha_cierre else None,
+            'fecha_cierre': self.fecha_cierre,
         }
     
     def __repr__(self):
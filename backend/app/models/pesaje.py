@@ -1,5 +1,7 @@
 from datetime import datetime, timezone, timedelta
+from sqlalchemy import false
 from app import db
+from app.utils.projection import Projection
 
 
 class Pesaje(db.Model):
@@ -49,25 +51,106 @@ class Pesaje(db.Model):
     # Soft delete
     deleted_at = db.Column(db.DateTime, nullable=True, default=None)
     
+    # Índices de las consultas calientes (verificados con EXPLAIN QUERY PLAN en
+    # tests/test_pesaje_indexes.py). En bases existentes los crea la migración 3.
+    __table_args__ = (
+        # Listados/búsqueda/avance/exportación: active() + ORDER BY fecha_hora
+        db.Index('ix_pesajes_activos_fecha', 'deleted_at', 'fecha_hora'),
+        # Pendientes de sync (parcial: solo filas activas sin sincronizar)
+        db.Index(
+            'ix_pesajes_pendientes_sync', 'deleted_at', 'sincronizado', 'fecha_hora',
+            sqlite_where=db.and_(sincronizado == false(), deleted_at.is_(None)),
+            postgresql_where=db.and_(sincronizado == false(), deleted_at.is_(None)),
+        ),
+        # Totales por OP (/api/ops) y exclusión de OPs cerradas
+        db.Index('ix_pesajes_nro_op', 'nro_op', 'deleted_at'),
+    )
+    
     @classmethod
     def active(cls):
         """Retorna query filtrada solo a registros NO eliminados."""
         return cls.query.filter(cls.deleted_at.is_(None))
     
+    @classmethod
+    def pendientes_sync(cls):
+        """
+        Pesajes activos sin sincronizar.
+        Compara con false() literal para que el planner use el índice parcial.
+        """
+        return cls.active().filter(cls.sincronizado == false())
+    
     def soft_delete(self):
         """Marca este pesaje como eliminado (soft delete)."""
         self.deleted_at = datetime.now(timezone(timedelta(hours=-5)))
     
+    @staticmethod
+    def payload_values(data: dict) -> dict:
+        """
+        Convierte el JSON de la API (mismos campos que POST /api/pesajes) en
+        valores de columna. No valida peso_kg: el llamador debe verificar que venga.
+        
+        Raises:
+            ValueError: fecha_hora presente pero no ISO 8601
+        """
+        # Parse fecha_orden_trabajo si viene como string
+        fecha_ot = None
+        if data.get('fecha_orden_trabajo'):
+            try:
+                fecha_ot = datetime.strptime(data['fecha_orden_trabajo'], '%Y-%m-%d').date()
+            except ValueError:
+                pass
+        
+        # Parse peso_unitario_teorico (puede venir como string vacío)
+        peso_unit = None
+        raw_peso_unit = data.get('peso_unitario_teorico')
+        if raw_peso_unit is not None and str(raw_peso_unit).strip() != '':
+            try:
+                peso_unit = float(raw_peso_unit)
+            except (ValueError, TypeError):
+                pass
+        
+        values = {
+            'peso_kg': data['peso_kg'],
+            'molde': data.get('molde'),
+            'maquina': data.get('maquina'),
+            'nro_op': data.get('nro_op'),
+            'turno': data.get('turno'),
+            'fecha_orden_trabajo': fecha_ot,
+            'nro_orden_trabajo': data.get('nro_orden_trabajo'),
+            'peso_unitario_teorico': peso_unit,
+            'operador': data.get('operador'),
+            'color': data.get('color'),
+            'pieza_sku': data.get('pieza_sku'),
+            'pieza_nombre': data.get('pieza_nombre'),
+            'observaciones': data.get('observaciones'),
+            'qr_data_original': data.get('qr_data_original'),
+        }
+        
+        # fecha_hora original (capturas offline); si no viene, default del modelo.
+        # Una fecha ilegible no se reemplaza por now(): el pesaje quedaría con otra hora.
+        if data.get('fecha_hora'):
+            try:
+                values['fecha_hora'] = datetime.fromisoformat(data['fecha_hora'])
+            except (ValueError, TypeError):
+                raise ValueError('fecha_hora inválida')
+        
+        return values
+    
+    @classmethod
+    def from_payload(cls, data: dict) -> 'Pesaje':
+        """Construye un Pesaje desde el JSON de la API (ver payload_values)."""
+        return cls(**cls.payload_values(data))
+    
     def to_dict(self):
         return {
             'id': self.id,
             'peso_kg': self.peso_kg,
-            'fecha_hora': self.fecha_hora.isoformat() if self.fecha_hora else None,
+            'fecha_hora': self.fecha_hora,
             'molde': self.molde,
             'maquina': self.maquina,
             'nro_op': self.nro_op,
             'turno': self.turno,
-            'fecha_orden_trabajo': self.fecha_orden_trabajo.isoformat() if self.fecha_orden_trabajo else None,
+            'fecha_orden_trabajo': self.fecha_orden_trabajo,
             'nro_orden_trabajo': self.nro_orden_trabajo,
             'peso_unitario_teorico': self.peso_unitario_teorico,
             'operador': self.operador,
@@ -76,11 +159,11 @@ class Pesaje(db.Model):
             'pieza_nombre': self.pieza_nombre,
             'observaciones': self.observaciones,
             'sticker_impreso': self.sticker_impreso,
-            'fecha_impresion': self.fecha_impresion.isoformat() if self.fecha_impresion else None,
+            'fecha_impresion': self.fecha_impresion,
             'sincronizado': self.sincronizado,
-            'fecha_sincronizacion': self.fecha_sincronizacion.isoformat() if self.fecha_sincronizacion else None,
+            'fecha_sincronizacion': self.fecha_sincronizacion,
             'qr_data_original': self.qr_data_original,
-            'deleted_at': self.deleted_at.isoformat() if self.deleted_at else None,
+            'deleted_at': self.deleted_at,
         }
     
     @staticmethod
@@ -185,3 +268,24 @@ class Pesaje(db.Model):
     
     def __repr__(self):
         return f'<Pesaje {self.id}: {self.peso_kg}kg - {self.molde}>'
+
+
+# --- Proyecciones de lectura (app/utils/projection.py) ----------------------
+
+# Mismas claves y formato que Pesaje.to_dict()
+PESAJE_COMPLETO = Projection([
+    Pesaje.id, Pesaje.peso_kg, Pesaje.fecha_hora, Pesaje.molde, Pesaje.maquina,
+    Pesaje.nro_op, Pesaje.turno, Pesaje.fecha_orden_trabajo, Pesaje.nro_orden_trabajo,
+    Pesaje.peso_unitario_teorico, Pesaje.operador, Pesaje.color, Pesaje.pieza_sku,
+    Pesaje.pieza_nombre, Pesaje.observaciones, Pesaje.sticker_impreso,
+    Pesaje.fecha_impresion, Pesaje.sincronizado, Pesaje.fecha_sincronizacion,
+    Pesaje.qr_data_original, Pesaje.deleted_at,
+])
+
+# Columnas que muestran los listados de la UI (Gestión de Pesajes, últimos pesajes)
+PESAJE_LISTADO = Projection([
+    Pesaje.id, Pesaje.fecha_hora, Pesaje.peso_kg, Pesaje.nro_op, Pesaje.molde,
+    Pesaje.nro_orden_trabajo, Pesaje.color, Pesaje.operador, Pesaje.pieza_sku,
+    Pesaje.pieza_nombre, Pesaje.turno, Pesaje.maquina, Pesaje.sticker_impreso,
+    Pesaje.sincronizado,
+])
@@ -0,0 +1,23 @@
+from app import db
+
+
+class PesajeAgregado(db.Model):
+    """
+    Totales de pesajes activos por (nro_op, molde, color).
+    
+    Mantenida por triggers sobre `pesajes` en la misma transacción que cada
+    INSERT / UPDATE / DELETE (ver app/services/pesaje_agregados.py). Las
+    claves NULL se guardan como '' para que la clave primaria las agrupe.
+    """
+    
+    __tablename__ = 'pesajes_agregados'
+    
+    nro_op = db.Column(db.String(20), primary_key=True, default='')
+    molde = db.Column(db.String(100), primary_key=True, default='')
+    color = db.Column(db.String(100), primary_key=True, default='')
+    total_kg = db.Column(db.Float, nullable=False, default=0.0)
+    total_bolsas = db.Column(db.Integer, nullable=False, default=0)
+    ultimo_pesaje = db.Column(db.DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f'<PesajeAgregado {self.nro_op}/{self.molde}/{self.color}: {self.total_bolsas}>'
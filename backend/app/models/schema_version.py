@@ -0,0 +1,15 @@
+from datetime import datetime, timezone, timedelta
+from app import db
+
+
+class SchemaVersion(db.Model):
+    """Migraciones de esquema aplicadas (ver app/migrations.py)."""
+    
+    __tablename__ = 'schema_version'
+    
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    descripcion = db.Column(db.String(200), nullable=True)
+    aplicada_en = db.Column(db.DateTime, default=lambda: datetime.now(timezone(timedelta(hours=-5))), nullable=False)
+    
+    def __repr__(self):
+        return f'<SchemaVersion {self.version}>'
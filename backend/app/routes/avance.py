@@ -1,42 +1,60 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from sqlalchemy import func
 from app import db
 from app.models.pesaje import Pesaje
+from app.models.pesaje_agregado import PesajeAgregado
 from app.models.op_cerrada import OpCerrada
 from app.utils.logger import get_pesaje_logger
+from app.utils.projection import Projection
+from app.utils.data_version import etag_por_version
 
 log = get_pesaje_logger()
 
 avance_bp = Blueprint('avance', __name__)
 
+# Detalle de cada pesaje dentro de un grupo molde → color
+_PESAJE_AVANCE = Projection([
+    Pesaje.id, Pesaje.peso_kg, Pesaje.fecha_hora, Pesaje.nro_op, Pesaje.nro_orden_trabajo,
+])
+
+
+def _filtro_ops_abiertas(columna_op):
+    """Excluye las OPs cerradas (los pesajes sin OP siempre cuentan)."""
+    cerradas = db.select(OpCerrada.nro_op)
+    return db.or_(columna_op.is_(None), columna_op == '', columna_op.notin_(cerradas))
+
+
 @avance_bp.route('/resumen', methods=['GET'])
+@etag_por_version('pesajes', 'ops_cerradas')
 def resumen_avance():
     """
-    Retorna pesajes agrupados por molde → color (dos niveles).
+    Retorna totales agrupados por molde → color (dos niveles).
     Excluye pesajes de OPs cerradas.
+    
+    Lee pesajes_agregados (una fila por OP / molde / color). El detalle de
+    cada grupo se pide aparte (/api/avance/pesajes); ?detalle=1 lo incluye
+    en cada color como antes.
     """
-    # Obtener OPs cerradas para excluirlas
-    ops_cerradas = db.session.query(OpCerrada.nro_op).all()
-    ops_cerradas_set = {op.nro_op for op in ops_cerradas}
+    filas = db.session.query(
+        PesajeAgregado.molde,
+        PesajeAgregado.color,
+        func.sum(PesajeAgregado.total_kg).label('total_kg'),
+        func.sum(PesajeAgregado.total_bolsas).label('total_bolsas'),
+    ).filter(
+        _filtro_ops_abiertas(PesajeAgregado.nro_op)
+    ).group_by(PesajeAgregado.molde, PesajeAgregado.color).all()
     
-    query = Pesaje.active().order_by(Pesaje.fecha_hora.desc())
-    if ops_cerradas_set:
-        query = query.filter(
-            db.or_(
-                Pesaje.nro_op.is_(None),
-                Pesaje.nro_op == '',
-                Pesaje.nro_op.notin_(ops_cerradas_set)
-            )
-        )
-    pesajes = query.all()
+    detalle = request.args.get('detalle', '').lower() in ('1', 'true')
+    pesajes_por_grupo = _pesajes_por_grupo() if detalle else None
     
-    # Agrupar: molde → color → pesajes
+    # Agrupar: molde → color
     moldes_dict = {}
     total_global_kg = 0.0
     total_registros = 0
     
-    for p in pesajes:
-        molde = p.molde or 'SIN MOLDE'
-        color = p.color or 'SIN COLOR'
+    for fila in filas:
+        molde = fila.molde or 'SIN MOLDE'
+        color = fila.color or 'SIN COLOR'
         
         if molde not in moldes_dict:
             moldes_dict[molde] = {
@@ -53,25 +71,16 @@ def resumen_avance():
                 'color': color,
                 'total_kg': 0.0,
                 'total_bolsas': 0,
-                'pesajes': []
             }
         
-        peso = p.peso_kg if p.peso_kg else 0.0
         color_group = molde_group['colores_dict'][color]
-        color_group['total_kg'] += peso
-        color_group['total_bolsas'] += 1
-        color_group['pesajes'].append({
-            'id': p.id,
-            'peso_kg': p.peso_kg,
-            'fecha_hora': p.fecha_hora.isoformat() if p.fecha_hora else None,
-            'nro_op': p.nro_op,
-            'nro_orden_trabajo': p.nro_orden_trabajo,
-        })
+        color_group['total_kg'] += fila.total_kg
+        color_group['total_bolsas'] += fila.total_bolsas
         
-        molde_group['total_kg'] += peso
-        molde_group['total_bolsas'] += 1
-        total_global_kg += peso
-        total_registros += 1
+        molde_group['total_kg'] += fila.total_kg
+        molde_group['total_bolsas'] += fila.total_bolsas
+        total_global_kg += fila.total_kg
+        total_registros += fila.total_bolsas
     
     # Convertir a listas, redondear y ordenar
     grupos_por_molde = []
@@ -79,6 +88,8 @@ def resumen_avance():
         colores = list(molde_group.pop('colores_dict').values())
         for c in colores:
             c['total_kg'] = round(c['total_kg'], 2)
+            if detalle:
+                c['pesajes'] = pesajes_por_grupo.get((molde_group['molde'], c['color']), [])
         colores.sort(key=lambda x: x['total_kg'], reverse=True)
         molde_group['colores'] = colores
         molde_group['total_kg'] = round(molde_group['total_kg'], 2)
@@ -91,3 +102,53 @@ def resumen_avance():
         'total_global_kg': round(total_global_kg, 2),
         'total_registros': total_registros
     })
+
+
+@avance_bp.route('/pesajes', methods=['GET'])
+@etag_por_version('pesajes', 'ops_cerradas')
+def pesajes_grupo():
+    """
+    Pesajes de un grupo molde → color del avance (más reciente primero).
+    Query params: molde, color (los nombres que devuelve /resumen).
+    """
+    molde = request.args.get('molde', '')
+    color = request.args.get('color', '')
+    if not molde or not color:
+        return jsonify({'error': 'molde y color son requeridos'}), 400
+    return jsonify(_pesajes_grupo(molde, color))
+
+
+def _coincide(columna, valor: str, vacio: str):
+    """`columna == valor`; el nombre de grupo vacío (SIN MOLDE / SIN COLOR) incluye NULL y ''."""
+    if valor == vacio:
+        return db.or_(columna.is_(None), columna == '', columna == vacio)
+    return columna == valor
+
+
+def _pesajes_grupo(molde: str, color: str) -> list:
+    query = Pesaje.active().filter(
+        _coincide(Pesaje.molde, molde, 'SIN MOLDE'),
+        _coincide(Pesaje.color, color, 'SIN COLOR'),
+        _filtro_ops_abiertas(Pesaje.nro_op),
+    ).order_by(Pesaje.fecha_hora.desc())
+    return _PESAJE_AVANCE.all(db.session, query)
+
+
+def _pesajes_por_grupo() -> dict:
+    """
+    Detalle de todos los grupos en una sola consulta (?detalle=1 de /resumen).
+    
+    Returns:
+        {(molde, color): [pesajes más reciente primero]} con los nombres de
+        grupo de /resumen (SIN MOLDE / SIN COLOR para NULL o '').
+    """
+    query = Pesaje.active().filter(
+        _filtro_ops_abiertas(Pesaje.nro_op),
+    ).order_by(Pesaje.fecha_hora.desc())
+    statement = _PESAJE_AVANCE.select(query).add_columns(Pesaje.molde, Pesaje.color)
+    serialize = _PESAJE_AVANCE.serialize
+    grupos = {}
+    for row in db.session.execute(statement):
+        grupo = (row.molde or 'SIN MOLDE', row.color or 'SIN COLOR')
+        grupos.setdefault(grupo, []).append(serialize(row))
+    return grupos
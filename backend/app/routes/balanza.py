@@ -1,44 +1,205 @@
-from flask import Blueprint, jsonify
-from app.services.scale_service import get_scale_service
+from functools import partial
+from typing import Dict, Optional
+from flask import Blueprint, jsonify, request, current_app
+from flask_socketio import emit, join_room, leave_room
+from app.services.scale_manager import get_scale_manager
+from app.services.weight_broadcaster import CoalescingEmitter
+from app.services.auto_capture import get_auto_capture
+from app.models.pesaje import Pesaje
 from app import socketio
 
 balanza_bp = Blueprint('balanza', __name__)
 
-# Último peso recibido (para endpoint HTTP de fallback)
-_last_weight = {'peso_kg': None}
 
+def _room(station_id: str) -> str:
+    """Room Socket.IO con los pesos estables de una estación"""
+    return f'balanza:{station_id}'
 
-def _on_weight_received(weight: float):
-    """Callback cuando se recibe un peso de la balanza - emite via WebSocket"""
-    _last_weight['peso_kg'] = weight
-    # Emitir instantáneamente a todos los clientes conectados
-    socketio.emit('peso', {'peso_kg': weight})
+
+def _raw_room(station_id: str) -> str:
+    """Room Socket.IO con las lecturas crudas de una estación (opt-in)"""
+    return f'peso_raw:{station_id}'
+
+
+# Último peso recibido por estación (para endpoint HTTP de fallback)
+_last_weights: Dict[str, dict] = {}
+
+# Emisores con coalescing para el evento 'peso', uno por estación
+_peso_broadcasters: Dict[str, CoalescingEmitter] = {}
+
+
+def _last_weight(station_id: str) -> dict:
+    return _last_weights.setdefault(station_id, {'peso_kg': None, 'peso_estable_kg': None})
+
+
+def _reset_last_weight(station_id: str):
+    _last_weights[station_id] = {'peso_kg': None, 'peso_estable_kg': None}
+
+
+def _emit_peso(station_id: str, weight: float):
+    socketio.emit('peso', {'estacion': station_id, 'peso_kg': weight}, to=_raw_room(station_id))
+
+
+def _get_peso_broadcaster(station_id: str) -> CoalescingEmitter:
+    """Obtiene el emisor de 'peso' de la estación (requiere app context para leer la config)"""
+    if station_id not in _peso_broadcasters:
+        _peso_broadcasters[station_id] = CoalescingEmitter(
+            partial(_emit_peso, station_id),
+            max_rate_hz=current_app.config.get('SCALE_EMIT_MAX_HZ', 10.0),
+            name=f'PesoBroadcaster-{station_id}'
+        )
+    return _peso_broadcasters[station_id]
+
+
+def _on_weight_received(station_id: str, weight: float):
+    """Callback por cada lectura cruda - solo a clientes suscritos al stream raw"""
+    _last_weight(station_id)['peso_kg'] = weight
+    # No emite desde el hilo serial: deja el último valor al broadcaster
+    _peso_broadcasters[station_id].submit(weight)
+
+
+def _on_stable_weight(station_id: str, weight: float):
+    """Callback cuando el peso se estabiliza - emite a los clientes de la estación"""
+    _last_weight(station_id)['peso_estable_kg'] = weight
+    socketio.emit('peso_estable', {'estacion': station_id, 'peso_kg': weight}, to=_room(station_id))
+    
+    # Captura automática en el backend (si la estación tiene contexto activo)
+    pesaje = get_auto_capture().on_stable_weight(station_id, weight)
+    if pesaje is not None:
+        socketio.emit('pesaje_capturado', {'estacion': station_id, 'pesaje': pesaje}, to=_room(station_id))
+        socketio.emit('pesajes_updated')
+
+
+def _on_unstable_weight(station_id: str, weight: float):
+    """Callback cuando el peso sale de la meseta estable (la UI deshabilita aceptar)"""
+    _last_weight(station_id)['peso_estable_kg'] = None
+    socketio.emit('peso_inestable', {'estacion': station_id, 'peso_kg': weight}, to=_room(station_id))
+
+
+def _get_service():
+    """
+    Resuelve la estación pedida (?estacion=... o "estacion" en el body).
+    
+    Returns:
+        (service, None) o (None, respuesta de error 404)
+    """
+    data = request.get_json(silent=True) or {}
+    station_id = request.args.get('estacion') or data.get('estacion')
+    try:
+        return get_scale_manager().get(station_id), None
+    except ValueError as e:
+        return None, (jsonify({'status': 'error', 'error': str(e)}), 404)
+
+
+def _station_from_event(data, evento: str) -> Optional[str]:
+    """
+    Resuelve la estación de un evento Socket.IO.
+    
+    Returns:
+        El station_id, o None si la estación no existe (se emite 'error' al cliente)
+    """
+    station_id = data.get('estacion') if isinstance(data, dict) else None
+    try:
+        return get_scale_manager().get(station_id).station_id
+    except ValueError as e:
+        emit('error', {'evento': evento, 'estacion': station_id, 'error': str(e)})
+        return None
+
+
+@socketio.on('suscribir_estacion')
+def suscribir_estacion(data=None):
+    """
+    El cliente se suscribe a los pesos de una estación.
+    data: {"estacion": "linea1", "raw": true}  (raw: también lecturas crudas)
+    """
+    station_id = _station_from_event(data, 'suscribir_estacion')
+    if station_id is None:
+        return
+    join_room(_room(station_id))
+    if isinstance(data, dict) and data.get('raw'):
+        join_room(_raw_room(station_id))
+
+
+@socketio.on('desuscribir_estacion')
+def desuscribir_estacion(data=None):
+    """El cliente deja de recibir los pesos de una estación"""
+    station_id = _station_from_event(data, 'desuscribir_estacion')
+    if station_id is None:
+        return
+    leave_room(_room(station_id))
+    leave_room(_raw_room(station_id))
+
+
+@socketio.on('suscribir_peso_raw')
+def suscribir_peso_raw(data=None):
+    """El cliente se suscribe a las lecturas crudas (evento 'peso') de una estación"""
+    station_id = _station_from_event(data, 'suscribir_peso_raw')
+    if station_id is not None:
+        join_room(_raw_room(station_id))
+
+
+@socketio.on('desuscribir_peso_raw')
+def desuscribir_peso_raw(data=None):
+    """El cliente deja de recibir lecturas crudas"""
+    station_id = _station_from_event(data, 'desuscribir_peso_raw')
+    if station_id is not None:
+        leave_room(_raw_room(station_id))
+
+
+@balanza_bp.route('/estaciones', methods=['GET'])
+def listar_estaciones():
+    """Lista las estaciones configuradas con su estado"""
+    manager = get_scale_manager()
+    return jsonify({
+        'default': manager.default_station,
+        'estaciones': manager.get_status()
+    })
 
 
 @balanza_bp.route('/status', methods=['GET'])
 def get_status():
     """Obtiene el estado de la conexión con la balanza"""
-    service = get_scale_service()
-    return jsonify(service.get_status())
+    service, error = _get_service()
+    if error:
+        return error
+    status = service.get_status()
+    broadcaster = _peso_broadcasters.get(service.station_id)
+    status['broadcast'] = broadcaster.get_stats() if broadcaster else None
+    return jsonify(status)
+
+
+@balanza_bp.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Métricas de ingesta de la estación (líneas/s, parseo, reconexiones, latencia)"""
+    service, error = _get_service()
+    if error:
+        return error
+    metrics = service.get_metrics()
+    broadcaster = _peso_broadcasters.get(service.station_id)
+    metrics['broadcast'] = broadcaster.get_stats() if broadcaster else None
+    return jsonify(metrics)
 
 
 @balanza_bp.route('/conectar', methods=['POST'])
 def conectar():
     """Conecta con la balanza"""
-    service = get_scale_service()
+    service, error = _get_service()
+    if error:
+        return error
     success = service.connect()
     
     if not success:
-        socketio.emit('balanza_status', {'connected': False, 'listening': False, 'port': service.port})
+        socketio.emit('balanza_status', {'estacion': service.station_id, 'connected': False, 'listening': False, 'port': service.port})
         return jsonify({
             'status': 'error',
             'connected': False,
             'error': f'No se pudo conectar a {service.port}. Verifica que el puerto esté disponible.'
         }), 500
     
-    socketio.emit('balanza_status', {'connected': True, 'listening': False, 'port': service.port})
+    socketio.emit('balanza_status', {'estacion': service.station_id, 'connected': True, 'listening': False, 'port': service.port})
     return jsonify({
         'status': 'ok',
+        'estacion': service.station_id,
         'connected': True,
         'port': service.port
     })
@@ -47,19 +208,23 @@ def conectar():
 @balanza_bp.route('/desconectar', methods=['POST'])
 def desconectar():
     """Desconecta de la balanza"""
-    service = get_scale_service()
+    service, error = _get_service()
+    if error:
+        return error
     service.disconnect()
-    _last_weight['peso_kg'] = None
-    socketio.emit('balanza_status', {'connected': False, 'listening': False, 'port': service.port})
-    return jsonify({'status': 'ok', 'connected': False})
+    _reset_last_weight(service.station_id)
+    socketio.emit('balanza_status', {'estacion': service.station_id, 'connected': False, 'listening': False, 'port': service.port})
+    return jsonify({'status': 'ok', 'estacion': service.station_id, 'connected': False})
 
 
 @balanza_bp.route('/iniciar-escucha', methods=['POST'])
 def iniciar_escucha():
     """Inicia la escucha continua de la balanza"""
-    _last_weight['peso_kg'] = None
-    
-    service = get_scale_service()
+    service, error = _get_service()
+    if error:
+        return error
+    station_id = service.station_id
+    _reset_last_weight(station_id)
     
     # Verificar que esté conectado primero
     if not service.serial_connection or not service.serial_connection.is_open:
@@ -70,10 +235,17 @@ def iniciar_escucha():
                 'error': f'No se pudo conectar a {service.port}'
             }), 500
     
-    service.start_listening(_on_weight_received, socketio=socketio)
+    _get_peso_broadcaster(station_id).reset()
+    service.start_listening(
+        partial(_on_weight_received, station_id),
+        socketio=socketio,
+        on_stable=partial(_on_stable_weight, station_id),
+        on_unstable=partial(_on_unstable_weight, station_id)
+    )
     
     return jsonify({
         'status': 'ok',
+        'estacion': station_id,
         'listening': True
     })
 
@@ -81,11 +253,14 @@ def iniciar_escucha():
 @balanza_bp.route('/detener-escucha', methods=['POST'])
 def detener_escucha():
     """Detiene la escucha de la balanza"""
-    service = get_scale_service()
+    service, error = _get_service()
+    if error:
+        return error
     service.stop_listening()
     
     return jsonify({
         'status': 'ok',
+        'estacion': service.station_id,
         'listening': False
     })
 
@@ -93,7 +268,73 @@ def detener_escucha():
 @balanza_bp.route('/ultimo-peso', methods=['GET'])
 def ultimo_peso():
     """Obtiene el último peso capturado (fallback HTTP)"""
+    service, error = _get_service()
+    if error:
+        return error
+    last = _last_weight(service.station_id)
     return jsonify({
-        'peso_kg': _last_weight['peso_kg']
+        'estacion': service.station_id,
+        'peso_kg': last['peso_kg'],
+        'peso_estable_kg': last['peso_estable_kg']
     })
 
+
+@balanza_bp.route('/auto-captura', methods=['PUT'])
+def activar_auto_captura():
+    """
+    Activa la captura automática de pesajes en la estación.
+    
+    Request:
+    {
+        "estacion": "linea1",             // opcional
+        "qr_data": "...",                 // opcional, se parsea como en /pesajes/parse-qr
+        "contexto": {"nro_op": "OP1354", "molde": "...", "operador": "...", ...},
+        "imprimir": true,                 // encolar sticker (default true)
+        "min_peso_kg": 1.0                // opcional
+    }
+    """
+    service, error = _get_service()
+    if error:
+        return error
+    data = request.get_json() or {}
+    
+    datos = {}
+    qr_data = data.get('qr_data')
+    if qr_data:
+        datos.update(Pesaje.parse_qr_data(qr_data))
+        datos['qr_data_original'] = qr_data
+    datos.update(data.get('contexto') or {})
+    
+    if not datos.get('nro_op'):
+        return jsonify({'error': 'nro_op es requerido (en contexto o qr_data)'}), 400
+    
+    try:
+        context = get_auto_capture().set_context(
+            service.station_id, datos,
+            imprimir=data.get('imprimir', True),
+            min_peso_kg=data.get('min_peso_kg')
+        )
+    except (TypeError, ValueError):
+        return jsonify({'error': 'min_peso_kg inválido'}), 400
+    
+    return jsonify(context)
+
+
+@balanza_bp.route('/auto-captura', methods=['GET'])
+def estado_auto_captura():
+    """Contexto de captura automática de la estación"""
+    service, error = _get_service()
+    if error:
+        return error
+    context = get_auto_capture().get_context(service.station_id)
+    return jsonify({'activo': context is not None, 'contexto': context})
+
+
+@balanza_bp.route('/auto-captura', methods=['DELETE'])
+def desactivar_auto_captura():
+    """Desactiva la captura automática de la estación"""
+    service, error = _get_service()
+    if error:
+        return error
+    get_auto_capture().clear_context(service.station_id)
+    return jsonify({'status': 'ok', 'estacion': service.station_id, 'activo': False})
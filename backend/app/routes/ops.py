@@ -1,34 +1,34 @@
 from flask import Blueprint, request, jsonify
 from sqlalchemy import func
 from app import db
-from app.models.pesaje import Pesaje
+from app.models.pesaje_agregado import PesajeAgregado
 from app.models.op_cerrada import OpCerrada
+from app.utils.data_version import etag_por_version
 
 ops_bp = Blueprint('ops', __name__)
 
 
 @ops_bp.route('/activas', methods=['GET'])
+@etag_por_version('pesajes', 'ops_cerradas')
 def listar_ops_activas():
     """
     Lista OPs únicas que tienen pesajes, excluyendo las cerradas.
-    Agrupa por nro_op y muestra totales.
+    Agrupa por nro_op y muestra totales (desde pesajes_agregados).
     """
     # Subquery: OPs cerradas
-    cerradas_subq = db.session.query(OpCerrada.nro_op).subquery()
+    cerradas_subq = db.select(OpCerrada.nro_op)
     
-    # Query: agrupar pesajes por nro_op, excluyendo cerradas
+    # Query: agrupar los totales por nro_op, excluyendo cerradas
     resultados = db.session.query(
-        Pesaje.nro_op,
-        func.max(Pesaje.molde).label('molde'),
-        func.sum(Pesaje.peso_kg).label('total_kg'),
-        func.count(Pesaje.id).label('total_bolsas'),
-        func.max(Pesaje.fecha_hora).label('ultimo_pesaje')
+        PesajeAgregado.nro_op,
+        func.max(func.nullif(PesajeAgregado.molde, '')).label('molde'),
+        func.sum(PesajeAgregado.total_kg).label('total_kg'),
+        func.sum(PesajeAgregado.total_bolsas).label('total_bolsas'),
+        func.max(PesajeAgregado.ultimo_pesaje).label('ultimo_pesaje')
     ).filter(
-        Pesaje.nro_op.isnot(None),
-        Pesaje.nro_op != '',
-        Pesaje.nro_op.notin_(cerradas_subq),
-        Pesaje.deleted_at.is_(None)
-    ).group_by(Pesaje.nro_op).order_by(func.max(Pesaje.fecha_hora).desc()).all()
+        PesajeAgregado.nro_op != '',
+        PesajeAgregado.nro_op.notin_(cerradas_subq),
+    ).group_by(PesajeAgregado.nro_op).order_by(func.max(PesajeAgregado.ultimo_pesaje).desc()).all()
     
     ops = []
     for r in resultados:
@@ -37,29 +37,36 @@ def listar_ops_activas():
             'molde': r.molde,
             'total_kg': round(r.total_kg or 0, 2),
             'total_bolsas': r.total_bolsas,
-            'ultimo_pesaje': r.ultimo_pesaje.isoformat() if r.ultimo_pesaje else None,
+            'ultimo_pesaje': r.ultimo_pesaje,
         })
     
     return jsonify(ops)
 
 
 @ops_bp.route('/cerradas', methods=['GET'])
+@etag_por_version('pesajes', 'ops_cerradas')
 def listar_ops_cerradas():
     """Lista todas las OPs que han sido cerradas localmente."""
     cerradas = OpCerrada.query.order_by(OpCerrada.fecha_cierre.desc()).all()
     
-    # Enriquecer con totales de pesajes
+    # Totales de pesajes de todas las OPs cerradas en una sola consulta
+    stats = {
+        r.nro_op: r for r in db.session.query(
+            PesajeAgregado.nro_op,
+            func.sum(PesajeAgregado.total_kg).label('total_kg'),
+            func.sum(PesajeAgregado.total_bolsas).label('total_bolsas')
+        ).filter(
+            PesajeAgregado.nro_op.in_([op.nro_op for op in cerradas])
+        ).group_by(PesajeAgregado.nro_op)
+    } if cerradas else {}
+    
     resultado = []
     for op in cerradas:
-        stats = db.session.query(
-            func.sum(Pesaje.peso_kg).label('total_kg'),
-            func.count(Pesaje.id).label('total_bolsas')
-        ).filter(Pesaje.nro_op == op.nro_op, Pesaje.deleted_at.is_(None)).first()
-        
+        totales = stats.get(op.nro_op)
         resultado.append({
             **op.to_dict(),
-            'total_kg': round(stats.total_kg or 0, 2) if stats else 0,
-            'total_bolsas': stats.total_bolsas if stats else 0,
+            'total_kg': round(totales.total_kg or 0, 2) if totales else 0,
+            'total_bolsas': totales.total_bolsas if totales else 0,
         })
     
     return jsonify(resultado)
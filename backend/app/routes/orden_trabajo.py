@@ -1,6 +1,7 @@
 from flask import Blueprint, jsonify, request, current_app
 import requests
 from app import db
+from app.utils.data_version import etag_por_version
 
 orden_trabajo_bp = Blueprint('orden_trabajo', __name__, url_prefix='/api/orden-trabajo')
 
@@ -14,7 +15,7 @@ def _get_central_api():
 
 
 
-@rdp_bp.route('/siguiente', methods=['GET'])
+@orden_trabajo_bp.route('/siguiente', methods=['GET'])
 def obtener_siguiente_correlativo():
     """
     Obtiene el siguiente correlativo disponible.
@@ -136,6 +137,7 @@ def generar_orden_trabajo():
 
 
 @orden_trabajo_bp.route('/cache/status', methods=['GET'])
+@etag_por_version('correlativo_cache')
 def cache_status():
     """Estado del cache local de correlativos."""
     from app.models.correlativo_cache import (
@@ -163,7 +165,7 @@ def forzar_reponer():
         return jsonify({'error': str(e)}), 503
 
 
-@rdp_bp.route('/cache/anular', methods=['POST'])
+@orden_trabajo_bp.route('/cache/anular', methods=['POST'])
 def anular_correlativo():
     """
     Anula un correlativo (hoja destruida/perdida).
@@ -203,17 +205,17 @@ def anular_correlativo():
     
     corr.anular(motivo)
     db.session.commit()
-    orden_trabajo = str(corr.correlativo)
     
     return jsonify({
         'success': True,
-        'correlativo': orden_trabajo,
+        'correlativo': corr.correlativo,
         'motivo': corr.motivo_anulacion,
-        'fecha': corr.fecha_anulacion.isoformat()
+        'fecha': corr.fecha_anulacion
     })
 
 
-@rdp_bp.route('/cache/anulados', methods=['GET'])
+@orden_trabajo_bp.route('/cache/anulados', methods=['GET'])
+@etag_por_version('correlativo_cache')
 def listar_anulados():
     """Lista todos los correlativos anulados."""
     from app.models.correlativo_cache import CorrelativoCache
@@ -225,7 +227,7 @@ def listar_anulados():
     return jsonify([c.to_dict() for c in anulados])
 
 
-@rdp_bp.route('/reimprimir', methods=['POST'])
+@orden_trabajo_bp.route('/reimprimir', methods=['POST'])
 def reimprimir_rdp():
     """
     Reimprime el sticker de un RDP existente.
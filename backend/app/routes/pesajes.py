@@ -1,34 +1,35 @@
 from datetime import datetime, date, timezone, timedelta
-import io
-import openpyxl
-from flask import Blueprint, request, jsonify, send_file
+import math
+import os
+from flask import Blueprint, Response, request, jsonify, send_file, current_app, stream_with_context
+from sqlalchemy import insert
 from app import db, socketio
-from app.models.pesaje import Pesaje
+from app.models.pesaje import Pesaje, PESAJE_COMPLETO, PESAJE_LISTADO
 from app.services.sticker_service import get_sticker_service
+from app.services.search_index import SEARCH_COLUMNS, substring_filter
+from app.services.export_jobs import get_export_jobs
+from app.services.export_service import (
+    EXPORT_FORMATS, export_chunks, export_filename, export_query, iter_export_batches,
+    iter_export_rows, parquet_available, stream_file, temp_export_path, write_xlsx,
+)
 from app.utils.logger import get_pesaje_logger
+from app.utils.pagination import TotalsCache, keyset_page
+from app.utils.data_version import data_versions, etag_por_version
 
 pesajes_bp = Blueprint('pesajes', __name__)
 
 # Logger para este módulo
 log = get_pesaje_logger()
 
+# Totales de listados por filtro (COUNT cacheado unos segundos)
+_totales = TotalsCache()
+
 
 @pesajes_bp.route('', methods=['GET'])
+@etag_por_version('pesajes')
 def listar_pesajes():
-    """Lista todos los pesajes con paginación"""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 20, type=int)
-    
-    pesajes = Pesaje.active().order_by(Pesaje.fecha_hora.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    
-    return jsonify({
-        'items': [p.to_dict() for p in pesajes.items],
-        'total': pesajes.total,
-        'page': pesajes.page,
-        'pages': pesajes.pages
-    })
+    """Lista los pesajes (paginación por cursor; ver _pagina)"""
+    return _pagina(Pesaje.active(), per_page_default=20)
 
 
 @pesajes_bp.route('', methods=['POST'])
@@ -41,39 +42,11 @@ def crear_pesaje():
         log.error("peso_kg es requerido")
         return jsonify({'error': 'peso_kg es requerido'}), 400
     
-    # Parse fecha_orden_trabajo si viene como string
-    fecha_ot = None
-    if data.get('fecha_orden_trabajo'):
-        try:
-            fecha_ot = datetime.strptime(data['fecha_orden_trabajo'], '%Y-%m-%d').date()
-        except ValueError:
-            pass
-    
-    # Parse peso_unitario_teorico (puede venir como string vacío)
-    peso_unit = None
-    raw_peso_unit = data.get('peso_unitario_teorico')
-    if raw_peso_unit is not None and str(raw_peso_unit).strip() != '':
-        try:
-            peso_unit = float(raw_peso_unit)
-        except (ValueError, TypeError):
-            pass
-    
-    pesaje = Pesaje(
-        peso_kg=data['peso_kg'],
-        molde=data.get('molde'),
-        maquina=data.get('maquina'),
-        nro_op=data.get('nro_op'),
-        turno=data.get('turno'),
-        fecha_orden_trabajo=fecha_ot,
-        nro_orden_trabajo=data.get('nro_orden_trabajo'),
-        peso_unitario_teorico=peso_unit,
-        operador=data.get('operador'),
-        color=data.get('color'),
-        pieza_sku=data.get('pieza_sku'),
-        pieza_nombre=data.get('pieza_nombre'),
-        observaciones=data.get('observaciones'),
-        qr_data_original=data.get('qr_data_original')
-    )
+    try:
+        pesaje = Pesaje.from_payload(data)
+    except ValueError as e:
+        log.error(str(e))
+        return jsonify({'error': str(e)}), 400
     
     db.session.add(pesaje)
     db.session.commit()
@@ -85,6 +58,81 @@ def crear_pesaje():
     return jsonify(pesaje.to_dict()), 201
 
 
+@pesajes_bp.route('/batch', methods=['POST'])
+def crear_pesajes_batch():
+    """
+    Crea varios pesajes en una sola transacción (capturas offline, backlog).
+    
+    Request: {"items": [{...mismos campos que POST /pesajes, "fecha_hora"?}, ...]}
+             (también se acepta el array directamente)
+    
+    Los items inválidos (peso_kg ausente, no numérico, no finito o <= 0;
+    fecha_hora ilegible) se reportan y no se insertan; los válidos se insertan
+    con un único INSERT masivo y un único commit.
+    """
+    data = request.get_json(silent=True)
+    items = data.get('items') if isinstance(data, dict) else data
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'items debe ser un array no vacío'}), 400
+    
+    max_items = current_app.config.get('PESAJES_BATCH_MAX', 5000)
+    if len(items) > max_items:
+        return jsonify({'error': f'Máximo {max_items} items por lote'}), 400
+    
+    now = datetime.now(timezone(timedelta(hours=-5)))
+    resultados = [None] * len(items)
+    filas = []
+    indices = []
+    for i, item in enumerate(items):
+        if not isinstance(item, dict) or item.get('peso_kg') is None:
+            resultados[i] = {'index': i, 'status': 'error', 'error': 'peso_kg es requerido'}
+            continue
+        try:
+            peso = float(item['peso_kg'])
+        except (ValueError, TypeError):
+            peso = None
+        # float() acepta 'nan' e 'inf': NaN viola el NOT NULL e inf rompe los agregados
+        if peso is None or not math.isfinite(peso) or peso <= 0:
+            resultados[i] = {'index': i, 'status': 'error', 'error': 'peso_kg inválido'}
+            continue
+        try:
+            valores = Pesaje.payload_values(item)
+        except ValueError as e:
+            resultados[i] = {'index': i, 'status': 'error', 'error': str(e)}
+            continue
+        valores['peso_kg'] = peso
+        valores.setdefault('fecha_hora', now)  # executemany requiere las mismas columnas en cada fila
+        filas.append(valores)
+        indices.append(i)
+    
+    if filas:
+        # executemany con RETURNING: SQLAlchemy agrupa las filas en INSERTs multi-VALUES
+        try:
+            ids = db.session.scalars(
+                insert(Pesaje).returning(Pesaje.id, sort_by_parameter_order=True),
+                filas
+            ).all()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            log.error(f"Error insertando lote de {len(filas)} pesajes: {e}")
+            return jsonify({'error': 'No se pudo guardar el lote'}), 500
+        
+        for i, pesaje_id in zip(indices, ids):
+            resultados[i] = {'index': i, 'status': 'ok', 'id': pesaje_id}
+        
+        log.info(f"✅ Lote de {len(ids)} pesajes creado ({len(items) - len(ids)} rechazados)")
+        socketio.emit('pesajes_updated')
+    
+    creados = len(filas)
+    return jsonify({
+        'creados': creados,
+        'errores': len(items) - creados,
+        'resultados': resultados
+    }), 201 if creados else 400
+
+
 @pesajes_bp.route('/parse-qr', methods=['POST'])
 def parse_qr():
     """
@@ -113,6 +161,7 @@ def parse_qr():
 
 
 @pesajes_bp.route('/<int:id>', methods=['GET'])
+@etag_por_version('pesajes')
 def obtener_pesaje(id):
     """Obtiene un pesaje por ID"""
     pesaje = Pesaje.query.get_or_404(id)
@@ -184,11 +233,9 @@ def eliminar_pesaje(id):
 
 
 @pesajes_bp.route('/buscar', methods=['GET'])
+@etag_por_version('pesajes')
 def buscar_pesajes():
     """Busca pesajes con filtros opcionales."""
-    page = request.args.get('page', 1, type=int)
-    per_page = request.args.get('per_page', 50, type=int)
-    
     query = Pesaje.active()
     
     # Filtro por ID exacto
@@ -196,20 +243,13 @@ def buscar_pesajes():
     if id_pesaje and id_pesaje.isdigit():
         query = query.filter(Pesaje.id == int(id_pesaje))
     
-    # Filtro por nro_op
-    nro_op = request.args.get('nro_op', '').strip()
-    if nro_op:
-        query = query.filter(Pesaje.nro_op.ilike(f'%{nro_op}%'))
-    
-    # Filtro por molde
-    molde = request.args.get('molde', '').strip()
-    if molde:
-        query = query.filter(Pesaje.molde.ilike(f'%{molde}%'))
-    
-    # Filtro por nro_orden_trabajo
-    nro_ot = request.args.get('nro_ot', '').strip()
-    if nro_ot:
-        query = query.filter(Pesaje.nro_orden_trabajo.ilike(f'%{nro_ot}%'))
+    # Filtros por subcadena (nro_op, molde, nro_ot) vía índice de búsqueda
+    criterio = substring_filter(Pesaje, db.session, {
+        columna: request.args.get(param, '').strip()
+        for param, columna in SEARCH_COLUMNS.items()
+    })
+    if criterio is not None:
+        query = query.filter(criterio)
     
     # Filtro por rango de fechas
     fecha_inicio = request.args.get('fecha_inicio', '').strip()
@@ -228,16 +268,67 @@ def buscar_pesajes():
         except ValueError:
             pass
     
-    resultados = query.order_by(Pesaje.fecha_hora.desc()).paginate(
-        page=page, per_page=per_page, error_out=False
-    )
-    
-    return jsonify({
-        'items': [p.to_dict() for p in resultados.items],
-        'total': resultados.total,
-        'page': resultados.page,
-        'pages': resultados.pages
-    })
+    return _pagina(query, per_page_default=50)
+
+
+# Parámetros de paginación (no forman parte de la clave del total cacheado)
+_PARAMS_PAGINACION = {'cursor', 'per_page', 'page', 'incluir_total', 'campos'}
+
+
+def _pagina(query, per_page_default: int):
+    """
+    Responde una página de `query` ordenada por (fecha_hora, id) descendente.
+    
+    - Por cursor (default): ?cursor=<next_cursor>&per_page=N
+      -> {items, next_cursor, has_more, per_page[, total]}
+      Los items traen las columnas de PESAJE_LISTADO; ?campos=completo
+      devuelve las de to_dict().
+      El total solo se calcula con ?incluir_total=1 y se cachea por
+      combinación de filtros mientras no cambie la versión de pesajes
+      (como máximo PESAJES_TOTAL_CACHE_SECONDS).
+    - Legacy por offset: ?page=N (COUNT + OFFSET) -> {items, total, page, pages}
+    
+    per_page se acota a 1..PESAJES_PER_PAGE_MAX.
+    """
+    per_page = request.args.get('per_page', per_page_default, type=int)
+    per_page = max(1, min(per_page, current_app.config.get('PESAJES_PER_PAGE_MAX', 200)))
+    
+    if 'page' in request.args and 'cursor' not in request.args:
+        page = request.args.get('page', 1, type=int)
+        resultados = query.order_by(Pesaje.fecha_hora.desc(), Pesaje.id.desc()).paginate(
+            page=page, per_page=per_page, error_out=False
+        )
+        return jsonify({
+            'items': [p.to_dict() for p in resultados.items],
+            'total': resultados.total,
+            'page': resultados.page,
+            'pages': resultados.pages
+        })
+    
+    proyeccion = PESAJE_COMPLETO if request.args.get('campos') == 'completo' else PESAJE_LISTADO
+    try:
+        pagina = keyset_page(db.session, proyeccion.select(query), Pesaje, per_page,
+                             request.args.get('cursor') or None)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    serialize = proyeccion.serialize
+    body = {
+        'items': [serialize(row) for row in pagina['items']],
+        'next_cursor': pagina['next_cursor'],
+        'has_more': pagina['has_more'],
+        'per_page': per_page,
+    }
+    
+    if request.args.get('incluir_total', '').lower() in ('1', 'true'):
+        clave = (request.endpoint, data_versions.get('pesajes'), tuple(sorted(
+            (k, v) for k, v in request.args.items() if k not in _PARAMS_PAGINACION
+        )))
+        body['total'] = _totales.get(
+            clave, query.count, ttl=current_app.config.get('PESAJES_TOTAL_CACHE_SECONDS', 10)
+        )
+    
+    return jsonify(body)
 
 
 @pesajes_bp.route('/bulk-delete', methods=['POST'])
@@ -297,10 +388,10 @@ def preview_sticker(id):
 
 
 @pesajes_bp.route('/sin-sincronizar', methods=['GET'])
+@etag_por_version('pesajes')
 def pesajes_sin_sincronizar():
     """Obtiene pesajes pendientes de sincronización con API central"""
-    pesajes = Pesaje.active().filter_by(sincronizado=False).all()
-    return jsonify([p.to_dict() for p in pesajes])
+    return jsonify(PESAJE_COMPLETO.all(db.session, Pesaje.pendientes_sync()))
 
 
 @pesajes_bp.route('/marcar-sincronizado', methods=['POST'])
@@ -323,98 +414,99 @@ def marcar_sincronizado():
 
 @pesajes_bp.route('/exportar', methods=['GET'])
 def exportar_pesajes():
-    """Exporta los pesajes a un archivo Excel (.xlsx) filtrado por rango de fechas"""
-    fecha_inicio_str = request.args.get('fecha_inicio')
-    fecha_fin_str = request.args.get('fecha_fin')
+    """
+    Exporta los pesajes filtrados por rango de fechas.
     
-    query = Pesaje.active()
+    formato: xlsx (default), csv, ndjson o parquet (requiere pyarrow)
+    """
+    formato = (request.args.get('formato') or 'xlsx').lower()
+    if formato not in EXPORT_FORMATS:
+        return jsonify({'error': f"Formato no soportado. Usar: {', '.join(EXPORT_FORMATS)}"}), 400
+    if formato == 'parquet' and not parquet_available():
+        return jsonify({'error': 'Formato parquet no disponible: falta instalar pyarrow'}), 400
+    
+    query, error = _consulta_exportacion()
+    if error:
+        return error
+    
+    extension, mimetype = EXPORT_FORMATS[formato]
+    filename = export_filename(request.args.get('fecha_inicio'), request.args.get('fecha_fin'), extension)
+    headers = {'Content-Disposition': f'attachment; filename={filename}'}
+    
+    if formato != 'xlsx':
+        # Directo del cursor a la respuesta, lote por lote
+        chunks = export_chunks(formato, iter_export_batches(db.session, query))
+        log.info(f"Exportación {formato} iniciada")
+        return Response(stream_with_context(chunks), mimetype=mimetype, headers=headers)
+    
+    # Escritura write-only a un temporal: la memoria no crece con el rango
+    path = temp_export_path('.xlsx')
+    try:
+        filas = write_xlsx(iter_export_rows(db.session, query), path)
+    except Exception:
+        os.remove(path)
+        raise
+    log.info(f"Exportación xlsx: {filas} filas")
+    
+    headers['Content-Length'] = str(os.path.getsize(path))
+    return Response(stream_file(path), mimetype=mimetype, headers=headers)
+
+
+@pesajes_bp.route('/exportar/jobs', methods=['POST'])
+def crear_exportacion():
+    """
+    Encola una exportación en segundo plano y responde con su ID.
+    
+    Body: {formato, fecha_inicio, fecha_fin} (mismos valores que /exportar).
+    El avance se emite con el evento Socket.IO 'export_progress'.
+    """
+    data = request.get_json(silent=True) or {}
+    formato = (data.get('formato') or 'xlsx').lower()
     
-    # Validar y aplicar filtros de fecha
     try:
-        if fecha_inicio_str:
-            fecha_inicio = datetime.strptime(fecha_inicio_str, '%Y-%m-%d').date()
-            # Inicio del día en UTC-5
-            inicio_dt = datetime.combine(fecha_inicio, datetime.min.time(), tzinfo=timezone(timedelta(hours=-5)))
-            query = query.filter(Pesaje.fecha_hora >= inicio_dt)
-            
-        if fecha_fin_str:
-            fecha_fin = datetime.strptime(fecha_fin_str, '%Y-%m-%d').date()
-            # Fin del día en UTC-5
-            fin_dt = datetime.combine(fecha_fin, datetime.max.time(), tzinfo=timezone(timedelta(hours=-5)))
-            query = query.filter(Pesaje.fecha_hora <= fin_dt)
-    except ValueError:
-        return jsonify({'error': 'Formato de fecha inválido. Usar YYYY-MM-DD'}), 400
-        
-    pesajes = query.order_by(Pesaje.fecha_hora.desc()).all()
-    
-    # Crear Excel con openpyxl
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = "Pesajes"
-    
-    # Definir columnas
-    columnas = [
-        "ID", "Fecha/Hora", "Peso (kg)", "Peso Unit. (g)", "Nro OP", "Turno", "Fecha OT", "Nro OT",
-        "Máquina", "Molde", "Color", "Operador", "Pieza SKU", "Pieza Nombre",
-        "Observaciones", "Sincronizado"
-    ]
-    ws.append(columnas)
-    
-    # Agregar datos
-    for p in pesajes:
-        fh_str = p.fecha_hora.strftime('%Y-%m-%d %H:%M:%S') if p.fecha_hora else ''
-        fot_str = p.fecha_orden_trabajo.strftime('%Y-%m-%d') if p.fecha_orden_trabajo else ''
-        
-        fila = [
-            p.id,
-            fh_str,
-            p.peso_kg,
-            p.peso_unitario_teorico,
-            p.nro_op,
-            p.turno,
-            fot_str,
-            p.nro_orden_trabajo,
-            p.maquina,
-            p.molde,
-            p.color,
-            p.operador,
-            p.pieza_sku,
-            p.pieza_nombre,
-            p.observaciones,
-            "Sí" if p.sincronizado else "No"
-        ]
-        ws.append(fila)
-        
-    # Ajustar ancho de columnas básico
-    for col in ws.columns:
-        max_length = 0
-        column = col[0].column_letter # Obtener la letra de la columna
-        for cell in col:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = (max_length + 2)
-        ws.column_dimensions[column].width = min(adjusted_width, 50)
-        
-    # Guardar a bytes en memoria
-    excel_file = io.BytesIO()
-    wb.save(excel_file)
-    excel_file.seek(0)
-    
-    # Nombre de archivo dinámico
-    rango_fechas = ""
-    if fecha_inicio_str and fecha_fin_str:
-        rango_fechas = f"_{fecha_inicio_str}_a_{fecha_fin_str}"
-    elif fecha_inicio_str:
-        rango_fechas = f"_desde_{fecha_inicio_str}"
-        
-    filename = f"pesajes{rango_fechas}.xlsx"
+        job, reutilizado = get_export_jobs().start(formato, data.get('fecha_inicio'), data.get('fecha_fin'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    return jsonify({**job.to_dict(), 'reutilizado': reutilizado}), 200 if job.estado == 'listo' else 202
+
+
+@pesajes_bp.route('/exportar/jobs/<job_id>', methods=['GET'])
+def estado_exportacion(job_id):
+    """Estado de una exportación en segundo plano"""
+    job = get_export_jobs().get(job_id)
+    if job is None:
+        return jsonify({'error': 'Exportación no encontrada'}), 404
+    return jsonify(job.to_dict())
+
+
+@pesajes_bp.route('/exportar/jobs/<job_id>/descarga', methods=['GET'])
+def descargar_exportacion(job_id):
+    """Descarga el archivo de una exportación terminada (admite Range)"""
+    job = get_export_jobs().get(job_id)
+    if job is None or (job.estado == 'listo' and not os.path.exists(job.path)):
+        return jsonify({'error': 'Exportación no encontrada'}), 404
+    if job.estado != 'listo':
+        return jsonify({'error': f'Exportación no disponible (estado: {job.estado})'}), 409
     
     return send_file(
-        excel_file,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        job.path,
+        mimetype=job.mimetype,
         as_attachment=True,
-        download_name=filename
+        download_name=job.filename,
+        conditional=True,
     )
+
+
+def _consulta_exportacion():
+    """
+    Query de exportación con el rango fecha_inicio / fecha_fin del request.
+    
+    Returns:
+        (query, None) o (None, respuesta 400)
+    """
+    try:
+        query = export_query(request.args.get('fecha_inicio'), request.args.get('fecha_fin'))
+    except ValueError:
+        return None, (jsonify({'error': 'Formato de fecha inválido. Usar YYYY-MM-DD'}), 400)
+    return query, None
@@ -2,6 +2,7 @@
 Rutas de sincronización con el backend central.
 """
 from flask import Blueprint, jsonify, request
+from app.utils.data_version import etag_por_version
 
 sync_bp = Blueprint('sync', __name__, url_prefix='/api/sync')
 
@@ -47,18 +48,19 @@ def trigger_sync():
 
 
 @sync_bp.route('/pending', methods=['GET'])
+@etag_por_version('pesajes')
 def list_pending():
     """
     Lista pesajes pendientes de sincronización.
     """
-    from app.services.sync_service import get_sync_service
+    from app import db
+    from app.models.pesaje import Pesaje, PESAJE_COMPLETO
     
-    service = get_sync_service()
-    pesajes = service.get_pending_pesajes()
+    pesajes = PESAJE_COMPLETO.all(db.session, Pesaje.pendientes_sync())
     
     return jsonify({
         'count': len(pesajes),
-        'pesajes': [p.to_dict() for p in pesajes]
+        'pesajes': pesajes
     })
 
 
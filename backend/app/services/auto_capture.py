@@ -0,0 +1,156 @@
+"""
+Captura automática de pesajes en el backend.
+
+La estación tiene un contexto activo (datos del QR/OT escaneado). Cuando la
+balanza reporta un peso estable, el backend crea el Pesaje directamente y
+opcionalmente encola el sticker, sin pasar por la UI (evento 'peso' +
+POST /api/pesajes).
+
+Para no capturar dos veces la misma bolsa, después de cada captura la
+estación queda desarmada hasta que la balanza vuelva a estabilizarse por
+debajo de `min_peso_kg` (bolsa retirada).
+"""
+import queue
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional
+from flask import current_app
+
+from app import db
+from app.models.pesaje import Pesaje
+from app.utils.logger import get_pesaje_logger
+
+log = get_pesaje_logger()
+
+
+class AutoCaptureService:
+    """Contextos de captura automática por estación y cola de impresión."""
+    
+    def __init__(self):
+        self._contexts: Dict[str, dict] = {}
+        self._armed: Dict[str, bool] = {}
+        self._app = None
+        self._print_queue: "queue.Queue[int]" = queue.Queue()
+        self._printer_thread: Optional[threading.Thread] = None
+    
+    def set_context(self, station_id: str, datos: dict, imprimir: bool = True,
+                    min_peso_kg: float = None) -> dict:
+        """
+        Activa la captura automática para una estación (requiere app context).
+        
+        Args:
+            datos: Campos del pesaje (mismos que POST /api/pesajes, sin peso_kg)
+            imprimir: Encolar el sticker de cada pesaje capturado
+            min_peso_kg: Peso mínimo para capturar (default AUTO_CAPTURE_MIN_KG)
+        """
+        self._app = current_app._get_current_object()
+        if min_peso_kg is None:
+            min_peso_kg = current_app.config.get('AUTO_CAPTURE_MIN_KG', 1.0)
+        
+        context = {
+            'estacion': station_id,
+            'datos': {k: v for k, v in datos.items() if k != 'peso_kg'},
+            'imprimir': bool(imprimir),
+            'min_peso_kg': float(min_peso_kg),
+            'capturados': 0,
+            'activo_desde': datetime.now(timezone(timedelta(hours=-5))),
+        }
+        self._contexts[station_id] = context
+        # Un contexto nuevo arranca armado (la bolsa actual ya puede capturarse)
+        self._armed[station_id] = True
+        log.info(f"Auto-captura activada en {station_id}: OP {context['datos'].get('nro_op')}")
+        return context
+    
+    def clear_context(self, station_id: str) -> bool:
+        """Desactiva la captura automática. Retorna False si no estaba activa."""
+        self._armed.pop(station_id, None)
+        return self._contexts.pop(station_id, None) is not None
+    
+    def get_context(self, station_id: str) -> Optional[dict]:
+        return self._contexts.get(station_id)
+    
+    def on_stable_weight(self, station_id: str, weight: float) -> Optional[dict]:
+        """
+        Procesa un peso estable (llamado desde el hilo lector de la estación).
+        
+        Returns:
+            El pesaje creado (to_dict) o None si no correspondía capturar.
+        """
+        context = self._contexts.get(station_id)
+        if context is None:
+            return None
+        
+        if weight < context['min_peso_kg']:
+            # Balanza vacía: la próxima bolsa puede capturarse
+            self._armed[station_id] = True
+            return None
+        if not self._armed.get(station_id):
+            return None  # Misma bolsa reacomodada
+        self._armed[station_id] = False
+        
+        with self._app.app_context():
+            try:
+                pesaje = Pesaje.from_payload({**context['datos'], 'peso_kg': weight})
+                db.session.add(pesaje)
+                db.session.commit()
+                data = pesaje.to_dict()
+            except Exception as e:
+                db.session.rollback()
+                self._armed[station_id] = True
+                log.error(f"Error en auto-captura ({station_id}, {weight} kg): {e}")
+                return None
+        
+        context['capturados'] += 1
+        log.info(f"✅ Auto-captura {station_id}: pesaje {data['id']} ({weight} kg)")
+        
+        if context['imprimir']:
+            self._queue_print(data['id'])
+        return data
+    
+    def _queue_print(self, pesaje_id: int):
+        if self._printer_thread is None or not self._printer_thread.is_alive():
+            self._printer_thread = threading.Thread(
+                target=self._print_worker, daemon=True, name="StickerWorker"
+            )
+            self._printer_thread.start()
+        self._print_queue.put(pesaje_id)
+    
+    def _print_worker(self):
+        """Imprime los stickers en orden, fuera del hilo lector."""
+        from app.services.sticker_service import get_sticker_service
+        
+        while True:
+            pesaje_id = self._print_queue.get()
+            try:
+                with self._app.app_context():
+                    pesaje = db.session.get(Pesaje, pesaje_id)
+                    if pesaje is None:
+                        continue
+                    if get_sticker_service().print_sticker(pesaje):
+                        pesaje.sticker_impreso = True
+                        pesaje.fecha_impresion = datetime.now(timezone(timedelta(hours=-5)))
+                        db.session.commit()
+                    else:
+                        log.error(f"Error al imprimir sticker del pesaje {pesaje_id}")
+            except Exception as e:
+                log.error(f"Error en cola de impresión (pesaje {pesaje_id}): {e}")
+            finally:
+                self._print_queue.task_done()
+    
+    def get_status(self) -> dict:
+        return {
+            'estaciones': list(self._contexts.values()),
+            'impresiones_pendientes': self._print_queue.qsize(),
+        }
+
+
+# Instancia global
+_auto_capture: Optional[AutoCaptureService] = None
+
+
+def get_auto_capture() -> AutoCaptureService:
+    """Obtiene el servicio de captura automática."""
+    global _auto_capture
+    if _auto_capture is None:
+        _auto_capture = AutoCaptureService()
+    return _auto_capture
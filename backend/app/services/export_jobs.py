@@ -0,0 +1,253 @@
+"""
+Exportaciones en segundo plano.
+
+POST /api/pesajes/exportar/jobs crea un trabajo y responde de inmediato con su
+ID. Un pool de hilos (EXPORT_JOBS_WORKERS) genera el archivo en
+EXPORT_JOBS_DIR con los mismos escritores que la exportación directa
+(export_service) y emite 'export_progress' por Socket.IO a medida que avanza.
+El archivo terminado se descarga con soporte de HTTP Range (send_file
+conditional), así que una descarga cortada puede reanudarse.
+
+Los trabajos se indexan por (formato, rango de fechas, versión de datos de
+pesajes): pedir la misma exportación sin que haya cambiado la tabla devuelve
+el trabajo existente (en curso o terminado) en vez de generar otro archivo.
+Los archivos se borran EXPORT_JOBS_TTL_SECONDS después de terminar (se revisa
+al crear y al consultar trabajos). El registro vive en memoria: al reiniciar
+se borran los archivos huérfanos con más de ese TTL (la carpeta por defecto
+es compartida y otro proceso puede tener trabajos vigentes en ella).
+"""
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+
+from app import db, socketio
+from app.services.export_service import (
+    EXPORT_FORMATS, export_filename, export_query, iter_export_batches, parquet_available,
+    write_export,
+)
+from app.utils.data_version import data_versions
+from app.utils.logger import get_pesaje_logger
+
+log = get_pesaje_logger()
+
+# Nombres de archivo de trabajos: <uuid hex>.<extensión>[.part]
+_ARCHIVO_JOB = re.compile(r'^[0-9a-f]{32}\.\w+(\.part)?$')
+
+# Intervalo mínimo entre eventos 'export_progress' de un mismo trabajo (s)
+PROGRESS_INTERVAL = 0.5
+
+
+class ExportJob:
+    """Estado de un trabajo de exportación."""
+    
+    def __init__(self, formato: str, fecha_inicio: Optional[str], fecha_fin: Optional[str],
+                 directorio: str, clave: tuple):
+        self.id = uuid.uuid4().hex
+        self.formato = formato
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        self.clave = clave
+        self.estado = 'pendiente'  # pendiente | procesando | listo | error
+        self.filas = 0
+        self.total = None
+        self.bytes = None
+        self.error = None
+        self.creado = datetime.now(timezone(timedelta(hours=-5)))
+        self.terminado = None
+        self.terminado_ts = None
+        extension, self.mimetype = EXPORT_FORMATS[formato]
+        self.filename = export_filename(fecha_inicio, fecha_fin, extension)
+        self.path = os.path.join(directorio, f"{self.id}.{extension}")
+    
+    def to_dict(self) -> dict:
+        porcentaje = None
+        if self.estado == 'listo':
+            porcentaje = 100
+        elif self.total:
+            porcentaje = min(99, int(self.filas * 100 / self.total))
+        return {
+            'job_id': self.id,
+            'formato': self.formato,
+            'fecha_inicio': self.fecha_inicio,
+            'fecha_fin': self.fecha_fin,
+            'estado': self.estado,
+            'filas': self.filas,
+            'total': self.total,
+            'porcentaje': porcentaje,
+            'bytes': self.bytes,
+            'archivo': self.filename,
+            'error': self.error,
+            'creado': self.creado,
+            'terminado': self.terminado,
+        }
+
+
+class ExportJobService:
+    """Registro de trabajos de exportación + pool de hilos que los ejecuta."""
+    
+    def __init__(self):
+        self._jobs: Dict[str, ExportJob] = {}
+        self._por_clave: Dict[tuple, ExportJob] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._directorio: Optional[str] = None
+        self._ttl: Optional[float] = None
+    
+    def start(self, formato: str, fecha_inicio: Optional[str] = None,
+              fecha_fin: Optional[str] = None) -> Tuple[ExportJob, bool]:
+        """
+        Encola una exportación (requiere app context).
+        
+        Returns:
+            (trabajo, reutilizado): reutilizado es True si ya existía uno con
+            los mismos filtros y la misma versión de datos.
+        
+        Raises:
+            ValueError: formato desconocido o fechas inválidas
+        """
+        if formato not in EXPORT_FORMATS:
+            raise ValueError(f"Formato no soportado: {formato}")
+        if formato == 'parquet' and not parquet_available():
+            raise ValueError("Formato parquet no disponible: falta instalar pyarrow")
+        export_query(fecha_inicio, fecha_fin)  # Valida las fechas antes de encolar
+        
+        app = current_app._get_current_object()
+        config = app.config
+        directorio = self._preparar(config)
+        clave = (formato, fecha_inicio or '', fecha_fin or '',
+                 data_versions.epoch, data_versions.get('pesajes'))
+        
+        with self._lock:
+            self._purgar()
+            existente = self._por_clave.get(clave)
+            if existente is not None and existente.estado != 'error':
+                if existente.estado != 'listo' or os.path.exists(existente.path):
+                    return existente, True
+            
+            job = ExportJob(formato, fecha_inicio, fecha_fin, directorio, clave)
+            self._jobs[job.id] = job
+            self._por_clave[clave] = job
+        
+        log.info(f"Exportación {job.id} encolada ({formato}, {fecha_inicio} a {fecha_fin})")
+        self._executor.submit(self._run, app, job)
+        return job, False
+    
+    def get(self, job_id: str) -> Optional[ExportJob]:
+        """Trabajo por ID (None si no existe o ya venció)."""
+        with self._lock:
+            self._purgar()
+            return self._jobs.get(job_id)
+    
+    def _preparar(self, config) -> str:
+        """Crea el directorio y el pool la primera vez."""
+        with self._lock:
+            self._ttl = float(config.get('EXPORT_JOBS_TTL_SECONDS', 3600))
+            if self._executor is None:
+                self._directorio = config.get('EXPORT_JOBS_DIR') or os.path.join(
+                    tempfile.gettempdir(), 'pesajes_exports'
+                )
+                os.makedirs(self._directorio, exist_ok=True)
+                self._limpiar_huerfanos()
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(1, int(config.get('EXPORT_JOBS_WORKERS', 2))),
+                    thread_name_prefix='ExportJob',
+                )
+            return self._directorio
+    
+    def _limpiar_huerfanos(self):
+        """
+        Archivos de una ejecución anterior (el registro no sobrevive al reinicio).
+        Solo se borran los modificados hace más del TTL: los recientes pueden
+        ser trabajos vigentes de otro proceso que comparte la carpeta.
+        """
+        limite = time.time() - self._ttl
+        for nombre in os.listdir(self._directorio):
+            if not _ARCHIVO_JOB.match(nombre):
+                continue
+            path = os.path.join(self._directorio, nombre)
+            try:
+                if os.path.getmtime(path) < limite:
+                    os.remove(path)
+            except OSError:
+                pass
+    
+    def _purgar(self):
+        """Quita los trabajos terminados hace más del TTL y sus archivos (con el lock tomado)."""
+        if self._ttl is None:
+            return
+        limite = time.monotonic() - self._ttl
+        for job in list(self._jobs.values()):
+            if job.terminado_ts is None or job.terminado_ts > limite:
+                continue
+            self._jobs.pop(job.id, None)
+            if self._por_clave.get(job.clave) is job:
+                del self._por_clave[job.clave]
+            try:
+                os.remove(job.path)
+            except OSError:
+                pass
+    
+    def _run(self, app, job: ExportJob):
+        """Genera el archivo (hilo del pool)."""
+        parcial = job.path + '.part'
+        with app.app_context():
+            try:
+                job.estado = 'procesando'
+                query = export_query(job.fecha_inicio, job.fecha_fin)
+                job.total = query.order_by(None).count()
+                self._emit(job)
+                
+                write_export(job.formato, self._progreso(job, iter_export_batches(db.session, query)), parcial)
+                os.replace(parcial, job.path)
+                job.bytes = os.path.getsize(job.path)
+                job.estado = 'listo'
+                log.info(f"Exportación {job.id} lista: {job.filas} filas, {job.bytes} bytes")
+            except Exception as e:
+                job.estado = 'error'
+                job.error = str(e)
+                log.error(f"Error en exportación {job.id}: {e}")
+                try:
+                    os.remove(parcial)
+                except OSError:
+                    pass
+            finally:
+                job.terminado = datetime.now(timezone(timedelta(hours=-5)))
+                job.terminado_ts = time.monotonic()
+        self._emit(job)
+    
+    def _progreso(self, job: ExportJob, batches):
+        """Cuenta las filas de cada lote y emite el avance como máximo cada PROGRESS_INTERVAL."""
+        ultimo = time.monotonic()
+        for lote in batches:
+            job.filas += len(lote)
+            ahora = time.monotonic()
+            if ahora - ultimo >= PROGRESS_INTERVAL:
+                ultimo = ahora
+                self._emit(job)
+            yield lote
+    
+    def _emit(self, job: ExportJob):
+        try:
+            socketio.emit('export_progress', job.to_dict())
+        except Exception as e:
+            log.error(f"Error emitiendo export_progress ({job.id}): {e}")
+
+
+# Instancia global
+_export_jobs: Optional[ExportJobService] = None
+
+
+def get_export_jobs() -> ExportJobService:
+    """Obtiene el servicio de exportaciones en segundo plano."""
+    global _export_jobs
+    if _export_jobs is None:
+        _export_jobs = ExportJobService()
+    return _export_jobs
@@ -0,0 +1,376 @@
+"""
+Exportación de pesajes por streaming (xlsx, csv, ndjson, parquet).
+
+Las filas se leen con `yield_per` (lotes de EXPORT_YIELD_PER filas desde el
+cursor, sin cargar objetos ORM) y se escriben con la hoja write-only de
+openpyxl, que vuelca cada fila a un archivo temporal en vez de mantener las
+celdas en memoria. El ancho de las columnas se estima con el encabezado y
+las primeras EXCEL_WIDTH_SAMPLE filas (en modo write-only hay que fijarlo
+antes de escribir la primera fila). El archivo resultante se envía en
+bloques de EXPORT_CHUNK_SIZE bytes y se borra al terminar la respuesta.
+
+Los formatos para herramientas (csv, ndjson, parquet) no pasan por disco:
+cada uno es un generador que convierte cada lote del cursor en bytes y los
+entrega a la respuesta a medida que llegan. Usan los nombres de columna del
+modelo (EXPORT_KEYS) y valores sin formatear (fechas ISO 8601, booleanos).
+Parquet requiere pyarrow (opcional); cada row group junta hasta
+PARQUET_ROW_GROUP filas.
+"""
+import csv
+import io
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from typing import Iterable, Iterator, Optional, Sequence
+
+import openpyxl
+from openpyxl.utils import get_column_letter
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer
+
+from app.models.pesaje import Pesaje
+from app.utils.json_provider import dumps_bytes
+from app.utils.projection import Projection
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - depende del entorno
+    pyarrow = None
+
+EXPORT_YIELD_PER = 1000
+EXCEL_WIDTH_SAMPLE = 500
+EXCEL_MAX_WIDTH = 50
+EXPORT_CHUNK_SIZE = 64 * 1024
+PARQUET_ROW_GROUP = 50000
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# formato -> (extensión, mimetype)
+EXPORT_FORMATS = {
+    'xlsx': ('xlsx', XLSX_MIMETYPE),
+    'csv': ('csv', 'text/csv; charset=utf-8'),
+    'ndjson': ('ndjson', 'application/x-ndjson'),
+    'parquet': ('parquet', 'application/vnd.apache.parquet'),
+}
+
+
+def _fecha_hora(valor):
+    return valor.strftime('%Y-%m-%d %H:%M:%S') if valor else ''
+
+
+def _fecha(valor):
+    return valor.strftime('%Y-%m-%d') if valor else ''
+
+
+def _si_no(valor):
+    return "Sí" if valor else "No"
+
+
+# (encabezado, columna, formateador opcional)
+EXPORT_COLUMNS = [
+    ("ID", Pesaje.id, None),
+    ("Fecha/Hora", Pesaje.fecha_hora, _fecha_hora),
+    ("Peso (kg)", Pesaje.peso_kg, None),
+    ("Peso Unit. (g)", Pesaje.peso_unitario_teorico, None),
+    ("Nro OP", Pesaje.nro_op, None),
+    ("Turno", Pesaje.turno, None),
+    ("Fecha OT", Pesaje.fecha_orden_trabajo, _fecha),
+    ("Nro OT", Pesaje.nro_orden_trabajo, None),
+    ("Máquina", Pesaje.maquina, None),
+    ("Molde", Pesaje.molde, None),
+    ("Color", Pesaje.color, None),
+    ("Operador", Pesaje.operador, None),
+    ("Pieza SKU", Pesaje.pieza_sku, None),
+    ("Pieza Nombre", Pesaje.pieza_nombre, None),
+    ("Observaciones", Pesaje.observaciones, None),
+    ("Sincronizado", Pesaje.sincronizado, _si_no),
+]
+
+EXPORT_HEADERS = [encabezado for encabezado, _, _ in EXPORT_COLUMNS]
+_EXPORT = Projection([columna for _, columna, _ in EXPORT_COLUMNS])
+EXPORT_KEYS = _EXPORT.keys
+_FORMATOS = [(i, fmt) for i, (_, _, fmt) in enumerate(EXPORT_COLUMNS) if fmt]
+# Columnas datetime: csv.writer usaría str() ('2026-03-10 08:29:00'), no ISO 8601
+_FECHA_HORA_CSV = [i for i, columna in enumerate(_EXPORT.columns) if isinstance(columna.type, DateTime)]
+
+
+def parquet_available() -> bool:
+    return pyarrow is not None
+
+
+def export_query(fecha_inicio: Optional[str] = None, fecha_fin: Optional[str] = None):
+    """
+    Pesajes activos dentro del rango (YYYY-MM-DD, días completos en UTC-5),
+    del más reciente al más antiguo.
+    
+    Raises:
+        ValueError: si alguna fecha no tiene el formato YYYY-MM-DD
+    """
+    query = Pesaje.active()
+    
+    if fecha_inicio:
+        inicio = datetime.strptime(fecha_inicio, '%Y-%m-%d').date()
+        # Inicio del día en UTC-5
+        inicio_dt = datetime.combine(inicio, datetime.min.time(), tzinfo=timezone(timedelta(hours=-5)))
+        query = query.filter(Pesaje.fecha_hora >= inicio_dt)
+    
+    if fecha_fin:
+        fin = datetime.strptime(fecha_fin, '%Y-%m-%d').date()
+        # Fin del día en UTC-5
+        fin_dt = datetime.combine(fin, datetime.max.time(), tzinfo=timezone(timedelta(hours=-5)))
+        query = query.filter(Pesaje.fecha_hora <= fin_dt)
+    
+    return query.order_by(Pesaje.fecha_hora.desc())
+
+
+def iter_export_batches(session, query, yield_per: Optional[int] = None) -> Iterator[Sequence]:
+    """
+    Recorre `query` (Query ORM ya filtrada y ordenada) con un cursor del
+    servidor (`yield_per` activa stream_results) y entrega lotes de filas
+    planas con las columnas de EXPORT_COLUMNS.
+    """
+    resultado = session.execute(
+        _EXPORT.select(query),
+        execution_options={'yield_per': yield_per or EXPORT_YIELD_PER},
+    )
+    try:
+        yield from resultado.partitions()
+    finally:
+        resultado.close()
+
+
+def iter_export_rows(session, query, yield_per: Optional[int] = None) -> Iterator[list]:
+    """Filas de `query` con los valores ya formateados para la planilla."""
+    return format_rows(iter_export_batches(session, query, yield_per))
+
+
+def format_rows(batches: Iterable[Sequence]) -> Iterator[list]:
+    """Aplana los lotes y formatea fechas / booleanos como en la planilla."""
+    for lote in batches:
+        for row in lote:
+            fila = list(row)
+            for i, fmt in _FORMATOS:
+                fila[i] = fmt(fila[i])
+            yield fila
+
+
+def estimate_widths(headers: Sequence[str], sample: Iterable[Sequence]) -> list:
+    """Ancho por columna: valor más largo (encabezado + muestra) + 2, con tope."""
+    largos = [len(str(h)) for h in headers]
+    for fila in sample:
+        for i, valor in enumerate(fila):
+            n = len(str(valor))
+            if n > largos[i]:
+                largos[i] = n
+    return [min(n + 2, EXCEL_MAX_WIDTH) for n in largos]
+
+
+def write_xlsx(rows: Iterable[Sequence], destino, headers: Sequence[str] = EXPORT_HEADERS,
+               titulo: str = "Pesajes", width_sample: int = EXCEL_WIDTH_SAMPLE) -> int:
+    """
+    Escribe las filas en un .xlsx con la hoja write-only de openpyxl.
+
+    Args:
+        rows: Iterable de filas (se consume una sola vez)
+        destino: Ruta o archivo binario donde guardar el libro
+
+    Returns:
+        Cantidad de filas de datos escritas
+    """
+    rows = iter(rows)
+    muestra = list(islice(rows, width_sample))
+
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(titulo)
+    for i, ancho in enumerate(estimate_widths(headers, muestra), start=1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+
+    ws.append(list(headers))
+    total = 0
+    for fila in muestra:
+        ws.append(fila)
+        total += 1
+    for fila in rows:
+        ws.append(fila)
+        total += 1
+
+    wb.save(destino)
+    return total
+
+
+def csv_chunks(batches: Iterable[Sequence]) -> Iterator[bytes]:
+    """CSV UTF-8 con encabezado EXPORT_KEYS; un bloque de bytes por lote."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    writer.writerow(EXPORT_KEYS)
+    for lote in batches:
+        writer.writerows(_iso_csv(lote))
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _iso_csv(lote: Sequence) -> Iterator[list]:
+    """Filas del lote con las fechas/horas en ISO 8601 (igual que la API y ndjson)."""
+    for row in lote:
+        fila = list(row)
+        for i in _FECHA_HORA_CSV:
+            if fila[i] is not None:
+                fila[i] = fila[i].isoformat()
+        yield fila
+
+
+def ndjson_chunks(batches: Iterable[Sequence]) -> Iterator[bytes]:
+    """Un objeto JSON por línea (mismo serializador que la API)."""
+    serialize = _EXPORT.serialize
+    for lote in batches:
+        yield b''.join([dumps_bytes(serialize(row)) + b'\n' for row in lote])
+
+
+def _arrow_type(columna):
+    tipo = columna.type
+    if isinstance(tipo, Boolean):
+        return pyarrow.bool_()
+    if isinstance(tipo, Integer):
+        return pyarrow.int64()
+    if isinstance(tipo, Float):
+        return pyarrow.float64()
+    if isinstance(tipo, DateTime):
+        return pyarrow.timestamp('us')
+    if isinstance(tipo, Date):
+        return pyarrow.date32()
+    return pyarrow.string()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Destino de escritura que acumula bytes hasta que se los retira con drain()."""
+    
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+    
+    def tell(self):
+        return self._posicion
+    
+    def drain(self) -> bytes:
+        datos = b''.join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+def parquet_chunks(batches: Iterable[Sequence], row_group: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Parquet escrito por row groups a medida que llegan los lotes; cada row
+    group escrito se entrega de inmediato. Requiere pyarrow.
+    """
+    if pyarrow is None:
+        raise RuntimeError("La exportación parquet requiere pyarrow")
+    
+    row_group = row_group or PARQUET_ROW_GROUP
+    schema = pyarrow.schema([
+        (key, _arrow_type(columna)) for key, columna in zip(EXPORT_KEYS, _EXPORT.columns)
+    ])
+    sink = _ChunkSink()
+    pendientes = []
+    
+    def tabla(filas):
+        columnas = list(zip(*filas))
+        return pyarrow.Table.from_arrays(
+            [pyarrow.array(valores, type=campo.type) for valores, campo in zip(columnas, schema)],
+            schema=schema,
+        )
+    
+    writer = pyarrow.parquet.ParquetWriter(sink, schema)
+    try:
+        for lote in batches:
+            pendientes.extend(lote)
+            if len(pendientes) >= row_group:
+                writer.write_table(tabla(pendientes), row_group_size=row_group)
+                pendientes = []
+                yield sink.drain()
+        if pendientes:
+            writer.write_table(tabla(pendientes), row_group_size=row_group)
+    finally:
+        writer.close()
+    yield sink.drain()
+
+
+_GENERADORES = {
+    'csv': csv_chunks,
+    'ndjson': ndjson_chunks,
+    'parquet': parquet_chunks,
+}
+
+
+def export_chunks(formato: str, batches: Iterable[Sequence]) -> Iterator[bytes]:
+    """Generador de bytes para un formato de streaming (csv, ndjson, parquet)."""
+    return _GENERADORES[formato](batches)
+
+
+def write_export(formato: str, batches: Iterable[Sequence], path: str) -> int:
+    """
+    Escribe los lotes en `path` con el formato pedido (incluido xlsx).
+    
+    Returns:
+        Cantidad de filas escritas
+    """
+    if formato == 'xlsx':
+        return write_xlsx(format_rows(batches), path)
+    
+    total = 0
+    
+    def contar(lotes):
+        nonlocal total
+        for lote in lotes:
+            total += len(lote)
+            yield lote
+    
+    with open(path, 'wb') as f:
+        for bloque in export_chunks(formato, contar(batches)):
+            f.write(bloque)
+    return total
+
+
+def temp_export_path(suffix: str) -> str:
+    """Crea un archivo temporal vacío para una exportación y devuelve su ruta."""
+    fd, path = tempfile.mkstemp(prefix='pesajes_', suffix=suffix)
+    os.close(fd)
+    return path
+
+
+def stream_file(path: str, chunk_size: int = EXPORT_CHUNK_SIZE, delete: bool = True) -> Iterator[bytes]:
+    """Entrega el archivo en bloques; lo borra al terminar (o si se corta la descarga)."""
+    try:
+        with open(path, 'rb') as f:
+            while True:
+                bloque = f.read(chunk_size)
+                if not bloque:
+                    break
+                yield bloque
+    finally:
+        if delete:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def export_filename(fecha_inicio: Optional[str], fecha_fin: Optional[str], extension: str) -> str:
+    """pesajes[_<inicio>_a_<fin> | _desde_<inicio>].<extension>"""
+    rango_fechas = ""
+    if fecha_inicio and fecha_fin:
+        rango_fechas = f"_{fecha_inicio}_a_{fecha_fin}"
+    elif fecha_inicio:
+        rango_fechas = f"_desde_{fecha_inicio}"
+    return f"pesajes{rango_fechas}.{extension}"
@@ -0,0 +1,178 @@
+"""
+Totales de producción por (nro_op, molde, color) mantenidos incrementalmente.
+
+La tabla `pesajes_agregados` (PesajeAgregado) guarda total de kg, cantidad
+de bolsas y último pesaje de los pesajes activos de cada grupo. Se actualiza
+con triggers sobre `pesajes`, dentro de la misma transacción de la escritura,
+así que cubre todos los caminos: Pesaje vía ORM, INSERT masivo de /batch,
+edición, soft delete y Query.update() de /bulk-delete.
+
+- Alta (o fila que vuelve a estar activa): suma kg, +1 bolsa y
+  ultimo_pesaje = max(ultimo_pesaje, fecha_hora) con un UPSERT.
+- Baja (soft delete, DELETE, o el lado "viejo" de una edición): resta kg y
+  -1 bolsa; el grupo se borra al llegar a 0. Si la fila era la más reciente
+  del grupo, ultimo_pesaje se recalcula solo para ese grupo (el índice
+  ix_pesajes_nro_op acota la búsqueda a la OP).
+- Una edición que no toca las columnas de la clave, el peso, la fecha ni
+  deleted_at no dispara nada (UPDATE OF ...).
+
+Las lecturas de avance y OPs recorren esta tabla (O(grupos)) en vez de
+pesajes (O(filas)). Si la tabla quedara desfasada (escrituras con los
+triggers desactivados, restauraciones), rebuild_aggregates la recalcula;
+ver rebuild_agregados.py.
+"""
+from sqlalchemy import event, inspect, text
+
+from app.models.pesaje_agregado import PesajeAgregado
+from app.utils.logger import get_pesaje_logger
+
+log = get_pesaje_logger()
+
+# Columnas cuyo cambio afecta los totales
+_COLUMNAS = 'peso_kg, nro_op, molde, color, fecha_hora, deleted_at'
+
+
+def _clave(fila: str) -> str:
+    """Condición sobre la clave del grupo de `fila` (new / old)."""
+    return (f"nro_op = ifnull({fila}.nro_op, '') AND molde = ifnull({fila}.molde, '') "
+            f"AND color = ifnull({fila}.color, '')")
+
+
+def _sqlite_sumar(fila: str) -> str:
+    return f"""
+        INSERT INTO pesajes_agregados (nro_op, molde, color, total_kg, total_bolsas, ultimo_pesaje)
+        SELECT ifnull({fila}.nro_op, ''), ifnull({fila}.molde, ''), ifnull({fila}.color, ''),
+               ifnull({fila}.peso_kg, 0), 1, {fila}.fecha_hora
+        WHERE {fila}.deleted_at IS NULL
+        ON CONFLICT (nro_op, molde, color) DO UPDATE SET
+            total_kg = total_kg + excluded.total_kg,
+            total_bolsas = total_bolsas + 1,
+            ultimo_pesaje = max(ifnull(ultimo_pesaje, excluded.ultimo_pesaje), excluded.ultimo_pesaje);"""
+
+
+def _sqlite_restar(fila: str) -> str:
+    return f"""
+        UPDATE pesajes_agregados SET
+            total_kg = total_kg - ifnull({fila}.peso_kg, 0),
+            total_bolsas = total_bolsas - 1
+        WHERE {fila}.deleted_at IS NULL AND {_clave(fila)};
+        DELETE FROM pesajes_agregados WHERE total_bolsas <= 0 AND {_clave(fila)};
+        UPDATE pesajes_agregados SET ultimo_pesaje = (
+            SELECT max(p.fecha_hora) FROM pesajes p
+            WHERE p.deleted_at IS NULL
+              AND (p.nro_op = ifnull({fila}.nro_op, '') OR (ifnull({fila}.nro_op, '') = '' AND p.nro_op IS NULL))
+              AND ifnull(p.molde, '') = ifnull({fila}.molde, '')
+              AND ifnull(p.color, '') = ifnull({fila}.color, '')
+        )
+        WHERE {fila}.deleted_at IS NULL AND {_clave(fila)} AND ultimo_pesaje <= {fila}.fecha_hora;"""
+
+
+_SQLITE_DDL = [
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_agregados_ai AFTER INSERT ON pesajes BEGIN
+        {_sqlite_sumar('new')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_agregados_ad AFTER DELETE ON pesajes BEGIN
+        {_sqlite_restar('old')}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_agregados_au AFTER UPDATE OF {_COLUMNAS} ON pesajes BEGIN
+        {_sqlite_restar('old')}
+        {_sqlite_sumar('new')}
+    END""",
+]
+
+_POSTGRES_DDL = [
+    """CREATE OR REPLACE FUNCTION pesajes_agregados_sync() RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+            UPDATE pesajes_agregados SET
+                total_kg = total_kg - coalesce(OLD.peso_kg, 0),
+                total_bolsas = total_bolsas - 1
+            WHERE nro_op = coalesce(OLD.nro_op, '') AND molde = coalesce(OLD.molde, '')
+              AND color = coalesce(OLD.color, '');
+            DELETE FROM pesajes_agregados
+            WHERE total_bolsas <= 0 AND nro_op = coalesce(OLD.nro_op, '')
+              AND molde = coalesce(OLD.molde, '') AND color = coalesce(OLD.color, '');
+            UPDATE pesajes_agregados a SET ultimo_pesaje = (
+                SELECT max(p.fecha_hora) FROM pesajes p
+                WHERE p.deleted_at IS NULL
+                  AND (p.nro_op = a.nro_op OR (a.nro_op = '' AND p.nro_op IS NULL))
+                  AND coalesce(p.molde, '') = a.molde AND coalesce(p.color, '') = a.color
+            )
+            WHERE a.nro_op = coalesce(OLD.nro_op, '') AND a.molde = coalesce(OLD.molde, '')
+              AND a.color = coalesce(OLD.color, '') AND a.ultimo_pesaje <= OLD.fecha_hora;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+            INSERT INTO pesajes_agregados (nro_op, molde, color, total_kg, total_bolsas, ultimo_pesaje)
+            VALUES (coalesce(NEW.nro_op, ''), coalesce(NEW.molde, ''), coalesce(NEW.color, ''),
+                    coalesce(NEW.peso_kg, 0), 1, NEW.fecha_hora)
+            ON CONFLICT (nro_op, molde, color) DO UPDATE SET
+                total_kg = pesajes_agregados.total_kg + EXCLUDED.total_kg,
+                total_bolsas = pesajes_agregados.total_bolsas + 1,
+                ultimo_pesaje = GREATEST(pesajes_agregados.ultimo_pesaje, EXCLUDED.ultimo_pesaje);
+        END IF;
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql""",
+    "DROP TRIGGER IF EXISTS pesajes_agregados_trg ON pesajes",
+    f"""CREATE TRIGGER pesajes_agregados_trg
+        AFTER INSERT OR DELETE OR UPDATE OF {_COLUMNAS} ON pesajes
+        FOR EACH ROW EXECUTE FUNCTION pesajes_agregados_sync()""",
+]
+
+_REBUILD = [
+    "DELETE FROM pesajes_agregados",
+    """INSERT INTO pesajes_agregados (nro_op, molde, color, total_kg, total_bolsas, ultimo_pesaje)
+    SELECT coalesce(nro_op, ''), coalesce(molde, ''), coalesce(color, ''),
+           coalesce(sum(peso_kg), 0), count(*), max(fecha_hora)
+    FROM pesajes
+    WHERE deleted_at IS NULL
+    GROUP BY coalesce(nro_op, ''), coalesce(molde, ''), coalesce(color, '')""",
+]
+
+
+def install_triggers(connection):
+    """Crea (o reemplaza) los triggers del dialecto en uso (idempotente)."""
+    ddl = {'sqlite': _SQLITE_DDL, 'postgresql': _POSTGRES_DDL}.get(connection.dialect.name, [])
+    for statement in ddl:
+        connection.execute(text(statement))
+
+
+def rebuild_aggregates(connection) -> int:
+    """
+    Recalcula pesajes_agregados desde pesajes (en la transacción de `connection`).
+    
+    Returns:
+        Cantidad de grupos
+    """
+    for statement in _REBUILD:
+        connection.execute(text(statement))
+    return connection.execute(text("SELECT count(*) FROM pesajes_agregados")).scalar()
+
+
+def create_aggregates(database, engine):
+    """
+    Paso de migración: crea la tabla con sus triggers y la carga desde los
+    pesajes existentes (idempotente).
+    """
+    with engine.begin() as conn:
+        if inspect(conn).has_table(PesajeAgregado.__tablename__):
+            install_triggers(conn)
+            rebuild_aggregates(conn)
+        else:
+            PesajeAgregado.__table__.create(conn)  # after_create: triggers + carga
+        grupos = conn.execute(text("SELECT count(*) FROM pesajes_agregados")).scalar()
+    log.info(f"pesajes_agregados: {grupos} grupos")
+
+
+@event.listens_for(PesajeAgregado.__table__, 'after_create')
+def _after_create(target, connection, **kw):
+    # create_all() (bases nuevas, tests): la tabla nace con sus triggers.
+    # En una base anterior a las columnas de pesajes lo hace la migración 5.
+    inspector = inspect(connection)
+    if not inspector.has_table('pesajes'):
+        return
+    existentes = {c['name'] for c in inspector.get_columns('pesajes')}
+    if not existentes.issuperset(c.strip() for c in _COLUMNAS.split(',')):
+        return
+    install_triggers(connection)
+    rebuild_aggregates(connection)
@@ -0,0 +1,79 @@
+"""
+Redescubrimiento del puerto serial de la balanza.
+
+Cuando Windows o Linux re-enumeran el adaptador USB-serial puede aparecer con
+otro nombre (COM4 → COM7, /dev/ttyUSB0 → /dev/ttyUSB1). La identidad USB
+(VID/PID y número de serie) se aprende al conectar, o se fija por config,
+y con ella se busca el puerto nuevo en serial.tools.list_ports.
+"""
+from typing import Iterable, NamedTuple, Optional
+from serial.tools import list_ports
+
+
+class UsbIdentity(NamedTuple):
+    """Identidad USB de un adaptador serial."""
+    vid: Optional[int] = None
+    pid: Optional[int] = None
+    serial_number: Optional[str] = None
+    
+    @property
+    def is_empty(self) -> bool:
+        return self.vid is None and self.serial_number is None
+    
+    def matches(self, info) -> bool:
+        """Compara contra un ListPortInfo de pyserial."""
+        if self.serial_number and info.serial_number != self.serial_number:
+            return False
+        if self.vid is not None and info.vid != self.vid:
+            return False
+        if self.pid is not None and info.pid != self.pid:
+            return False
+        return not self.is_empty
+    
+    def to_dict(self) -> dict:
+        return {
+            'vid': f'{self.vid:04X}' if self.vid is not None else None,
+            'pid': f'{self.pid:04X}' if self.pid is not None else None,
+            'serial_number': self.serial_number,
+        }
+
+
+def parse_usb_id(value: Optional[str]) -> Optional[int]:
+    """Convierte un VID/PID en hex ('1A86' o '0x1a86') a entero."""
+    if not value:
+        return None
+    return int(value, 16)
+
+
+def identify_port(device: str) -> Optional[UsbIdentity]:
+    """
+    Obtiene la identidad USB del puerto `device` (None si no es USB o no existe).
+    """
+    for info in list_ports.comports():
+        if info.device == device and info.vid is not None:
+            return UsbIdentity(info.vid, info.pid, info.serial_number)
+    return None
+
+
+def find_port(identity: UsbIdentity, exclude: Iterable[str] = ()) -> Optional[str]:
+    """
+    Busca el puerto actual del adaptador con esa identidad.
+    
+    Sin número de serie, varios adaptadores con el mismo VID/PID son ambiguos
+    (podría ser la balanza de otra estación): en ese caso retorna None.
+    
+    Args:
+        exclude: puertos ya asignados a otras estaciones. Nunca se retornan: sin
+            número de serie, el único candidato visible mientras el adaptador
+            propio está desconectado puede ser el de otra estación.
+    """
+    if identity is None or identity.is_empty:
+        return None
+    exclude = set(exclude)
+    candidates = [
+        info.device for info in list_ports.comports()
+        if identity.matches(info) and info.device not in exclude
+    ]
+    if len(candidates) == 1 or (candidates and identity.serial_number):
+        return candidates[0]
+    return None
@@ -0,0 +1,122 @@
+"""
+Gestor de múltiples balanzas (estaciones de pesaje).
+
+Cada estación tiene su propio ScaleService (puerto, hilo lector, detector
+de protocolo y estabilizador). Las estaciones se configuran con
+SCALE_STATIONS, por ejemplo:
+
+    SCALE_STATIONS=linea1=COM4,linea2=COM5@19200
+
+Sin SCALE_STATIONS se crea una única estación 'default' con SCALE_PORT.
+"""
+import threading
+from functools import partial
+from typing import Dict, List, Optional, Set
+from flask import current_app
+
+from app.services.scale_service import ScaleService, DEFAULT_STATION
+
+
+def parse_stations(value: str) -> Dict[str, dict]:
+    """
+    Parsea SCALE_STATIONS: 'id=puerto[@baudios]' separados por coma.
+    
+    Returns:
+        {station_id: {'port': ..., 'baud_rate': ...}}
+    
+    Raises:
+        ValueError si alguna entrada está mal formada.
+    """
+    stations = {}
+    for entry in (value or '').split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        station_id, sep, port = entry.partition('=')
+        station_id, port = station_id.strip(), port.strip()
+        if not sep or not station_id or not port:
+            raise ValueError(f"Entrada inválida en SCALE_STATIONS: '{entry}' (usar id=puerto)")
+        
+        params = {'port': port}
+        if '@' in port:
+            port, baud = port.rsplit('@', 1)
+            params = {'port': port, 'baud_rate': int(baud)}
+        stations[station_id] = params
+    return stations
+
+
+class ScaleManager:
+    """Mantiene un ScaleService por estación."""
+    
+    def __init__(self, stations: Dict[str, dict]):
+        """
+        Args:
+            stations: {station_id: kwargs para ScaleService}
+        """
+        if not stations:
+            raise ValueError('Se requiere al menos una estación')
+        self._services: Dict[str, ScaleService] = {
+            station_id: ScaleService(station_id=station_id, **params)
+            for station_id, params in stations.items()
+        }
+        self.default_station = next(iter(self._services))
+        for station_id, service in self._services.items():
+            service.foreign_ports = partial(self.ports_in_use, exclude_station=station_id)
+    
+    @property
+    def station_ids(self) -> List[str]:
+        return list(self._services)
+    
+    def get(self, station_id: Optional[str] = None) -> ScaleService:
+        """
+        Obtiene el servicio de una estación.
+        
+        Raises:
+            ValueError si la estación no existe.
+        """
+        if not station_id:
+            station_id = self.default_station
+        try:
+            return self._services[station_id]
+        except KeyError:
+            raise ValueError(
+                f"Estación desconocida: '{station_id}'. "
+                f"Disponibles: {', '.join(self._services)}"
+            ) from None
+    
+    def services(self) -> List[ScaleService]:
+        return list(self._services.values())
+    
+    def ports_in_use(self, exclude_station: Optional[str] = None) -> Set[str]:
+        """Puertos asignados a las estaciones (salvo exclude_station)."""
+        return {
+            service.port for station_id, service in self._services.items()
+            if station_id != exclude_station
+        }
+    
+    def get_status(self) -> List[dict]:
+        return [service.get_status() for service in self._services.values()]
+    
+    def stop_all(self):
+        """Detiene la escucha y desconecta todas las estaciones."""
+        for service in self._services.values():
+            service.stop_listening()
+            service.disconnect()
+
+
+# Instancia global del gestor
+_scale_manager: Optional[ScaleManager] = None
+_scale_manager_lock = threading.Lock()
+
+
+def get_scale_manager() -> ScaleManager:
+    """Obtiene el gestor de balanzas (se crea desde la config en el primer uso)"""
+    global _scale_manager
+    if _scale_manager is None:
+        with _scale_manager_lock:
+            if _scale_manager is None:
+                stations = parse_stations(current_app.config.get('SCALE_STATIONS', ''))
+                if not stations:
+                    stations = {DEFAULT_STATION: {}}
+                _scale_manager = ScaleManager(stations)
+    return _scale_manager
@@ -0,0 +1,141 @@
+"""
+Métricas de ingesta de la balanza.
+
+Las escribe únicamente el hilo lector de cada estación (un solo escritor),
+así que no usan locks: son enteros/floats que se incrementan bajo el GIL y
+`snapshot()` los lee desde el hilo de la request. Una lectura concurrente
+puede ver un contador desfasado en una unidad, lo cual es aceptable para
+diagnóstico y no agrega costo al loop de lectura.
+"""
+import bisect
+import time
+from typing import Dict, List, Optional
+
+# Límites superiores (ms) de los buckets del histograma de latencia
+LATENCY_BUCKETS_MS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 25.0, 50.0, 100.0, 250.0, 500.0, 1000.0)
+
+# Ventana (segundos) para el cálculo de líneas por segundo
+RATE_WINDOW = 10
+
+
+class ScaleMetrics:
+    """Contadores de ingesta de una estación (single-writer, sin locks)."""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        self.started_at = time.monotonic()
+        self.lines_read = 0
+        self.bytes_received = 0
+        self.ignored_lines = 0
+        self.parse_ok: Dict[str, int] = {}
+        self.parse_fail: Dict[str, int] = {}
+        
+        self.reconnects = 0
+        self.downtime_total = 0.0
+        self._down_since: Optional[float] = None
+        
+        # Histograma de latencia primer byte de la línea→callback (+1 bucket de overflow)
+        self._latency_counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.latency_count = 0
+        self.latency_last_ms: Optional[float] = None
+        self.latency_max_ms = 0.0
+        self._latency_total_ms = 0.0
+        
+        # Ring de conteos por segundo para líneas/s
+        self._rate_secs = [0] * RATE_WINDOW
+        self._rate_counts = [0] * RATE_WINDOW
+    
+    # === Escritura (solo hilo lector) ===
+    
+    def record_line(self, nbytes: int, now: float):
+        """Una línea completa recibida (now: time.monotonic/perf_counter)."""
+        self.lines_read += 1
+        self.bytes_received += nbytes
+        
+        sec = int(now)
+        slot = sec % RATE_WINDOW
+        if self._rate_secs[slot] != sec:
+            self._rate_secs[slot] = sec
+            self._rate_counts[slot] = 0
+        self._rate_counts[slot] += 1
+    
+    def record_ignored(self):
+        self.ignored_lines += 1
+    
+    def record_parse(self, protocol: str, ok: bool):
+        counters = self.parse_ok if ok else self.parse_fail
+        counters[protocol] = counters.get(protocol, 0) + 1
+    
+    def record_latency(self, seconds: float):
+        ms = seconds * 1000.0
+        self._latency_counts[bisect.bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.latency_count += 1
+        self.latency_last_ms = ms
+        self._latency_total_ms += ms
+        if ms > self.latency_max_ms:
+            self.latency_max_ms = ms
+    
+    def mark_down(self):
+        """La balanza se desconectó (inicio de downtime)."""
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+    
+    def mark_up(self):
+        """La balanza se reconectó (fin de downtime)."""
+        if self._down_since is not None:
+            self.downtime_total += time.monotonic() - self._down_since
+            self._down_since = None
+            self.reconnects += 1
+    
+    # === Lectura (cualquier hilo) ===
+    
+    @property
+    def current_downtime(self) -> float:
+        down_since = self._down_since
+        return time.monotonic() - down_since if down_since is not None else 0.0
+    
+    def lines_per_second(self, now: float) -> float:
+        """Promedio de líneas/s de los últimos RATE_WINDOW segundos completos."""
+        sec = int(now)
+        total = sum(
+            count for s, count in zip(self._rate_secs, self._rate_counts)
+            if sec - RATE_WINDOW <= s < sec
+        )
+        return total / RATE_WINDOW
+    
+    def latency_summary(self) -> dict:
+        count = self.latency_count
+        return {
+            'count': count,
+            'last_ms': round(self.latency_last_ms, 3) if self.latency_last_ms is not None else None,
+            'avg_ms': round(self._latency_total_ms / count, 3) if count else None,
+            'max_ms': round(self.latency_max_ms, 3),
+        }
+    
+    def latency_histogram(self) -> List[dict]:
+        counts = list(self._latency_counts)
+        buckets = [{'le_ms': le, 'count': c} for le, c in zip(LATENCY_BUCKETS_MS, counts)]
+        buckets.append({'le_ms': None, 'count': counts[-1]})  # > último límite
+        return buckets
+    
+    def snapshot(self, now: float) -> dict:
+        """
+        Args:
+            now: Mismo reloj usado en record_line (time.perf_counter)
+        """
+        return {
+            'uptime_s': round(time.monotonic() - self.started_at, 3),
+            'lines_read': self.lines_read,
+            'lines_per_second': round(self.lines_per_second(now), 2),
+            'bytes_received': self.bytes_received,
+            'ignored_lines': self.ignored_lines,
+            'parse_ok': dict(self.parse_ok),
+            'parse_fail': dict(self.parse_fail),
+            'reconnects': self.reconnects,
+            'downtime_total_s': round(self.downtime_total + self.current_downtime, 3),
+            'current_downtime_s': round(self.current_downtime, 3),
+            'latency': self.latency_summary(),
+            'latency_histogram': self.latency_histogram(),
+        }
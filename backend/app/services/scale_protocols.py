@@ -0,0 +1,232 @@
+"""
+Registro de protocolos de salida de balanzas.
+
+Cada protocolo es un parser con nombre y regex precompilada sobre bytes,
+de modo que la línea cruda del puerto serial se parsea sin decode ni strip
+(fast path). Solo las líneas con bytes no-ASCII pasan por el camino lento
+(decode + regex de texto), que replica el comportamiento legacy.
+
+Para soportar un modelo nuevo de balanza basta con registrar un protocolo:
+
+    register_protocol(ScaleProtocol('mi_balanza', 'Descripción', rb'W:(\\d+\\.\\d+)'))
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+from app.utils.logger import get_balanza_logger
+
+log = get_balanza_logger()
+
+# Modo que prueba todos los protocolos en orden (comportamiento legacy)
+PROTOCOL_CASCADE = 'cascade'
+# Modo que detecta el protocolo a partir de las primeras líneas
+PROTOCOL_AUTO = 'auto'
+
+
+class ScaleProtocol:
+    """Parser de un formato de salida de balanza."""
+    
+    def __init__(self, name: str, description: str, pattern: bytes):
+        """
+        Args:
+            name: Identificador usado en SCALE_PROTOCOL (ej: 'net_ticket')
+            description: Descripción legible del formato
+            pattern: Regex sobre bytes; el grupo 1 debe capturar el peso
+        """
+        self.name = name
+        self.description = description
+        self.regex = re.compile(pattern)
+        self._text_regex = re.compile(pattern.decode('ascii'))
+    
+    def parse(self, raw: bytes) -> Optional[float]:
+        """
+        Extrae el peso de una línea cruda.
+        
+        Returns:
+            El peso en kg o None si la línea no corresponde a este formato.
+        """
+        if raw.isascii():
+            # Fast path: regex directo sobre los bytes, float() acepta bytes
+            match = self.regex.search(raw)
+        else:
+            # Camino lento: bytes basura intercalados, decodificar ignorando errores
+            match = self._text_regex.search(raw.decode('utf-8', errors='ignore'))
+        if match:
+            return float(match.group(1))
+        return None
+    
+    def __repr__(self):
+        return f'<ScaleProtocol {self.name}>'
+
+
+# Registro ordenado: el orden define la prioridad en modo cascade
+_PROTOCOLS: Dict[str, ScaleProtocol] = {}
+
+
+def register_protocol(protocol: ScaleProtocol) -> ScaleProtocol:
+    """Registra (o reemplaza) un protocolo en el registro global."""
+    _PROTOCOLS[protocol.name] = protocol
+    return protocol
+
+
+def get_protocol(name: str) -> ScaleProtocol:
+    """
+    Obtiene un protocolo registrado por nombre.
+    
+    Raises:
+        ValueError si el protocolo no existe.
+    """
+    try:
+        return _PROTOCOLS[name]
+    except KeyError:
+        raise ValueError(
+            f"Protocolo de balanza desconocido: '{name}'. "
+            f"Disponibles: {', '.join(_PROTOCOLS)}"
+        ) from None
+
+
+def list_protocols() -> List[ScaleProtocol]:
+    """Lista los protocolos registrados en orden de prioridad."""
+    return list(_PROTOCOLS.values())
+
+
+def is_ignored_line(raw: bytes) -> bool:
+    """Líneas decorativas del ticket o vacías que no contienen peso."""
+    return b'---' in raw or b'S/N' in raw or not raw.strip()
+
+
+def parse_cascade(raw: bytes) -> Optional[Tuple[ScaleProtocol, float]]:
+    """
+    Prueba todos los protocolos en orden de prioridad.
+    
+    Returns:
+        (protocolo, peso) del primer protocolo que reconoce la línea, o None.
+    """
+    for protocol in _PROTOCOLS.values():
+        weight = protocol.parse(raw)
+        if weight is not None:
+            return protocol, weight
+    return None
+
+
+class ProtocolDetector:
+    """
+    Detecta el protocolo de la balanza a partir de una ventana de muestras.
+    
+    Mientras muestrea, cada línea se parsea con todos los protocolos (como
+    en cascade) y se cuenta cuáles la reconocen. Al completar la ventana se
+    fija el protocolo con más aciertos (empates: el de mayor prioridad) y desde
+    entonces solo se usa ese parser. Tras `max_failures` fallos consecutivos
+    del parser fijado se vuelve a muestrear.
+    """
+    
+    def __init__(self, sample_size: int = 10, max_failures: int = 5):
+        self.sample_size = sample_size
+        self.max_failures = max_failures
+        self.reset()
+    
+    def reset(self):
+        """Descarta el protocolo detectado y reinicia el muestreo."""
+        self.protocol: Optional[ScaleProtocol] = None
+        self.confidence: Optional[float] = None
+        self._hits: Dict[str, int] = {}
+        # Protocolo que reconoció la última línea (None si ninguno)
+        self.last_protocol: Optional[str] = None
+        self._samples = 0
+        self._failures = 0
+    
+    @property
+    def detecting(self) -> bool:
+        return self.protocol is None
+    
+    def feed(self, raw: bytes) -> Optional[float]:
+        """
+        Parsea una línea (ya filtrada con is_ignored_line) y alimenta la detección.
+        
+        Returns:
+            El peso o None si la línea no pudo parsearse.
+        """
+        if self.protocol is not None:
+            self.last_protocol = self.protocol.name
+            weight = self.protocol.parse(raw)
+            if weight is not None:
+                self._failures = 0
+                return weight
+            
+            self._failures += 1
+            if self._failures >= self.max_failures:
+                log.warning(
+                    f"Protocolo '{self.protocol.name}' falló {self._failures} veces seguidas, "
+                    f"re-detectando..."
+                )
+                self.reset()
+            return None
+        
+        # Muestreo: probar todos, quedarse con el primer peso como lectura
+        weight = None
+        self.last_protocol = None
+        for protocol in _PROTOCOLS.values():
+            value = protocol.parse(raw)
+            if value is not None:
+                self._hits[protocol.name] = self._hits.get(protocol.name, 0) + 1
+                if weight is None:
+                    weight = value
+                    self.last_protocol = protocol.name
+        
+        self._samples += 1
+        if self._samples >= self.sample_size:
+            self._decide()
+        return weight
+    
+    def _decide(self):
+        """Fija el protocolo con más aciertos en la ventana."""
+        best, best_hits = None, 0
+        for protocol in _PROTOCOLS.values():
+            hits = self._hits.get(protocol.name, 0)
+            if hits > best_hits:
+                best, best_hits = protocol, hits
+        
+        if best is None:
+            # Ninguna línea reconocida: volver a muestrear
+            log.warning(f"Ningún protocolo reconoce las últimas {self._samples} líneas")
+            self.reset()
+            return
+        
+        self.protocol = best
+        self.confidence = round(best_hits / self._samples, 3)
+        self._failures = 0
+        log.info(f"Protocolo detectado: '{best.name}' (confianza {self.confidence:.0%})")
+    
+    def to_dict(self) -> dict:
+        return {
+            'protocol': self.protocol.name if self.protocol else None,
+            'confidence': self.confidence,
+            'detecting': self.detecting,
+        }
+
+
+# === Protocolos incluidos (orden = prioridad, del más específico al más genérico) ===
+
+register_protocol(ScaleProtocol(
+    'net_ticket', 'Ticket con peso neto: "2.7kg NET"',
+    rb"(\d+\.?\d*)kg\s+NET"
+))
+register_protocol(ScaleProtocol(
+    'ticket_numerado', 'Ticket numerado: "1.     2.1"',
+    rb"^\s*\d+\.\s+(\d+\.?\d*)"
+))
+register_protocol(ScaleProtocol(
+    'kg_suffix', 'Peso con unidad: "2.1 kg" o "2.1kg"',
+    rb"(\d+\.?\d*)\s*kg"
+))
+register_protocol(ScaleProtocol(
+    'bare_number', 'Solo número: "  2.1  "',
+    rb"^\s*(\d+\.?\d*)\s*$"
+))
+register_protocol(ScaleProtocol(
+    'gn_prefixed', 'Prefijo bruto/neto: "G 2.1" o "N 2.1"',
+    rb"[GN]\s*(\d+\.?\d*)"
+))
+register_protocol(ScaleProtocol(
+    'any_decimal', 'Cualquier número decimal en la línea',
+    rb"(\d+\.\d+)"
+))
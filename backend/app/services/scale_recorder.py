@@ -0,0 +1,162 @@
+"""
+Grabador de capturas crudas de la balanza.
+
+Escribe los bytes exactos de cada línea con timestamp monotónico en un
+archivo binario append-only, sin formatear logs en el hot path. Formato:
+
+    MAGIC (8 bytes) + registros
+
+    registro = kind (uint8) | t_ns (uint64) | length (uint16) | payload
+
+    - SESSION: t_ns = reloj de pared (time.time_ns) al abrir la sesión;
+      payload = monotonic_ns (uint64) de ese instante + station_id (utf-8)
+    - LINE: t_ns = time.monotonic_ns() al completarse la línea; payload = bytes crudos
+
+Cada apertura agrega un registro SESSION, así un mismo archivo acumula varias
+sesiones y los tiempos de pared se reconstruyen desde el monotónico. A la
+medianoche el grabador pasa al archivo del día siguiente (nueva sesión).
+"""
+import os
+import struct
+import time
+from datetime import datetime, timedelta
+from typing import Iterator, NamedTuple, Optional
+
+MAGIC = b'SCAPv1\n\x00'
+KIND_SESSION = 1
+KIND_LINE = 2
+
+_HEADER = struct.Struct('<BQH')
+_SESSION = struct.Struct('<Q')
+_MAX_PAYLOAD = 0xFFFF
+
+
+class CapturedLine(NamedTuple):
+    """Línea leída de una captura."""
+    station_id: str
+    wall_time: float     # Epoch (segundos) reconstruido desde la sesión
+    monotonic_ns: int
+    raw: bytes
+
+
+class CaptureRecorder:
+    """Grabador append-only de líneas crudas (un archivo por estación y día)."""
+    
+    def __init__(self, directory: str, station_id: str = 'default',
+                 flush_interval: float = 1.0):
+        self.directory = directory
+        self.station_id = station_id
+        self.flush_interval = flush_interval
+        self.path: Optional[str] = None
+        self._file = None
+        self._last_flush = 0.0
+        self._rollover_at = 0.0  # time.monotonic() de la próxima medianoche
+        self.lines = 0
+        self.bytes = 0
+    
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        now = datetime.now()
+        self.path = os.path.join(self.directory, f'{self.station_id}_{now.strftime("%Y%m%d")}.scap')
+        # Medianoche en reloj monotónico: el hot path no vuelve a consultar la fecha
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        self._rollover_at = time.monotonic() + (midnight - now).total_seconds()
+        self._file = open(self.path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+        
+        station = self.station_id.encode('utf-8')
+        payload = _SESSION.pack(time.monotonic_ns()) + station
+        self._file.write(_HEADER.pack(KIND_SESSION, time.time_ns(), len(payload)))
+        self._file.write(payload)
+        self._file.flush()
+        self._last_flush = time.monotonic()
+    
+    def record(self, raw: bytes, monotonic_ns: int = None):
+        """Agrega una línea cruda a la captura (abre el archivo en el primer uso)."""
+        now = time.monotonic()
+        if self._file is None:
+            self._open()
+        elif now >= self._rollover_at:
+            self.close()
+            self._open()
+        raw = raw[:_MAX_PAYLOAD]
+        self._file.write(_HEADER.pack(
+            KIND_LINE, monotonic_ns if monotonic_ns is not None else time.monotonic_ns(), len(raw)
+        ))
+        self._file.write(raw)
+        self.lines += 1
+        self.bytes += len(raw)
+        
+        # Flush acotado: ante un corte se pierde como máximo ~flush_interval
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush()
+            self._last_flush = now
+    
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def get_stats(self) -> dict:
+        return {
+            'path': self.path,
+            'lines': self.lines,
+            'bytes': self.bytes,
+        }
+
+
+def iter_capture(path: str) -> Iterator[CapturedLine]:
+    """
+    Recorre una captura binaria.
+    
+    Raises:
+        ValueError si el archivo no es una captura válida.
+    
+    Un registro final truncado (corte durante la escritura) se ignora.
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f'{path} no es una captura de balanza')
+        
+        station_id, wall_ns, mono_ns = '', 0, 0
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            kind, t_ns, length = _HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            
+            if kind == KIND_SESSION:
+                wall_ns = t_ns
+                (mono_ns,) = _SESSION.unpack_from(payload)
+                station_id = payload[_SESSION.size:].decode('utf-8', errors='replace')
+            elif kind == KIND_LINE:
+                wall_time = (wall_ns + (t_ns - mono_ns)) / 1e9
+                yield CapturedLine(station_id, wall_time, t_ns, payload)
+
+
+def is_capture_file(path: str) -> bool:
+    """Indica si el archivo es una captura binaria (por el MAGIC)."""
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def replay(path: str, speed: float = 1.0, max_gap: float = 5.0) -> Iterator[bytes]:
+    """
+    Reproduce una captura respetando los intervalos originales entre líneas.
+    
+    Args:
+        speed: Factor de velocidad (2.0 = el doble de rápido; 0 = sin esperas)
+        max_gap: Espera máxima entre dos líneas (pausas largas o cambio de sesión)
+    """
+    prev_ns = None
+    for line in iter_capture(path):
+        if speed > 0 and prev_ns is not None:
+            delay = (line.monotonic_ns - prev_ns) / 1e9 / speed
+            if delay > 0:
+                time.sleep(min(delay, max_gap))
+        prev_ns = line.monotonic_ns
+        yield line.raw
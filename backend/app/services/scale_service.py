@@ -1,51 +1,291 @@
+import os
+import random
 import serial
 import time
-import re
 import threading
-from typing import Optional, Callable
-from flask import current_app
-from app.utils.logger import get_balanza_logger
+from typing import Optional, Callable, Iterable
+from flask import current_app, has_app_context
+from app.utils.logger import get_balanza_logger, LOG_DIR
+from app.services.scale_protocols import (
+    PROTOCOL_AUTO,
+    PROTOCOL_CASCADE,
+    ProtocolDetector,
+    get_protocol,
+    is_ignored_line,
+    parse_cascade,
+)
+from app.services.weight_stabilizer import WeightStabilizer
+from app.services.scale_recorder import CaptureRecorder
+from app.services.scale_metrics import ScaleMetrics
+from app.services.port_discovery import UsbIdentity, find_port, identify_port, parse_usb_id
 
 # Logger para este módulo
 log = get_balanza_logger()
 
+# Modos de lectura del puerto serial
+READ_MODE_BLOCKING = 'blocking'  # readline con timeout: entrega la línea apenas llega el terminador
+READ_MODE_POLLING = 'polling'    # Legacy: revisa in_waiting y duerme entre pasadas
+
+LINE_TERMINATOR = b'\n'
+# Algunas balanzas terminan las líneas solo con \r
+CR_TERMINATOR = b'\r'
+# Sin terminador ni silencio (baud rate incorrecto, ruido) el buffer parcial se descarta
+MAX_LINE_BYTES = 256
+
+# Estación usada cuando no se configura SCALE_STATIONS
+DEFAULT_STATION = 'default'
+
+
+def _config(key: str, default):
+    """Lee un valor de config de Flask, o el default si no hay app context."""
+    if has_app_context():
+        return current_app.config.get(key, default)
+    return default
+
 
 class ScaleService:
     """Servicio para comunicación con la balanza vía puerto serial"""
     
-    def __init__(self, port: str = None, baud_rate: int = None):
-        self.port = port or current_app.config.get('SCALE_PORT', 'COM4')
-        self.baud_rate = baud_rate or current_app.config.get('SCALE_BAUD_RATE', 9600)
+    def __init__(self, port: str = None, baud_rate: int = None,
+                 read_mode: str = None, read_timeout: float = None,
+                 protocol: str = None, station_id: str = DEFAULT_STATION):
+        self.station_id = station_id
+        self.port = port or _config('SCALE_PORT', 'COM4')
+        self.baud_rate = baud_rate or _config('SCALE_BAUD_RATE', 9600)
+        self.read_mode = read_mode or _config('SCALE_READ_MODE', READ_MODE_BLOCKING)
+        self.read_timeout = read_timeout or _config('SCALE_READ_TIMEOUT', 0.5)
+        self.poll_interval = _config('SCALE_POLL_INTERVAL', 0.1)
+        self.protocol_name = protocol or _config('SCALE_PROTOCOL', PROTOCOL_AUTO)
         self.serial_connection: Optional[serial.Serial] = None
         self.is_listening = False
         self._listener_thread: Optional[threading.Thread] = None
+        # Permite interrumpir las esperas de reconexión al detener la escucha
+        self._stop_event = threading.Event()
+        
+        # Backoff de reconexión: primer reintento rápido con jitter, luego exponencial acotado
+        self.reconnect_first = _config('SCALE_RECONNECT_FIRST', 0.25)
+        self.reconnect_base = _config('SCALE_RECONNECT_BASE', 1.0)
+        self.reconnect_max = _config('SCALE_RECONNECT_MAX', 30.0)
+        
+        # Identidad USB para redescubrir el puerto si cambia de nombre
+        self.usb_identity = UsbIdentity(
+            parse_usb_id(_config('SCALE_USB_VID', None)),
+            parse_usb_id(_config('SCALE_USB_PID', None)),
+            _config('SCALE_USB_SERIAL', None) or None
+        )
+        # Puertos de las otras estaciones (lo asigna ScaleManager): no se redescubren
+        self.foreign_ports: Callable[[], Iterable[str]] = lambda: ()
+        
+        # Bytes recibidos sin terminador (modo blocking) e instante de su primer byte
+        self._partial_line = b''
+        self._partial_started_at: Optional[float] = None
+        # Instante (perf_counter) en que llegó el primer byte de la última línea entregada
+        self._line_started_at: Optional[float] = None
+        self.metrics = ScaleMetrics()
+        
+        # auto: detector; cascade: probar todos; otro: parser fijo por configuración
+        self._protocol = None
+        self._detector: Optional[ProtocolDetector] = None
+        if self.protocol_name == PROTOCOL_AUTO:
+            self._detector = ProtocolDetector(
+                sample_size=_config('SCALE_DETECT_SAMPLES', 10),
+                max_failures=_config('SCALE_DETECT_MAX_FAILURES', 5)
+            )
+        elif self.protocol_name != PROTOCOL_CASCADE:
+            self._protocol = get_protocol(self.protocol_name)
+        
+        # Captura cruda opcional (archivo binario append-only)
+        self.recorder: Optional[CaptureRecorder] = None
+        if _config('SCALE_CAPTURE_ENABLED', False):
+            self.recorder = CaptureRecorder(
+                _config('SCALE_CAPTURE_DIR', None) or os.path.join(LOG_DIR, 'captures'),
+                station_id=self.station_id
+            )
         
-        # Regex para capturar peso del ticket: "1.     2.1"
-        self.pattern = re.compile(r"^\s*\d+\.\s+(\d+\.?\d*)")
+        # Etapa de estabilización entre read_weight y el callback de peso estable
+        self.stabilizer = WeightStabilizer(
+            window=_config('SCALE_STABLE_WINDOW', 5),
+            tolerance=_config('SCALE_STABLE_TOLERANCE', 0.02),
+            min_dwell=_config('SCALE_STABLE_MIN_DWELL', 0.5)
+        )
     
     def connect(self) -> bool:
         """Establece conexión con la balanza"""
         try:
-            log.info(f"Intentando conectar a {self.port} @ {self.baud_rate}...")
-            self.serial_connection = serial.Serial(
-                port=self.port,
+            log.info(f"Intentando conectar a {self.port} @ {self.baud_rate} (modo {self.read_mode})...")
+            # serial_for_url acepta nombres de puerto normales (COM4, /dev/ttyUSB0)
+            # y también URLs de pyserial (loop://, socket://, rfc2217://)
+            self.serial_connection = serial.serial_for_url(
+                self.port,
                 baudrate=self.baud_rate,
                 bytesize=serial.EIGHTBITS,
                 parity=serial.PARITY_NONE,
                 stopbits=serial.STOPBITS_ONE,
-                timeout=1
+                timeout=self.read_timeout if self.read_mode == READ_MODE_BLOCKING else 1
             )
+            self._partial_line = b''
+            self._learn_usb_identity()
+            if self._detector is not None:
+                # Nueva sesión: volver a detectar con las primeras líneas
+                self._detector.reset()
+            self.stabilizer.reset()
             log.info(f"✅ Conexión exitosa en {self.port}")
             return True
         except serial.SerialException as e:
             log.error(f"Error conectando: {e}")
             return False
     
+    def _learn_usb_identity(self):
+        """Recuerda VID/PID/serie del puerto conectado (si no vino por config)."""
+        if not self.usb_identity.is_empty or '://' in self.port:
+            return
+        try:
+            identity = identify_port(self.port)
+        except Exception as e:
+            log.debug(f"No se pudo identificar {self.port}: {e}")
+            return
+        if identity is not None:
+            self.usb_identity = identity
+            log.info(f"Adaptador USB de {self.port}: {identity.to_dict()}")
+    
+    def _rediscover_port(self) -> bool:
+        """
+        Busca el adaptador por su identidad USB y actualiza self.port si cambió.
+        
+        Returns:
+            True si se encontró en un puerto distinto.
+        """
+        try:
+            new_port = find_port(self.usb_identity, exclude=self.foreign_ports())
+        except Exception as e:
+            log.debug(f"Error listando puertos: {e}")
+            return False
+        if new_port and new_port != self.port:
+            log.info(f"🔎 Balanza re-enumerada: {self.port} → {new_port}")
+            self.port = new_port
+            return True
+        return False
+    
+    def _reconnect_delays(self):
+        """Esperas entre reintentos: primero rápido con jitter, luego backoff exponencial."""
+        yield random.uniform(0, self.reconnect_first)
+        delay = self.reconnect_base
+        while True:
+            # Jitter para que varias estaciones no reintenten sincronizadas
+            yield random.uniform(delay / 2, delay)
+            delay = min(delay * 2, self.reconnect_max)
+    
+    def _reconnect(self, socketio=None) -> bool:
+        """
+        Reintenta la conexión hasta lograrla o hasta que se detenga la escucha.
+        
+        Returns:
+            True si se reconectó.
+        """
+        for attempt, delay in enumerate(self._reconnect_delays(), start=1):
+            if not self.is_listening:
+                return False
+            self._emit_status(socketio, False, stalled_s=round(self.metrics.current_downtime, 1),
+                              reconnect_attempt=attempt, next_retry_s=round(delay, 2))
+            if self._stop_event.wait(delay):
+                return False
+            
+            log.info(f"🔄 Intentando reconectar (intento {attempt})...")
+            if self.connect() or (self._rediscover_port() and self.connect()):
+                return True
+            log.warning(f"❌ Reconexión fallida (intento {attempt})")
+        return False
+    
     def disconnect(self):
         """Cierra la conexión con la balanza"""
+        # También corta una reconexión en curso
+        self.is_listening = False
+        self._stop_event.set()
+        # Esperar al lector antes de cerrar: puede estar dentro de read_until
+        # o de recorder.record (read_timeout acota la espera)
+        lector = self._listener_thread
+        if lector is not None and lector is not threading.current_thread():
+            lector.join(timeout=self.read_timeout + 2)
+            if lector.is_alive():
+                log.warning(f"El lector de {self.station_id} no terminó; la captura queda abierta")
+                return
+            self._listener_thread = None
         if self.serial_connection and self.serial_connection.is_open:
-            self.is_listening = False
             self.serial_connection.close()
+        if self.recorder is not None:
+            self.recorder.close()
+    
+    def _read_line(self) -> Optional[bytes]:
+        """
+        Lee una línea cruda del puerto según el modo configurado.
+        
+        - blocking: read(1) bloquea hasta el primer byte (se marca el inicio de
+          la línea para la métrica de latencia) y read_until hasta el terminador
+          o read_timeout, así la línea se entrega apenas llega sin dormir entre
+          lecturas. Los datos sin \n se acumulan; se cortan en \r si la balanza
+          usa ese terminador, se entregan como línea si el puerto queda en
+          silencio y se descartan si superan MAX_LINE_BYTES.
+        - polling: comportamiento legacy basado en in_waiting.
+        
+        Returns:
+            La línea en bytes (con terminador si lo tenía) o None si no hay.
+        """
+        if self.read_mode == READ_MODE_POLLING:
+            if self.serial_connection.in_waiting <= 0:
+                return None
+            # Los bytes ya esperaban en el buffer: no se sabe cuándo llegaron
+            self._line_started_at = time.perf_counter()
+            raw_data = self.serial_connection.readline()
+        else:
+            raw_data = self._take_cr_line()
+            if raw_data is None:
+                raw_data = self._read_blocking()
+            if raw_data is None:
+                return None
+        
+        self.metrics.record_line(len(raw_data), time.perf_counter())
+        if self.recorder is not None:
+            self.recorder.record(raw_data)
+        return raw_data
+    
+    def _read_blocking(self) -> Optional[bytes]:
+        """Una lectura del modo blocking (ver _read_line)."""
+        data = self.serial_connection.read(1)
+        if not data:
+            if not self._partial_line:
+                return None
+            # Timeout sin datos nuevos: la balanza no usa terminador \n
+            return self._pop_partial(len(self._partial_line))
+        
+        if not self._partial_line:
+            self._partial_started_at = time.perf_counter()
+        if data != LINE_TERMINATOR:
+            data += self.serial_connection.read_until(LINE_TERMINATOR)
+        self._partial_line += data
+        if data.endswith(LINE_TERMINATOR):
+            return self._pop_partial(len(self._partial_line))
+        
+        raw_data = self._take_cr_line()
+        if raw_data is None and len(self._partial_line) > MAX_LINE_BYTES:
+            log.warning(f"{self.station_id}: {len(self._partial_line)} bytes sin terminador, se descartan")
+            self.metrics.record_ignored()
+            self._partial_line = b''
+        return raw_data
+    
+    def _take_cr_line(self) -> Optional[bytes]:
+        """Saca del buffer parcial la primera línea terminada en \r, si hay."""
+        end = self._partial_line.find(CR_TERMINATOR)
+        if end < 0:
+            return None
+        return self._pop_partial(end + 1)
+    
+    def _pop_partial(self, end: int) -> bytes:
+        """Entrega los primeros `end` bytes del buffer parcial como línea."""
+        line, self._partial_line = self._partial_line[:end], self._partial_line[end:]
+        self._line_started_at = self._partial_started_at
+        # El resto llegó en la misma lectura: su inicio se aproxima con el instante actual
+        self._partial_started_at = time.perf_counter()
+        return line
     
     def read_weight(self) -> Optional[float]:
         """Lee un peso de la balanza (lectura única).
@@ -54,35 +294,29 @@ class ScaleService:
             raise serial.SerialException("Puerto serial no disponible")
         
         try:
-            if self.serial_connection.in_waiting > 0:
-                raw_data = self.serial_connection.readline()
-                line = raw_data.decode('utf-8', errors='ignore').strip()
-                
-                log.debug(f"Raw: {raw_data}")
-                log.debug(f"Line: '{line}'")
-                
+            raw_data = self._read_line()
+            if raw_data is not None:
                 # Ignorar líneas decorativas o vacías
-                if "---" in line or "S/N" in line or not line:
+                if is_ignored_line(raw_data):
+                    self.metrics.record_ignored()
                     return None
                 
-                # Múltiples patrones para diferentes formatos de balanza
-                patterns = [
-                    r"(\d+\.?\d*)kg\s+NET",           # "2.7kg NET" - formato de tu balanza!
-                    r"^\s*\d+\.\s+(\d+\.?\d*)",       # "1.     2.1"
-                    r"(\d+\.?\d*)\s*kg",             # "2.1 kg" o "2.1kg"
-                    r"^\s*(\d+\.?\d*)\s*$",          # "  2.1  " (solo número)
-                    r"[GN]\s*(\d+\.?\d*)",           # "G 2.1" o "N 2.1"
-                    r"(\d+\.\d+)",                    # Cualquier decimal
-                ]
+                if self._detector is not None:
+                    weight = self._detector.feed(raw_data)
+                    protocol_name = self._detector.last_protocol or PROTOCOL_AUTO
+                elif self._protocol is not None:
+                    weight = self._protocol.parse(raw_data)
+                    protocol_name = self._protocol.name
+                else:
+                    parsed = parse_cascade(raw_data)
+                    weight = parsed[1] if parsed else None
+                    protocol_name = parsed[0].name if parsed else PROTOCOL_CASCADE
+                self.metrics.record_parse(protocol_name, weight is not None)
                 
-                for pattern in patterns:
-                    match = re.search(pattern, line)
-                    if match:
-                        weight = float(match.group(1))
-                        log.info(f"Peso detectado: {weight} kg")
-                        return weight
+                if weight is not None:
+                    return weight
                 
-                log.warning(f"No se pudo parsear: '{line}'")
+                log.warning("No se pudo parsear: %r", raw_data)
                 
         except serial.SerialException:
             raise  # Propagar para que _listen_loop la maneje
@@ -91,35 +325,52 @@ class ScaleService:
         
         return None
     
-    def start_listening(self, callback: Callable[[float], None], socketio=None):
-        """Inicia escucha continua de la balanza en un hilo separado"""
+    def start_listening(self, callback: Callable[[float], None], socketio=None,
+                        on_stable: Callable[[float], None] = None,
+                        on_unstable: Callable[[float], None] = None):
+        """
+        Inicia escucha continua de la balanza en un hilo separado.
+        
+        Args:
+            callback: Recibe cada lectura cruda
+            socketio: Para emitir balanza_status en desconexiones
+            on_stable: Recibe solo los pesos estables (ver WeightStabilizer)
+            on_unstable: Recibe la lectura que saca al peso de la meseta estable
+        """
         if self.is_listening:
             return
         
         self.is_listening = True
+        self._stop_event.clear()
         self._listener_thread = threading.Thread(
             target=self._listen_loop,
-            args=(callback, socketio),
-            daemon=True
+            args=(callback, socketio, on_stable, on_unstable),
+            daemon=True,
+            name=f"ScaleReader-{self.station_id}"
         )
         self._listener_thread.start()
     
     def stop_listening(self):
         """Detiene la escucha continua"""
         self.is_listening = False
+        self._stop_event.set()
         if self._listener_thread:
             self._listener_thread.join(timeout=2)
     
-    def _emit_status(self, socketio, connected: bool):
-        """Emite estado de conexión vía WebSocket"""
+    def _emit_status(self, socketio, connected: bool, **extra):
+        """Emite estado de conexión vía WebSocket (extra: stalled_s, reconnect_attempt...)"""
         if socketio:
             socketio.emit('balanza_status', {
+                'estacion': self.station_id,
                 'connected': connected,
                 'listening': self.is_listening,
-                'port': self.port
+                'port': self.port,
+                **extra
             })
     
-    def _listen_loop(self, callback: Callable[[float], None], socketio=None):
+    def _listen_loop(self, callback: Callable[[float], None], socketio=None,
+                     on_stable: Callable[[float], None] = None,
+                     on_unstable: Callable[[float], None] = None):
         """Loop interno de escucha con auto-reconexión"""
         # Reutilizar conexión existente, solo conectar si no está abierta
         if not self.serial_connection or not self.serial_connection.is_open:
@@ -132,10 +383,12 @@ class ScaleService:
             try:
                 weight = self.read_weight()
                 if weight is not None:
-                    callback(weight)
-                time.sleep(0.1)
+                    self._dispatch_weight(weight, callback, on_stable, on_unstable)
+                if self.read_mode == READ_MODE_POLLING:
+                    time.sleep(self.poll_interval)
             except serial.SerialException:
                 log.warning("⚠️ Balanza desconectada físicamente")
+                self.metrics.mark_down()
                 self._emit_status(socketio, False)
                 
                 # Cerrar conexión rota
@@ -146,33 +399,62 @@ class ScaleService:
                     pass
                 self.serial_connection = None
                 
-                # Auto-reconexión
-                while self.is_listening:
-                    log.info("🔄 Intentando reconectar...")
-                    time.sleep(3)
-                    if self.connect():
-                        log.info("✅ Balanza reconectada")
-                        self._emit_status(socketio, True)
-                        break
-                    log.warning("❌ Reconexión fallida, reintentando en 3s...")
+                # Auto-reconexión con backoff (y redescubrimiento del puerto)
+                if self._reconnect(socketio):
+                    stalled = self.metrics.current_downtime
+                    self.metrics.mark_up()
+                    log.info(f"✅ Balanza reconectada en {self.port} tras {stalled:.1f}s")
+                    self._emit_status(socketio, True, stalled_s=round(stalled, 1))
+    
+    def _dispatch_weight(self, weight: float, callback: Callable[[float], None],
+                         on_stable: Callable[[float], None] = None,
+                         on_unstable: Callable[[float], None] = None):
+        """Entrega una lectura a los callbacks del loop de escucha (pasando por el estabilizador)."""
+        # Latencia desde el primer byte de la línea hasta entregarla al callback
+        self.metrics.record_latency(time.perf_counter() - self._line_started_at)
+        callback(weight)
+        if on_stable is not None:
+            stable = self.stabilizer.push(weight)
+            if stable is not None:
+                on_stable(stable)
+            elif self.stabilizer.plateau_ended and on_unstable is not None:
+                on_unstable(weight)
+    
+    @property
+    def active_protocol(self) -> Optional[str]:
+        """Nombre del protocolo en uso (None en cascade o mientras se detecta)."""
+        if self._detector is not None:
+            return self._detector.protocol.name if self._detector.protocol else None
+        return self._protocol.name if self._protocol else None
+    
+    def get_metrics(self) -> dict:
+        """Retorna las métricas de ingesta de la estación"""
+        metrics = self.metrics.snapshot(time.perf_counter())
+        metrics['estacion'] = self.station_id
+        metrics['protocol'] = self.active_protocol
+        return metrics
     
     def get_status(self) -> dict:
         """Retorna el estado de la conexión"""
         return {
+            'estacion': self.station_id,
             'port': self.port,
             'baud_rate': self.baud_rate,
             'connected': self.serial_connection is not None and self.serial_connection.is_open,
-            'listening': self.is_listening
+            'listening': self.is_listening,
+            'read_mode': self.read_mode,
+            'usb_identity': self.usb_identity.to_dict(),
+            'stalled_s': round(self.metrics.current_downtime, 1),
+            'protocol_mode': self.protocol_name,
+            'protocol': self.active_protocol,
+            'protocol_confidence': self._detector.confidence if self._detector else None,
+            'latency': self.metrics.latency_summary(),
+            'stabilizer': self.stabilizer.to_dict(),
+            'capture': self.recorder.get_stats() if self.recorder else None
         }
 
 
-# Instancia global del servicio
-_scale_service: Optional[ScaleService] = None
-
-
-def get_scale_service() -> ScaleService:
-    """Obtiene la instancia del servicio de balanza"""
-    global _scale_service
-    if _scale_service is None:
-        _scale_service = ScaleService()
-    return _scale_service
+def get_scale_service(station_id: str = None) -> ScaleService:
+    """Obtiene el servicio de balanza de una estación (default si no se indica)"""
+    from app.services.scale_manager import get_scale_manager
+    return get_scale_manager().get(station_id)
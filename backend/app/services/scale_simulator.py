@@ -0,0 +1,245 @@
+"""
+Balanza simulada sobre un pseudo-terminal (Linux/macOS).
+
+Alimenta a ScaleService por un pty real, así se ejercita el mismo camino que
+con la balanza física (pyserial, lector, parsers, reconexión) sin hardware:
+
+    sim = ScaleSimulator(synthetic_lines('net_ticket'), rate=500)
+    sim.start()
+    service = ScaleService(port=sim.port)   # Symlink estable al pty actual
+    ...
+    sim.stop()
+
+Fuentes de líneas:
+- synthetic_lines(): bolsas que se colocan, se asientan y se retiran,
+  con ruido configurable y el formato de cualquier protocolo incluido.
+- load_capture(): capturas grabadas: binarias de CaptureRecorder (.scap),
+  la salida de test_balanza_raw.py ("RAW BINARY: b'...'  ->  TEXT: '...'")
+  o texto plano (una línea por lectura).
+"""
+import ast
+import itertools
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+from app.services.scale_recorder import is_capture_file, iter_capture
+
+# Formato de línea de cada protocolo incluido ({w}: peso, {n}: número de ticket)
+LINE_FORMATS = {
+    'net_ticket': '   {w:.1f}kg NET\r\n',
+    'ticket_numerado': '{n}.     {w:.1f}\r\n',
+    'kg_suffix': '{w:.2f} kg\r\n',
+    'bare_number': '  {w:.2f}  \r\n',
+    'gn_prefixed': 'G {w:.2f}\r\n',
+    'any_decimal': 'ST,GS,+{w:07.2f}\r\n',
+}
+
+
+def synthetic_weights(target_kg: float = 12.5, empty_lines: int = 5, settle_lines: int = 8,
+                      hold_lines: int = 20, noise_kg: float = 0.05,
+                      seed: Optional[int] = None, rate: Optional[float] = None,
+                      hold_s: float = 1.0) -> Iterator[float]:
+    """
+    Genera pesos infinitos imitando bolsas: vacío → asentamiento con ruido
+    decreciente → meseta estable → retiro. Cada bolsa varía ±10% de target_kg.
+    
+    Con `rate` (líneas/s) la meseta dura al menos `hold_s` segundos: a tasas
+    altas hold_lines líneas pasan en milisegundos, menos que el min_dwell del
+    estabilizador, y ninguna bolsa llegaría a ser estable.
+    """
+    if rate:
+        hold_lines = max(hold_lines, math.ceil(hold_s * rate))
+    rnd = random.Random(seed)
+    while True:
+        for _ in range(empty_lines):
+            yield 0.0
+        
+        target = target_kg * rnd.uniform(0.9, 1.1)
+        for i in range(settle_lines):
+            amplitude = noise_kg * 10 * (settle_lines - i) / settle_lines
+            yield max(0.0, target + rnd.uniform(-amplitude, amplitude))
+        for _ in range(hold_lines):
+            yield target
+
+
+def synthetic_lines(protocol: str = 'net_ticket', **kwargs) -> Iterator[bytes]:
+    """Líneas crudas con el formato de `protocol` (ver LINE_FORMATS)."""
+    fmt = LINE_FORMATS[protocol]
+    for n, weight in enumerate(synthetic_weights(**kwargs), start=1):
+        yield fmt.format(w=weight, n=n).encode('ascii')
+
+
+def load_capture(path: str) -> List[bytes]:
+    """
+    Carga una captura grabada de la balanza.
+    
+    Acepta capturas binarias de CaptureRecorder, la salida de
+    test_balanza_raw.py (se usa el literal RAW BINARY, que conserva los bytes
+    exactos) o texto plano, una lectura por línea.
+    """
+    if is_capture_file(path):
+        return [line.raw for line in iter_capture(path)]
+    
+    lines = []
+    with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+        for text in f:
+            if text.startswith('RAW BINARY: '):
+                literal = text[len('RAW BINARY: '):].split('  ->  ', 1)[0].strip()
+                lines.append(ast.literal_eval(literal))
+            elif text.strip():
+                lines.append(text.rstrip('\r\n').encode('utf-8') + b'\r\n')
+    return lines
+
+
+class ScaleSimulator:
+    """Escribe líneas de balanza en un pty a una tasa configurable."""
+    
+    def __init__(self, lines: Iterable[bytes], rate: float = 10.0, jitter: float = 0.0,
+                 loop: bool = False, disconnect_every: float = None,
+                 disconnect_for: float = 1.0, start_delay: float = 0.0,
+                 link_path: str = None):
+        """
+        Args:
+            lines: Líneas crudas a enviar (iterable, puede ser infinito)
+            rate: Líneas por segundo
+            jitter: Variación aleatoria del intervalo entre líneas (fracción, 0-1)
+            loop: Repetir `lines` al terminar (requiere un iterable re-iterable)
+            disconnect_every: Segundos entre desconexiones simuladas (None = nunca)
+            disconnect_for: Duración de cada desconexión en segundos
+            start_delay: Espera antes de la primera línea (al abrir el puerto,
+                pyserial descarta lo que ya estaba en el buffer)
+            link_path: Ruta del symlink estable al pty (default: archivo temporal)
+        """
+        if os.name != 'posix':
+            raise RuntimeError('ScaleSimulator requiere un sistema con pty (Linux/macOS)')
+        if rate <= 0:
+            raise ValueError('rate debe ser > 0')
+        
+        self._lines = itertools.cycle(lines) if loop else iter(lines)
+        self.rate = rate
+        self.jitter = jitter
+        self.disconnect_every = disconnect_every
+        self.disconnect_for = disconnect_for
+        self.start_delay = start_delay
+        
+        if link_path is None:
+            link_path = os.path.join(tempfile.gettempdir(), f'scale-sim-{os.getpid()}-{id(self):x}')
+        self.port = link_path
+        
+        self._master: Optional[int] = None
+        self._slave: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        
+        self.lines_sent = 0
+        self.bytes_sent = 0
+        self.disconnects = 0
+        self.finished = threading.Event()
+    
+    def _open_pty(self):
+        import pty
+        import tty
+        self._master, self._slave = pty.openpty()
+        tty.setraw(self._slave)
+        # El symlink mantiene la misma ruta aunque el pty cambie al "reconectar"
+        tmp = f'{self.port}.tmp'
+        if os.path.lexists(tmp):
+            os.unlink(tmp)
+        os.symlink(os.ttyname(self._slave), tmp)
+        os.replace(tmp, self.port)
+    
+    def _close_pty(self):
+        for fd in (self._master, self._slave):
+            if fd is not None:
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+        self._master = self._slave = None
+    
+    def start(self):
+        """Abre el pty y empieza a enviar líneas en un hilo."""
+        self._open_pty()
+        self._stop.clear()
+        self.finished.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='ScaleSimulator')
+        self._thread.start()
+    
+    def stop(self):
+        """Detiene el envío, cierra el pty y elimina el symlink."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._close_pty()
+        if os.path.lexists(self.port):
+            os.unlink(self.port)
+    
+    def _run(self):
+        if self.start_delay and self._stop.wait(self.start_delay):
+            self.finished.set()
+            return
+        
+        interval = 1.0 / self.rate
+        next_at = time.perf_counter()
+        next_disconnect = time.monotonic() + self.disconnect_every if self.disconnect_every else None
+        
+        try:
+            for line in self._lines:
+                if self._stop.is_set():
+                    return
+                
+                if next_disconnect is not None and time.monotonic() >= next_disconnect:
+                    self._simulate_disconnect()
+                    if self._stop.is_set():
+                        return
+                    next_disconnect = time.monotonic() + self.disconnect_every
+                    next_at = time.perf_counter()
+                
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    os.write(self._master, line)
+                except OSError:
+                    return
+                self.lines_sent += 1
+                self.bytes_sent += len(line)
+                
+                step = interval
+                if self.jitter:
+                    step *= 1 + random.uniform(-self.jitter, self.jitter)
+                next_at += step
+        finally:
+            self.finished.set()
+    
+    def _simulate_disconnect(self):
+        """Cierra el pty (el lector ve el puerto caído) y lo recrea tras la pausa."""
+        self.disconnects += 1
+        self._close_pty()
+        if os.path.lexists(self.port):
+            os.unlink(self.port)
+        self._stop.wait(self.disconnect_for)
+        if not self._stop.is_set():
+            self._open_pty()
+    
+    def get_stats(self) -> dict:
+        return {
+            'port': self.port,
+            'rate': self.rate,
+            'lines_sent': self.lines_sent,
+            'bytes_sent': self.bytes_sent,
+            'disconnects': self.disconnects,
+        }
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,109 @@
+"""
+Índice de búsqueda por subcadena para buscar_pesajes.
+
+- SQLite: tabla FTS5 `pesajes_fts` (external content sobre pesajes, tokenizer
+  trigram) mantenida por triggers de INSERT / UPDATE / DELETE. El tokenizer
+  trigram resuelve `LIKE '%x%'` y `LIKE 'x%'` (sin distinguir mayúsculas)
+  desde el índice en vez de recorrer la tabla.
+- PostgreSQL: extensión pg_trgm + índices GIN; `ILIKE` los usa directamente.
+
+El índice conviene para términos selectivos. Para términos muy comunes
+(p.ej. un molde presente en un tercio de la tabla) es más rápido recorrer
+ix_pesajes_activos_fecha con ILIKE y cortar en el LIMIT de la página, así que
+substring_filter primero pide al índice hasta FTS_MAX_MATCHES ids y, si el
+término los supera, usa ILIKE.
+
+El soft delete no toca el índice: las filas eliminadas se descartan con el
+filtro deleted_at de Pesaje.active(), y el trigger de UPDATE solo reindexa
+cuando cambian las columnas buscables.
+"""
+from typing import Dict, Optional
+from sqlalchemy import and_, column, select, table, text
+
+# Columnas buscables (nombre del parámetro de /buscar -> columna)
+SEARCH_COLUMNS = {
+    'nro_op': 'nro_op',
+    'molde': 'molde',
+    'nro_ot': 'nro_orden_trabajo',
+}
+
+_COLS = ', '.join(SEARCH_COLUMNS.values())
+_NEW_COLS = ', '.join(f'new.{c}' for c in SEARCH_COLUMNS.values())
+_OLD_COLS = ', '.join(f'old.{c}' for c in SEARCH_COLUMNS.values())
+
+_SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS pesajes_fts USING fts5(
+        {_COLS}, content='pesajes', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_fts_ai AFTER INSERT ON pesajes BEGIN
+        INSERT INTO pesajes_fts(rowid, {_COLS}) VALUES (new.id, {_NEW_COLS});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_fts_ad AFTER DELETE ON pesajes BEGIN
+        INSERT INTO pesajes_fts(pesajes_fts, rowid, {_COLS}) VALUES ('delete', old.id, {_OLD_COLS});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS pesajes_fts_au AFTER UPDATE OF {_COLS} ON pesajes BEGIN
+        INSERT INTO pesajes_fts(pesajes_fts, rowid, {_COLS}) VALUES ('delete', old.id, {_OLD_COLS});
+        INSERT INTO pesajes_fts(rowid, {_COLS}) VALUES (new.id, {_NEW_COLS});
+    END""",
+    # Indexa las filas existentes
+    "INSERT INTO pesajes_fts(pesajes_fts) VALUES ('rebuild')",
+]
+
+_POSTGRES_DDL = ["CREATE EXTENSION IF NOT EXISTS pg_trgm"] + [
+    f"CREATE INDEX IF NOT EXISTS ix_pesajes_{col}_trgm ON pesajes USING gin ({col} gin_trgm_ops)"
+    for col in SEARCH_COLUMNS.values()
+]
+
+# Máximo de coincidencias para filtrar por ids del índice (si hay más, ILIKE)
+FTS_MAX_MATCHES = 2000
+
+_fts = table('pesajes_fts', column('rowid'), *(column(c) for c in SEARCH_COLUMNS.values()))
+
+# Disponibilidad de la tabla FTS por engine (se consulta una vez)
+_available: Dict[str, bool] = {}
+
+
+def create_search_index(database, engine):
+    """Paso de migración: crea el índice del dialecto en uso (idempotente)."""
+    ddl = {'sqlite': _SQLITE_DDL, 'postgresql': _POSTGRES_DDL}.get(engine.dialect.name, [])
+    with engine.begin() as conn:
+        for statement in ddl:
+            conn.execute(text(statement))
+    _available.pop(str(engine.url), None)
+
+
+def _fts_available(engine) -> bool:
+    key = str(engine.url)
+    if key not in _available:
+        with engine.connect() as conn:
+            _available[key] = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE name = 'pesajes_fts'"
+            )).first() is not None
+    return _available[key]
+
+
+def substring_filter(model, session, terms: Dict[str, str]) -> Optional[object]:
+    """
+    Criterio para filtrar `model` (Pesaje) por subcadena en varias columnas.
+    
+    Args:
+        terms: {columna: texto} con las columnas de SEARCH_COLUMNS.values()
+    
+    Returns:
+        Expresión para query.filter(), o None si no hay términos.
+    """
+    terms = {col: value for col, value in terms.items() if value}
+    if not terms:
+        return None
+    
+    engine = session.get_bind()
+    if engine.dialect.name == 'sqlite' and _fts_available(engine):
+        conditions = [_fts.c[col].like(f'%{value}%') for col, value in terms.items()]
+        ids = session.execute(
+            select(_fts.c.rowid).where(*conditions).limit(FTS_MAX_MATCHES + 1)
+        ).scalars().all()
+        if len(ids) <= FTS_MAX_MATCHES:
+            return model.id.in_(ids)
+    
+    # PostgreSQL (pg_trgm), SQLite sin índice o término poco selectivo: ILIKE
+    return and_(*(getattr(model, col).ilike(f'%{value}%') for col, value in terms.items()))
@@ -0,0 +1,131 @@
+"""
+Coalescing y rate limiting de las emisiones de peso vía Socket.IO.
+
+El hilo serial solo deja el último valor en un slot; un hilo emisor lo envía
+como máximo `max_rate_hz` veces por segundo y descarta valores idénticos al
+último emitido. Así una balanza muy habladora no satura el servidor
+Socket.IO (modo threading) ni la UI.
+
+El reloj es inyectable y, con `background=False`, no se crea el hilo: el
+llamador avanza el emisor con pump() (tests deterministas, sin sleeps).
+"""
+import threading
+import time
+from typing import Any, Callable, Optional
+
+_EMPTY = object()
+
+
+class CoalescingEmitter:
+    """Emisor que conserva solo el último valor y lo envía a tasa acotada."""
+    
+    def __init__(self, emit_fn: Callable[[Any], None], max_rate_hz: float = 10.0,
+                 name: str = 'PesoBroadcaster', clock: Callable[[], float] = time.monotonic,
+                 background: bool = True):
+        """
+        Args:
+            emit_fn: Función que realmente emite el valor (ej: socketio.emit)
+            max_rate_hz: Emisiones máximas por segundo
+            name: Nombre del hilo emisor
+            clock: Reloj monotónico en segundos
+            background: False = sin hilo emisor (el llamador invoca pump())
+        """
+        if max_rate_hz <= 0:
+            raise ValueError('max_rate_hz debe ser > 0')
+        self._emit_fn = emit_fn
+        self.interval = 1.0 / max_rate_hz
+        self.name = name
+        self._clock = clock
+        self._background = background
+        
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread: Optional[threading.Thread] = None
+        self._pending = _EMPTY
+        self._last_sent = _EMPTY
+        self._last_flush = float('-inf')
+        
+        # Contadores (antes y después del coalescing)
+        self.received = 0
+        self.emitted = 0
+        self.coalesced = 0   # Reemplazados por un valor más nuevo antes de emitirse
+        self.duplicates = 0  # Iguales al último emitido
+    
+    def submit(self, value: Any):
+        """Encola un valor (no bloquea, apto para el hilo serial)."""
+        with self._lock:
+            self.received += 1
+            if self._pending is not _EMPTY:
+                self.coalesced += 1
+            self._pending = value
+            if self._thread is None and self._background:
+                self._start()
+        self._wake.set()
+    
+    def _start(self):
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, daemon=True, name=self.name)
+        self._thread.start()
+    
+    def _run(self):
+        while True:
+            self._wake.wait()
+            if self._stop:
+                return
+            delay = self.pump()
+            if delay > 0:
+                time.sleep(delay)
+    
+    def pump(self) -> float:
+        """
+        Un paso del emisor: envía el valor pendiente si ya pasó el intervalo
+        mínimo desde la última emisión (si hubo silencio sale de inmediato).
+        
+        Returns:
+            Segundos que faltan para poder emitir, o 0 si se procesó el pendiente.
+        """
+        delay = self._last_flush + self.interval - self._clock()
+        if delay > 0:
+            return delay
+        
+        with self._lock:
+            self._wake.clear()
+            value, self._pending = self._pending, _EMPTY
+        if value is _EMPTY:
+            return 0.0
+        
+        self._last_flush = self._clock()
+        if value == self._last_sent:
+            self.duplicates += 1
+            return 0.0
+        self._last_sent = value
+        self.emitted += 1
+        try:
+            self._emit_fn(value)
+        except Exception:
+            pass  # Un cliente caído no debe matar el hilo emisor
+        return 0.0
+    
+    def reset(self):
+        """Olvida el último valor emitido (ej. al reiniciar la escucha)."""
+        with self._lock:
+            self._pending = _EMPTY
+            self._last_sent = _EMPTY
+    
+    def close(self):
+        """Detiene el hilo emisor."""
+        self._stop = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+    
+    def get_stats(self) -> dict:
+        return {
+            'max_rate_hz': round(1.0 / self.interval, 3),
+            'received': self.received,
+            'emitted': self.emitted,
+            'coalesced': self.coalesced,
+            'duplicates': self.duplicates,
+        }
@@ -0,0 +1,97 @@
+"""
+Detección de peso estable.
+
+Entre la lectura cruda de la balanza y la notificación a los clientes se
+ubica un buffer circular de tamaño fijo: un peso se considera estable cuando
+las últimas `window` lecturas están dentro de `tolerance` kg entre sí y se
+mantienen así al menos `min_dwell` segundos. Cada meseta se emite una sola
+vez; se vuelve a armar cuando el peso sale de la tolerancia, y en esa
+lectura `plateau_ended` queda en True (el peso deja de ser estable).
+"""
+import time
+from typing import Callable, Optional
+
+
+class WeightStabilizer:
+    """Estabilizador de lecturas con ring buffer de tamaño fijo."""
+    
+    def __init__(self, window: int = 5, tolerance: float = 0.02, min_dwell: float = 0.5,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            window: Cantidad de lecturas consecutivas evaluadas
+            tolerance: Diferencia máxima (kg) entre lecturas de la ventana
+            min_dwell: Segundos mínimos que el peso debe permanecer dentro de la tolerancia
+            clock: Reloj monotónico usado cuando push() no recibe timestamp
+        """
+        if window < 1:
+            raise ValueError('window debe ser >= 1')
+        self.window = window
+        self.tolerance = tolerance
+        self.min_dwell = min_dwell
+        self._clock = clock
+        
+        self._values = [0.0] * window
+        self._times = [0.0] * window
+        self.reset()
+    
+    def reset(self):
+        """Vacía el buffer (ej. al reconectar la balanza)."""
+        self._index = 0  # Próxima posición a escribir (= la más antigua cuando está lleno)
+        self._count = 0
+        self._settled_since: Optional[float] = None
+        self.stable_value: Optional[float] = None
+        self.plateau_ended = False
+    
+    def push(self, weight: float, timestamp: float = None) -> Optional[float]:
+        """
+        Agrega una lectura al buffer.
+        
+        Args:
+            weight: Peso leído (kg)
+            timestamp: Instante monotónico de la lectura (default: el reloj del estabilizador)
+        
+        Returns:
+            El peso estable si esta lectura completa una meseta nueva, o None.
+        """
+        now = self._clock() if timestamp is None else timestamp
+        self.plateau_ended = False
+        
+        self._values[self._index] = weight
+        self._times[self._index] = now
+        self._index = (self._index + 1) % self.window
+        if self._count < self.window:
+            self._count += 1
+        
+        # Ya se emitió esta meseta: no repetir mientras siga dentro de la tolerancia
+        if self.stable_value is not None:
+            if abs(weight - self.stable_value) <= self.tolerance:
+                return None
+            self.stable_value = None
+            self.plateau_ended = True
+        
+        if self._count < self.window:
+            return None
+        
+        if max(self._values) - min(self._values) > self.tolerance:
+            self._settled_since = None
+            return None
+        
+        if self._settled_since is None:
+            # La ventana entró en tolerancia: cuenta desde su lectura más antigua
+            self._settled_since = self._times[self._index]
+        
+        if now - self._settled_since < self.min_dwell:
+            return None
+        
+        self.stable_value = weight
+        self._settled_since = None
+        return weight
+    
+    def to_dict(self) -> dict:
+        return {
+            'window': self.window,
+            'tolerance': self.tolerance,
+            'min_dwell': self.min_dwell,
+            'stable_value': self.stable_value,
+        }
@@ -0,0 +1,71 @@
+"""
+Compresión de respuestas JSON (gzip / brotli).
+
+Se aplica en un after_request sobre las respuestas application/json de la
+API: si el cliente la acepta (Accept-Encoding) y el cuerpo supera
+COMPRESSION_MIN_BYTES, se comprime con brotli (si el paquete está instalado)
+o gzip, con los niveles configurados. Las respuestas chicas, las que ya
+tienen Content-Encoding, las de streaming (exportaciones, send_file) y las
+sin cuerpo (304, 204) se envían tal cual.
+
+Los ETag de la API son débiles, así que siguen siendo válidos para la
+versión comprimida; se agrega `Vary: Accept-Encoding` para los caches.
+"""
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depende del entorno
+    brotli = None
+
+_MIMETYPES = {'application/json'}
+
+
+def choose_encoding(accept_encodings, brotli_enabled: bool = True):
+    """Mejor codificación aceptada por el cliente: 'br', 'gzip' o None."""
+    if brotli is not None and brotli_enabled and accept_encodings.quality('br') > 0:
+        return 'br'
+    if accept_encodings.quality('gzip') > 0:
+        return 'gzip'
+    return None
+
+
+def compress(data: bytes, encoding: str, config) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(data, quality=int(config.get('COMPRESSION_BROTLI_QUALITY', 4)))
+    return gzip.compress(data, compresslevel=int(config.get('COMPRESSION_GZIP_LEVEL', 6)), mtime=0)
+
+
+def install(app):
+    """Registra la compresión de respuestas JSON en la app (si está habilitada)."""
+    if not app.config.get('COMPRESSION_ENABLED', True):
+        return
+    config = app.config
+    
+    @app.after_request
+    def comprimir_respuesta(response):
+        if (response.mimetype not in _MIMETYPES
+                or response.direct_passthrough
+                or response.is_streamed
+                or response.status_code < 200
+                or response.status_code in (204, 304)
+                or 'Content-Encoding' in response.headers):
+            return response
+        
+        response.vary.add('Accept-Encoding')
+        if response.content_length is not None and response.content_length < config.get('COMPRESSION_MIN_BYTES', 1024):
+            return response
+        
+        encoding = choose_encoding(request.accept_encodings, config.get('COMPRESSION_BROTLI_ENABLED', True))
+        if encoding is None:
+            return response
+        
+        data = response.get_data()
+        if len(data) < config.get('COMPRESSION_MIN_BYTES', 1024):
+            return response
+        
+        response.set_data(compress(data, encoding, config))
+        response.headers['Content-Encoding'] = encoding
+        return response
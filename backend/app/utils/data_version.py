@@ -0,0 +1,123 @@
+"""
+Versión de datos por tabla para ETag / GET condicional.
+
+Cada commit que escribió en una tabla incrementa su contador en memoria. Eso
+incluye flush del ORM, Query.update()/delete() y insert()/update() ejecutados
+por la sesión. Las rutas de lectura decoradas con @etag_por_version arman el
+ETag con las versiones de sus tablas. Si el cliente ya tiene esa versión
+(If-None-Match), responden 304 sin consultar ni serializar nada.
+
+Los contadores se incrementan después del commit: un lector nunca ve una
+versión nueva con datos viejos. El ETag incluye un identificador del proceso
+para que un reinicio (contadores en 0) no reutilice ETags anteriores.
+Escrituras hechas fuera de la aplicación (scripts, otra instancia) no se
+detectan.
+"""
+import threading
+import uuid
+from collections import defaultdict
+from functools import wraps
+from typing import Dict, Iterable
+
+from flask import make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_INFO_KEY = 'tablas_modificadas'
+
+
+class DataVersions:
+    """Contadores monotónicos por tabla."""
+    
+    def __init__(self):
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def bump(self, tables: Iterable[str]):
+        with self._lock:
+            for table in tables:
+                self._versions[table] += 1
+    
+    def get(self, table: str) -> int:
+        return self._versions.get(table, 0)
+    
+    def etag(self, tables: Iterable[str]) -> str:
+        return self.epoch + '-' + '.'.join(str(self.get(t)) for t in tables)
+    
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._versions)
+
+
+data_versions = DataVersions()
+
+
+# --- Seguimiento de escrituras en la sesión --------------------------------
+
+def _mark(session, tables):
+    session.info.setdefault(_INFO_KEY, set()).update(tables)
+
+
+def _after_flush(session, flush_context):
+    tables = {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, '__table__')
+    }
+    if tables:
+        _mark(session, tables)
+
+
+def _do_orm_execute(state):
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, 'table', None)
+        if table is not None:
+            _mark(state.session, {table.name})
+
+
+def _after_commit(session):
+    tables = session.info.pop(_INFO_KEY, None)
+    if tables:
+        data_versions.bump(tables)
+
+
+def _after_rollback(session):
+    session.info.pop(_INFO_KEY, None)
+
+
+def install():
+    """Registra los eventos de sesión (idempotente)."""
+    if event.contains(Session, 'after_commit', _after_commit):
+        return
+    event.listen(Session, 'after_flush', _after_flush)
+    event.listen(Session, 'do_orm_execute', _do_orm_execute)
+    event.listen(Session, 'after_commit', _after_commit)
+    event.listen(Session, 'after_rollback', _after_rollback)
+
+
+# --- Rutas -----------------------------------------------------------------
+
+def etag_por_version(*tables: str):
+    """
+    Decorador para rutas GET que solo dependen de `tables`.
+    Responde 304 si If-None-Match coincide; si no, agrega ETag a la respuesta.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            # Versión leída antes de armar la respuesta: si llega una escritura
+            # mientras tanto, el cliente simplemente vuelve a pedir.
+            etag = data_versions.etag(tables)
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # El navegador guarda la respuesta pero siempre revalida con If-None-Match
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,86 @@
+"""
+Proveedor JSON de la aplicación.
+
+Usa orjson si está instalado (serializa datetime/date/time nativamente, en
+el mismo formato que isoformat()) y si no, el módulo json estándar con un
+`default` que también emite ISO 8601. Así los modelos y proyecciones pueden
+entregar fechas sin convertirlas fila por fila.
+
+El mismo serializador se usa para los eventos Socket.IO (SocketJSON), que
+se emiten también desde hilos sin app context.
+"""
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, time
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(o):
+    """Tipos que ni orjson ni json serializan por sí solos."""
+    if isinstance(o, (datetime, date, time)):
+        return o.isoformat()
+    if isinstance(o, (decimal.Decimal, uuid.UUID)):
+        return str(o)
+    if dataclasses.is_dataclass(o) and not isinstance(o, type):
+        return dataclasses.asdict(o)
+    if hasattr(o, '__html__'):
+        return str(o.__html__())
+    raise TypeError(f'Object of type {type(o).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj, indent: bool = False) -> bytes:
+    """Serializa a bytes UTF-8 (camino rápido para respuestas)."""
+    if orjson is not None:
+        option = _ORJSON_OPTIONS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=_default, option=option)
+    return json.dumps(obj, default=_default, ensure_ascii=False,
+                      indent=2 if indent else None).encode('utf-8')
+
+
+class AppJSONProvider(DefaultJSONProvider):
+    """Proveedor para Flask: orjson si está disponible, json estándar si no."""
+    
+    default = staticmethod(_default)
+    sort_keys = False
+    
+    @property
+    def backend(self) -> str:
+        return 'orjson' if orjson is not None else 'json'
+    
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            # Argumentos propios de json (indent, separators...) -> json estándar
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(dumps_bytes(obj, indent=indent), mimetype=self.mimetype)
+
+
+class SocketJSON:
+    """Módulo `json` para python-socketio (dumps/loads sin app context)."""
+    
+    @staticmethod
+    def dumps(obj, **kwargs) -> str:
+        return dumps_bytes(obj).decode('utf-8')
+    
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s) if orjson is not None else json.loads(s)
@@ -0,0 +1,87 @@
+"""
+Paginación por cursor (keyset) sobre (fecha_hora, id) descendente.
+
+A diferencia de `.paginate()` (COUNT(*) + OFFSET en cada página), cada
+página es un rango del índice ix_pesajes_activos_fecha a partir de la
+última fila vista, así que la latencia no depende de la profundidad.
+El total exacto es opcional y se cachea unos segundos por filtro.
+"""
+import base64
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Optional, Tuple
+
+from sqlalchemy import tuple_
+
+
+def encode_cursor(fecha_hora: datetime, id: int) -> str:
+    """Token opaco para la fila siguiente a (fecha_hora, id)."""
+    raw = json.dumps([fecha_hora.isoformat(), id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> Tuple[datetime, int]:
+    """Decodifica un cursor. Lanza ValueError si es inválido."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        fecha_iso, id = json.loads(raw)
+        return datetime.fromisoformat(fecha_iso), int(id)
+    except Exception:
+        raise ValueError('cursor inválido')
+
+
+def keyset_page(session, statement, model, per_page: int, cursor: Optional[str] = None) -> dict:
+    """
+    Aplica orden (fecha_hora DESC, id DESC) + cursor a un SELECT y trae una página.
+    El SELECT debe incluir las columnas fecha_hora e id.
+    
+    Returns:
+        {'items': [Row...], 'next_cursor': str | None, 'has_more': bool}
+    
+    Raises:
+        ValueError: per_page < 1 (LIMIT negativo en SQLite = sin límite)
+    """
+    if per_page < 1:
+        raise ValueError('per_page debe ser >= 1')
+    if cursor:
+        fecha_hora, id = decode_cursor(cursor)
+        statement = statement.where(tuple_(model.fecha_hora, model.id) < tuple_(fecha_hora, id))
+    
+    statement = statement.order_by(model.fecha_hora.desc(), model.id.desc()).limit(per_page + 1)
+    rows = session.execute(statement).all()
+    has_more = len(rows) > per_page
+    items = rows[:per_page]
+    
+    return {
+        'items': items,
+        'next_cursor': encode_cursor(items[-1].fecha_hora, items[-1].id) if has_more else None,
+        'has_more': has_more,
+    }
+
+
+class TotalsCache:
+    """COUNT(*) por filtro, cacheado unos segundos."""
+    
+    def __init__(self):
+        self._values = {}
+        self._lock = threading.Lock()
+    
+    def get(self, key, count_fn, ttl: float) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._values.get(key)
+        if cached and now - cached[1] < ttl:
+            return cached[0]
+        
+        total = count_fn()
+        with self._lock:
+            if len(self._values) > 256:
+                self._values.clear()
+            self._values[key] = (total, now)
+        return total
+    
+    def clear(self):
+        with self._lock:
+            self._values.clear()
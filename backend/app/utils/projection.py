@@ -0,0 +1,43 @@
+"""
+Capa de lectura por proyección de columnas.
+
+Los listados no necesitan objetos ORM: una Projection selecciona solo las
+columnas indicadas (SQLAlchemy Core, filas planas) y las convierte a dict
+con una función generada una sola vez por proyección, sin getattr ni
+bucles por columna en cada fila. Las fechas quedan como datetime/date: el
+proveedor JSON (app/utils/json_provider.py) las emite en ISO 8601.
+"""
+from typing import Callable, List, Sequence
+
+
+def _compile_serializer(keys: Sequence[str]) -> Callable:
+    """Genera `def serialize(r): return {...}` con accesos por índice."""
+    fields = [f"{key!r}: r[{i}]" for i, key in enumerate(keys)]
+    source = "def serialize(r):\n    return {" + ", ".join(fields) + "}\n"
+    namespace = {}
+    exec(compile(source, '<projection>', 'exec'), namespace)
+    return namespace['serialize']
+
+
+class Projection:
+    """Conjunto de columnas de lectura + serializador precompilado."""
+    
+    def __init__(self, columns: Sequence, keys: Sequence[str] = None):
+        """
+        Args:
+            columns: Columnas instrumentadas (ej: Pesaje.id, Pesaje.fecha_hora)
+            keys: Nombres en el dict (default: nombre de la columna)
+        """
+        self.columns = list(columns)
+        self.keys = list(keys) if keys else [c.key for c in self.columns]
+        self.serialize = _compile_serializer(self.keys)
+    
+    def select(self, query):
+        """Core SELECT con los filtros de `query` (Query ORM o Select) y solo estas columnas."""
+        statement = getattr(query, 'statement', query)
+        return statement.with_only_columns(*self.columns)
+    
+    def all(self, session, query) -> List[dict]:
+        """Ejecuta y serializa todas las filas."""
+        serialize = self.serialize
+        return [serialize(row) for row in session.execute(self.select(query))]
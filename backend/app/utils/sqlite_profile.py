@@ -0,0 +1,80 @@
+"""
+Perfil de rendimiento para SQLite.
+
+Request threads, SyncWorker y los hilos lectores de balanza comparten la
+misma base. En modo WAL los lectores no bloquean al escritor (ni viceversa)
+y busy_timeout hace que un escritor espere al otro en vez de fallar con
+"database is locked".
+
+Se aplica automáticamente cuando SQLALCHEMY_DATABASE_URI es SQLite y
+SQLITE_TUNING_ENABLED está activo.
+"""
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def is_sqlite(uri: str) -> bool:
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def _is_memory(uri: str) -> bool:
+    database = make_url(uri).database
+    return not database or database == ':memory:' or 'mode=memory' in uri
+
+
+def engine_options(config) -> dict:
+    """
+    Opciones de engine (pool + connect_args) para una URI SQLite en archivo.
+    Las bases en memoria usan StaticPool (Flask-SQLAlchemy) y no admiten pool_size.
+    """
+    uri = config['SQLALCHEMY_DATABASE_URI']
+    if not is_sqlite(uri) or _is_memory(uri):
+        return {}
+    
+    return {
+        'pool_size': config['SQLITE_POOL_SIZE'],
+        'max_overflow': config['SQLITE_POOL_MAX_OVERFLOW'],
+        'pool_timeout': 30,
+        'connect_args': {
+            # Las conexiones del pool se reparten entre hilos
+            'check_same_thread': False,
+            # Timeout del driver (segundos); el PRAGMA busy_timeout queda igual
+            'timeout': config['SQLITE_BUSY_TIMEOUT_MS'] / 1000,
+        },
+    }
+
+
+def pragmas(config) -> list:
+    """PRAGMAs ejecutados en cada conexión nueva, en orden."""
+    return [
+        f"PRAGMA journal_mode={config['SQLITE_JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SQLITE_SYNCHRONOUS']}",
+        # Negativo = KiB (independiente del page_size)
+        f"PRAGMA cache_size=-{config['SQLITE_CACHE_SIZE_KB']}",
+        f"PRAGMA mmap_size={config['SQLITE_MMAP_SIZE']}",
+        f"PRAGMA busy_timeout={config['SQLITE_BUSY_TIMEOUT_MS']}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def install(engine, config):
+    """Registra los PRAGMAs en el evento 'connect' del engine."""
+    statements = pragmas(config)
+    
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def describe(engine) -> dict:
+    """Valores efectivos de los PRAGMAs (diagnóstico y benchmarks)."""
+    with engine.connect() as conn:
+        return {
+            name: conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            for name in ('journal_mode', 'synchronous', 'cache_size', 'mmap_size', 'busy_timeout')
+        }
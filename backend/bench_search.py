@@ -0,0 +1,67 @@
+"""
+Benchmark de buscar_pesajes: ILIKE '%x%' (recorre la tabla) vs índice de
+búsqueda (FTS5 trigram, con vuelta a ILIKE para términos muy comunes).
+
+Ejemplo:
+    python bench_search.py --rows 2000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    tmp = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    os.environ['SYNC_ENABLED'] = 'false'
+    
+    import logging
+    logging.disable(logging.CRITICAL)
+    from sqlalchemy import and_
+    from app import create_app, db
+    from app.models.pesaje import Pesaje
+    from app.services.search_index import substring_filter
+    
+    app = create_app()
+    moldes = ['CERNIDOR ROMANO', 'TAPA ROSCA', 'BALDE 20L', 'JARRA 2L', 'BANDEJA', 'PORTACUBIERTO']
+    rnd = random.Random(1)
+    
+    with app.app_context():
+        t0 = time.perf_counter()
+        for start in range(0, args.rows, 50_000):
+            db.session.execute(db.insert(Pesaje), [
+                {'peso_kg': 10.0, 'nro_op': f'OP{rnd.randint(1, 90_000)}',
+                 'molde': rnd.choice(moldes), 'nro_orden_trabajo': f'{i % 10_000:04d}'}
+                for i in range(start, min(start + 50_000, args.rows))
+            ])
+            db.session.commit()
+        print(f"{args.rows} pesajes insertados (con triggers FTS) en {time.perf_counter() - t0:.1f}s")
+        
+        casos = [
+            ('OP raro (nro_op=OP8765)', {'nro_op': 'OP8765'}),
+            ('molde común (molde=ROMANO)', {'molde': 'ROMANO'}),
+            ('OP + molde (nro_op=1354, molde=TAPA)', {'nro_op': '1354', 'molde': 'TAPA'}),
+        ]
+        for nombre, terms in casos:
+            ilike = lambda: and_(*(getattr(Pesaje, c).ilike(f'%{v}%') for c, v in terms.items()))
+            indice = lambda: substring_filter(Pesaje, db.session, terms)
+            for label, criterio in (('ILIKE ', ilike), ('índice', indice)):
+                t0 = time.perf_counter()
+                for _ in range(args.repeat):
+                    # Igual que /buscar: el criterio se arma en cada request
+                    n = len(Pesaje.active().filter(criterio()).order_by(
+                        Pesaje.fecha_hora.desc(), Pesaje.id.desc()
+                    ).limit(51).all())
+                ms = (time.perf_counter() - t0) / args.repeat * 1000
+                print(f"{nombre:40s} {label} {ms:9.1f} ms  ({n} filas)")
+
+
+if __name__ == '__main__':
+    main()
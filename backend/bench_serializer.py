@@ -0,0 +1,54 @@
+"""
+Benchmark de serialización de listados: ORM + to_dict() vs proyección Core
+con serializador precompilado (app/utils/projection.py).
+
+Ejemplo:
+    python bench_serializer.py --rows 20000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    os.environ['SYNC_ENABLED'] = 'false'
+    
+    import logging
+    logging.disable(logging.CRITICAL)
+    from datetime import datetime
+    from app import create_app, db
+    from app.models.pesaje import Pesaje, PESAJE_COMPLETO, PESAJE_LISTADO
+    
+    app = create_app()
+    with app.app_context():
+        db.session.execute(db.insert(Pesaje), [
+            {'peso_kg': 10.0 + i % 7, 'nro_op': f'OP{i % 300}', 'molde': 'TAPA', 'color': 'ROJO',
+             'operador': 'JUAN', 'fecha_impresion': datetime(2026, 1, 3), 'sticker_impreso': True}
+            for i in range(args.rows)
+        ])
+        db.session.commit()
+        
+        casos = [
+            ('ORM + to_dict()', lambda: [p.to_dict() for p in Pesaje.active().all()]),
+            ('PESAJE_COMPLETO', lambda: PESAJE_COMPLETO.all(db.session, Pesaje.active())),
+            ('PESAJE_LISTADO', lambda: PESAJE_LISTADO.all(db.session, Pesaje.active())),
+        ]
+        for nombre, fn in casos:
+            fn()
+            t0 = time.perf_counter()
+            for _ in range(args.repeat):
+                db.session.expunge_all()  # Sin identity map caliente entre corridas
+                fn()
+            ms = (time.perf_counter() - t0) / args.repeat * 1000
+            print(f"{nombre:18s} {ms:8.1f} ms  ({ms * 1000 / args.rows:.2f} us/fila)")
+
+
+if __name__ == '__main__':
+    main()
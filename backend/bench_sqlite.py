@@ -0,0 +1,118 @@
+"""
+Benchmark de lecturas/escrituras concurrentes sobre SQLite.
+
+Simula el patrón del backend: hilos escritores (POST /api/pesajes, un commit
+por pesaje) y lectores (listado paginado + conteo) sobre la misma base.
+Siempre corre sobre una base temporal y sin sync en background: nunca toca
+la base configurada en DATABASE_URL.
+
+Ejemplos:
+    # Comparar sin perfil vs con perfil (WAL + PRAGMAs), 10 s cada uno
+    python bench_sqlite.py --compare --duration 10
+
+    # Solo con el perfil activo, 4 escritores y 8 lectores
+    python bench_sqlite.py --writers 4 --readers 8
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def run(args, tmp):
+    """Ejecuta el benchmark sobre una base nueva en `tmp` (perfil según el entorno)."""
+    import logging
+    logging.disable(logging.CRITICAL)
+    
+    from app import create_app, db
+    from app.models.pesaje import Pesaje
+    from app.utils import sqlite_profile
+    
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+        'SYNC_ENABLED': False,
+    })
+    stop = threading.Event()
+    counts = {'writes': 0, 'reads': 0, 'errors': 0}
+    lock = threading.Lock()
+    
+    with app.app_context():
+        db.session.execute(
+            db.insert(Pesaje),
+            [{'peso_kg': 10 + i % 17, 'nro_op': f'OP{i % 50}', 'molde': 'TAPA'} for i in range(args.seed)]
+        )
+        db.session.commit()
+        pragmas = sqlite_profile.describe(db.engine)
+    
+    def writer():
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    db.session.add(Pesaje(peso_kg=12.5, nro_op='OP1', molde='TAPA'))
+                    db.session.commit()
+                    key = 'writes'
+                except Exception:
+                    db.session.rollback()
+                    key = 'errors'
+                with lock:
+                    counts[key] += 1
+    
+    def reader():
+        with app.app_context():
+            while not stop.is_set():
+                try:
+                    Pesaje.active().order_by(Pesaje.fecha_hora.desc()).limit(20).all()
+                    Pesaje.active().count()
+                    db.session.rollback()  # Cerrar la transacción de lectura
+                    key = 'reads'
+                except Exception:
+                    db.session.rollback()
+                    key = 'errors'
+                with lock:
+                    counts[key] += 1
+    
+    threads = [threading.Thread(target=writer) for _ in range(args.writers)]
+    threads += [threading.Thread(target=reader) for _ in range(args.readers)]
+    for t in threads:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in threads:
+        t.join()
+    with app.app_context():
+        db.engine.dispose()
+    
+    print(f"PRAGMAs: {pragmas}")
+    print(f"escrituras/s: {counts['writes'] / args.duration:8.1f}   "
+          f"lecturas/s: {counts['reads'] / args.duration:8.1f}   "
+          f"errores: {counts['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=5.0)
+    parser.add_argument('--seed', type=int, default=20000, help='Pesajes iniciales')
+    parser.add_argument('--compare', action='store_true', help='Correr sin y con el perfil SQLite')
+    args = parser.parse_args()
+    
+    if not args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            run(args, tmp)
+        return
+    
+    argv = [sys.executable, os.path.abspath(__file__),
+            '--writers', str(args.writers), '--readers', str(args.readers),
+            '--duration', str(args.duration), '--seed', str(args.seed)]
+    for label, tuning in (('Sin perfil (default)', 'false'), ('Con perfil SQLite', 'true')):
+        print(f"== {label}")
+        sys.stdout.flush()
+        subprocess.run(argv, env={**os.environ, 'SQLITE_TUNING_ENABLED': tuning}, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+Recalcula la tabla pesajes_agregados desde pesajes.
+
+Los triggers la mantienen al día en cada escritura; usar este script solo
+para reparar (restauración de un backup, escrituras con los triggers
+desactivados, edición manual de la base). Reinstala los triggers y
+reemplaza los totales en una sola transacción.
+
+Uso: python rebuild_agregados.py
+"""
+from app import create_app, db
+from app.services.pesaje_agregados import install_triggers, rebuild_aggregates
+
+
+def rebuild():
+    # Sin el hilo de sincronización: el script solo toca pesajes_agregados
+    app = create_app({'SYNC_ENABLED': False})
+    with app.app_context():
+        with db.engine.begin() as conn:
+            install_triggers(conn)
+            grupos = rebuild_aggregates(conn)
+        print(f"✅ pesajes_agregados recalculada: {grupos} grupos")
+
+
+if __name__ == '__main__':
+    rebuild()
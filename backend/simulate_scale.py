@@ -0,0 +1,116 @@
+"""
+Balanza simulada sobre un pty para pruebas de carga y benchmarks sin hardware.
+
+Ejemplos:
+    # Exponer una balanza simulada y apuntar el backend a ella (SCALE_PORT=<ruta>)
+    python simulate_scale.py --protocol net_ticket --rate 20
+
+    # Reproducir una captura de test_balanza_raw.py en bucle
+    python simulate_scale.py --capture captura.txt --loop --rate 5
+
+    # Benchmark del lector + parsers a 5000 líneas/s durante 10 s
+    python simulate_scale.py --bench --rate 5000 --duration 10 --read-mode blocking
+
+    # Probar la reconexión: cortar el puerto cada 5 s durante 2 s
+    python simulate_scale.py --bench --rate 50 --duration 20 --disconnect-every 5 --disconnect-for 2
+"""
+import argparse
+import time
+
+from app.services.scale_simulator import (
+    LINE_FORMATS,
+    ScaleSimulator,
+    load_capture,
+    synthetic_lines,
+)
+
+
+def run_benchmark(sim: ScaleSimulator, args):
+    """Conecta un ScaleService al simulador y mide lecturas/s y latencia."""
+    from app.services.scale_service import ScaleService
+    
+    service = ScaleService(port=sim.port, read_mode=args.read_mode, protocol=args.parser)
+    if not service.connect():
+        print("No se pudo conectar al simulador")
+        return
+    
+    counter = {'readings': 0, 'stable': 0}
+    
+    def on_weight(weight):
+        counter['readings'] += 1
+    
+    def on_stable(weight):
+        counter['stable'] += 1
+    
+    start = time.perf_counter()
+    service.start_listening(on_weight, on_stable=on_stable)
+    try:
+        while time.perf_counter() - start < args.duration and not sim.finished.is_set():
+            time.sleep(0.2)
+    finally:
+        elapsed = time.perf_counter() - start
+        service.stop_listening()
+        service.disconnect()
+    
+    status = service.get_status()
+    print(f"Duración:          {elapsed:.2f} s")
+    print(f"Líneas enviadas:   {sim.lines_sent} ({sim.lines_sent / elapsed:.0f}/s)")
+    print(f"Lecturas parseadas:{counter['readings']:>7} ({counter['readings'] / elapsed:.0f}/s)")
+    print(f"Pesos estables:    {counter['stable']}")
+    print(f"Desconexiones:     {sim.disconnects}")
+    print(f"Protocolo:         {status['protocol']} (confianza {status['protocol_confidence']})")
+    print(f"Latencia línea→callback: {status['latency']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Balanza simulada sobre un pseudo-terminal.")
+    parser.add_argument("--protocol", choices=sorted(LINE_FORMATS), default="net_ticket",
+                        help="Formato de las líneas sintéticas")
+    parser.add_argument("--capture", help="Archivo de captura a reproducir en lugar de líneas sintéticas")
+    parser.add_argument("--loop", action="store_true", help="Repetir la captura al terminar")
+    parser.add_argument("--rate", type=float, default=10.0, help="Líneas por segundo")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación del intervalo (0-1)")
+    parser.add_argument("--noise", type=float, default=0.05, help="Ruido del peso sintético (kg)")
+    parser.add_argument("--target", type=float, default=12.5, help="Peso típico de bolsa (kg)")
+    parser.add_argument("--hold", type=float, default=1.0,
+                        help="Duración mínima de la meseta de cada bolsa (s, > SCALE_STABLE_MIN_DWELL)")
+    parser.add_argument("--disconnect-every", type=float, help="Segundos entre desconexiones simuladas")
+    parser.add_argument("--disconnect-for", type=float, default=1.0, help="Duración de cada desconexión")
+    parser.add_argument("--link", help="Ruta del symlink al pty (default: /tmp/scale-sim-*)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duración del benchmark (s)")
+    parser.add_argument("--bench", action="store_true", help="Medir ScaleService contra el simulador")
+    parser.add_argument("--read-mode", default="blocking", choices=["blocking", "polling"])
+    parser.add_argument("--parser", default="auto", help="SCALE_PROTOCOL para el benchmark")
+    args = parser.parse_args()
+    
+    if args.capture:
+        lines = load_capture(args.capture)
+        print(f"Captura cargada: {len(lines)} líneas")
+    else:
+        lines = synthetic_lines(args.protocol, target_kg=args.target, noise_kg=args.noise,
+                                rate=args.rate, hold_s=args.hold)
+    
+    sim = ScaleSimulator(
+        lines, rate=args.rate, jitter=args.jitter, loop=args.loop,
+        disconnect_every=args.disconnect_every, disconnect_for=args.disconnect_for,
+        start_delay=0.5 if args.bench else 0.0, link_path=args.link
+    )
+    sim.start()
+    print(f"Balanza simulada en {sim.port} ({args.rate:g} líneas/s)")
+    
+    try:
+        if args.bench:
+            run_benchmark(sim, args)
+        else:
+            print("Usar SCALE_PORT=" + sim.port + " en el backend. Ctrl+C para detener.")
+            while not sim.finished.is_set():
+                time.sleep(1)
+                print(f"\r{sim.get_stats()}", end="", flush=True)
+    except KeyboardInterrupt:
+        print("\nDetenido manualmente.")
+    finally:
+        sim.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Fixtures compartidas de la app.
+
+La base de cada test es un archivo SQLite en tmp_path, configurado ANTES de
+inicializar las extensiones (create_app(config_overrides)): cambiar
+SQLALCHEMY_DATABASE_URI después de create_app() no tiene efecto y los tests
+terminarían escribiendo (y borrando) instance/pesajes.db. Se usa un archivo y
+no :memory: porque el pool del perfil SQLite abre varias conexiones y los
+trabajos de exportación leen desde otros hilos.
+"""
+import pytest
+
+from app import create_app, db
+
+
+@pytest.fixture
+def app_config():
+    """Config extra para la app del test (redefinir en el módulo que la necesite)."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    path = tmp_path / 'pesajes_test.db'
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{path}",
+        'TESTING': True,
+        'SYNC_ENABLED': False,
+        **app_config,
+    })
+    
+    with app.app_context():
+        assert db.engine.url.database == str(path)
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
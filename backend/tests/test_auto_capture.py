@@ -0,0 +1,65 @@
+"""
+Tests de la captura automática de pesajes en el backend.
+"""
+import pytest
+from app.models.pesaje import Pesaje
+from app.services.auto_capture import AutoCaptureService
+
+
+@pytest.fixture
+def service(app):
+    service = AutoCaptureService()
+    service.set_context('linea1', {'nro_op': 'OP1354', 'molde': 'TAPA', 'operador': 'JUAN'},
+                        imprimir=False, min_peso_kg=1.0)
+    return service
+
+
+class TestAutoCaptureService:
+    
+    def test_sin_contexto_no_captura(self, app):
+        assert AutoCaptureService().on_stable_weight('linea1', 25.0) is None
+        assert Pesaje.query.count() == 0
+    
+    def test_captura_peso_estable(self, app, service):
+        data = service.on_stable_weight('linea1', 25.4)
+        
+        assert data['peso_kg'] == 25.4
+        assert data['nro_op'] == 'OP1354'
+        assert data['molde'] == 'TAPA'
+        assert Pesaje.query.count() == 1
+        assert service.get_context('linea1')['capturados'] == 1
+    
+    def test_misma_bolsa_no_se_captura_dos_veces(self, app, service):
+        assert service.on_stable_weight('linea1', 25.4) is not None
+        assert service.on_stable_weight('linea1', 25.5) is None
+        
+        # Balanza vacía rearma la estación
+        assert service.on_stable_weight('linea1', 0.0) is None
+        assert service.on_stable_weight('linea1', 24.9) is not None
+        assert Pesaje.query.count() == 2
+    
+    def test_clear_context(self, app, service):
+        assert service.clear_context('linea1') is True
+        assert service.on_stable_weight('linea1', 25.0) is None
+        assert service.clear_context('linea1') is False
+
+
+class TestAutoCaptureEndpoints:
+    
+    def test_activar_requiere_nro_op(self, client):
+        response = client.put('/api/balanza/auto-captura', json={'contexto': {'molde': 'TAPA'}})
+        assert response.status_code == 400
+    
+    def test_activar_consultar_desactivar(self, client):
+        response = client.put('/api/balanza/auto-captura', json={
+            'contexto': {'nro_op': 'OP1354'}, 'imprimir': False
+        })
+        assert response.status_code == 200
+        assert response.get_json()['datos']['nro_op'] == 'OP1354'
+        
+        response = client.get('/api/balanza/auto-captura')
+        assert response.get_json()['activo'] is True
+        
+        response = client.delete('/api/balanza/auto-captura')
+        assert response.get_json()['activo'] is False
+        assert client.get('/api/balanza/auto-captura').get_json()['activo'] is False
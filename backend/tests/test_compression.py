@@ -0,0 +1,71 @@
+"""
+Tests de compresión de respuestas JSON (app/utils/compression.py).
+"""
+import gzip
+import pytest
+from app import db
+from app.models.pesaje import Pesaje
+from app.utils import compression
+
+
+@pytest.fixture
+def pesajes(app):
+    db.session.add_all([
+        Pesaje(peso_kg=10 + i, nro_op='OP1354', molde='CERNIDOR ROMANO', color='ROJO', sincronizado=False)
+        for i in range(200)
+    ])
+    db.session.commit()
+
+
+class TestCompresion:
+    
+    def test_gzip(self, client, pesajes):
+        plano = client.get('/api/sync/pending')
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) < len(plano.data) / 5
+        assert gzip.decompress(response.data) == plano.data
+    
+    def test_brotli_preferido(self, client, pesajes):
+        brotli = pytest.importorskip('brotli')
+        plano = client.get('/api/sync/pending')
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip, deflate, br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert brotli.decompress(response.data) == plano.data
+    
+    def test_sin_brotli_usa_gzip(self, client, pesajes, monkeypatch):
+        monkeypatch.setattr(compression, 'brotli', None)
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'br, gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+    
+    def test_respuesta_chica_sin_comprimir(self, client):
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+        assert response.get_json() is not None
+    
+    def test_cliente_sin_accept_encoding(self, client, pesajes):
+        response = client.get('/api/sync/pending')
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_umbral_configurable(self, app, client, pesajes):
+        app.config['COMPRESSION_MIN_BYTES'] = 10 ** 9
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_304_no_se_comprime(self, client, pesajes):
+        etag = client.get('/api/sync/pending').headers['ETag']
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert 'Content-Encoding' not in response.headers
+    
+    def test_exportacion_no_se_comprime(self, client, pesajes):
+        response = client.get('/api/pesajes/exportar?formato=ndjson', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
+    
+    @pytest.mark.parametrize('app_config', [{'COMPRESSION_ENABLED': False}])
+    def test_deshabilitada(self, client, pesajes):
+        response = client.get('/api/sync/pending', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in response.headers
@@ -1,8 +1,7 @@
 """
 Tests para el modelo CorrelativoCache y endpoint de anulación.
 """
-import pytest
-from app import create_app, db
+from app import db
 from app.models.correlativo_cache import (
     CorrelativoCache, 
     consumir_local, 
@@ -12,23 +11,6 @@ from app.models.correlativo_cache import (
 )
 
 
-@pytest.fixture
-def app():
-    app = create_app()
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    app.config['TESTING'] = True
-    
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.drop_all()
-
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
-
 class TestCorrelativoCacheModel:
     """Tests del modelo CorrelativoCache"""
     
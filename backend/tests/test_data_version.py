@@ -0,0 +1,58 @@
+"""
+Tests de versión de datos por tabla y GET condicional (ETag / 304).
+"""
+from app import db
+from app.models.pesaje import Pesaje
+from app.utils.data_version import data_versions
+
+
+def _etag(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'no-cache'
+    return response.headers['ETag']
+
+
+class TestDataVersions:
+    
+    def test_commit_incrementa_version(self, app):
+        antes = data_versions.get('pesajes')
+        db.session.add(Pesaje(peso_kg=10))
+        db.session.commit()
+        assert data_versions.get('pesajes') == antes + 1
+    
+    def test_rollback_no_incrementa(self, app):
+        antes = data_versions.get('pesajes')
+        db.session.add(Pesaje(peso_kg=10))
+        db.session.flush()
+        db.session.rollback()
+        assert data_versions.get('pesajes') == antes
+    
+    def test_update_masivo_incrementa(self, app):
+        db.session.add(Pesaje(peso_kg=10))
+        db.session.commit()
+        antes = data_versions.get('pesajes')
+        Pesaje.query.update({'sincronizado': True}, synchronize_session=False)
+        db.session.commit()
+        assert data_versions.get('pesajes') == antes + 1
+
+
+class TestConditionalGet:
+    
+    def test_304_si_no_cambio(self, client):
+        etag = _etag(client, '/api/pesajes')
+        response = client.get('/api/pesajes', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_escrituras_invalidan_etag(self, client):
+        etag = _etag(client, '/api/pesajes')
+        client.post('/api/pesajes/batch', json={'items': [{'peso_kg': 5}]})
+        response = client.get('/api/pesajes', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    def test_avance_depende_de_ops_cerradas(self, client):
+        etag = _etag(client, '/api/avance/resumen')
+        client.post('/api/ops/cerrar', json={'nro_op': 'OP1354'})
+        assert client.get('/api/avance/resumen', headers={'If-None-Match': etag}).status_code == 200
@@ -0,0 +1,139 @@
+"""
+Tests de la exportación de pesajes (GET /api/pesajes/exportar).
+"""
+import csv
+import io
+import json
+import os
+from datetime import datetime, timedelta
+import openpyxl
+import pytest
+from app import db
+from app.models.pesaje import Pesaje
+from app.services import export_service
+from app.services.export_service import EXPORT_HEADERS, estimate_widths, write_xlsx
+
+
+@pytest.fixture
+def pesajes(app):
+    base = datetime(2026, 3, 10, 8, 0)
+    db.session.add_all([
+        Pesaje(peso_kg=10 + i, nro_op='OP1354', molde='TAPA', color='ROJO',
+               fecha_hora=base + timedelta(minutes=i), sincronizado=(i % 2 == 0))
+        for i in range(30)
+    ])
+    db.session.commit()
+
+
+class TestExportarExcel:
+    
+    def test_exporta_todas_las_filas(self, client, pesajes, monkeypatch):
+        # Lotes pequeños para recorrer varios fetch del cursor
+        monkeypatch.setattr(export_service, 'EXPORT_YIELD_PER', 7)
+        response = client.get('/api/pesajes/exportar')
+        
+        assert response.status_code == 200
+        assert response.mimetype == export_service.XLSX_MIMETYPE
+        assert 'filename=pesajes.xlsx' in response.headers['Content-Disposition']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        
+        ws = openpyxl.load_workbook(io.BytesIO(response.data)).active
+        filas = list(ws.iter_rows(values_only=True))
+        assert list(filas[0]) == EXPORT_HEADERS
+        assert len(filas) == 31
+        # Más reciente primero, fechas y booleanos formateados
+        assert filas[1][1] == '2026-03-10 08:29:00'
+        assert filas[1][15] == 'No'
+        assert filas[2][15] == 'Sí'
+    
+    def test_rango_de_fechas(self, client, pesajes):
+        response = client.get('/api/pesajes/exportar?fecha_inicio=2026-03-11&fecha_fin=2026-03-12')
+        
+        assert response.status_code == 200
+        assert 'filename=pesajes_2026-03-11_a_2026-03-12.xlsx' in response.headers['Content-Disposition']
+        ws = openpyxl.load_workbook(io.BytesIO(response.data)).active
+        assert ws.max_row == 1
+    
+    def test_fecha_invalida(self, client):
+        response = client.get('/api/pesajes/exportar?fecha_inicio=10-03-2026')
+        assert response.status_code == 400
+    
+    def test_temporal_se_borra_al_terminar(self, client, pesajes, monkeypatch):
+        rutas = []
+        original = export_service.temp_export_path
+        
+        def registrar(suffix):
+            rutas.append(original(suffix))
+            return rutas[-1]
+        
+        monkeypatch.setattr('app.routes.pesajes.temp_export_path', registrar)
+        response = client.get('/api/pesajes/exportar')
+        response.close()
+        
+        assert rutas and not os.path.exists(rutas[0])
+
+
+class TestAnchoColumnas:
+    
+    def test_estima_con_muestra_acotada(self, tmp_path):
+        filas = [['x' * 5]] * 3 + [['x' * 40]]
+        write_xlsx(iter(filas), tmp_path / 'a.xlsx', headers=['Col'], width_sample=3)
+        
+        ws = openpyxl.load_workbook(tmp_path / 'a.xlsx').active
+        # La fila larga queda fuera de la muestra, pero se escribe igual
+        assert ws.column_dimensions['A'].width == 7
+        assert ws.max_row == 5
+    
+    def test_tope_de_ancho(self):
+        assert estimate_widths(['A'], [['x' * 200]]) == [export_service.EXCEL_MAX_WIDTH]
+
+
+class TestExportarFormatos:
+    
+    def test_csv(self, client, pesajes, monkeypatch):
+        monkeypatch.setattr(export_service, 'EXPORT_YIELD_PER', 7)
+        response = client.get('/api/pesajes/exportar?formato=csv')
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        assert 'filename=pesajes.csv' in response.headers['Content-Disposition']
+        filas = list(csv.reader(io.StringIO(response.data.decode('utf-8'))))
+        assert filas[0] == export_service.EXPORT_KEYS
+        assert len(filas) == 31
+        assert filas[1][filas[0].index('fecha_hora')] == '2026-03-10T08:29:00'
+    
+    def test_ndjson(self, client, pesajes):
+        response = client.get('/api/pesajes/exportar?formato=ndjson&fecha_inicio=2026-03-10')
+        
+        assert response.status_code == 200
+        assert 'filename=pesajes_desde_2026-03-10.ndjson' in response.headers['Content-Disposition']
+        items = [json.loads(linea) for linea in response.data.splitlines()]
+        assert len(items) == 30
+        assert items[0]['fecha_hora'] == '2026-03-10T08:29:00'
+        assert items[0]['sincronizado'] is False
+    
+    def test_parquet(self, client, pesajes, monkeypatch):
+        pq = pytest.importorskip('pyarrow.parquet')
+        monkeypatch.setattr(export_service, 'PARQUET_ROW_GROUP', 10)
+        response = client.get('/api/pesajes/exportar?formato=parquet')
+        
+        assert response.status_code == 200
+        archivo = pq.ParquetFile(io.BytesIO(response.data))
+        assert archivo.metadata.num_rows == 30
+        assert archivo.metadata.num_row_groups == 3
+        tabla = archivo.read()
+        assert tabla.column_names == export_service.EXPORT_KEYS
+        assert tabla.column('peso_kg').to_pylist()[0] == 39
+    
+    def test_parquet_sin_pyarrow(self, client, monkeypatch):
+        monkeypatch.setattr(export_service, 'pyarrow', None)
+        response = client.get('/api/pesajes/exportar?formato=parquet')
+        assert response.status_code == 400
+    
+    def test_formato_desconocido(self, client):
+        response = client.get('/api/pesajes/exportar?formato=pdf')
+        assert response.status_code == 400
+    
+    def test_fecha_invalida_en_formato_streaming(self, client):
+        response = client.get('/api/pesajes/exportar?formato=csv&fecha_fin=2026/03/10')
+        assert response.status_code == 400
@@ -0,0 +1,143 @@
+"""
+Tests de exportaciones en segundo plano (/api/pesajes/exportar/jobs).
+"""
+import io
+import os
+import time
+from datetime import datetime, timedelta
+import openpyxl
+import pytest
+from app import db
+from app.models.pesaje import Pesaje
+from app.services import export_jobs
+from app.services.export_jobs import ExportJobService
+
+
+@pytest.fixture(autouse=True)
+def servicio(monkeypatch):
+    monkeypatch.setattr(export_jobs, '_export_jobs', ExportJobService())
+
+
+@pytest.fixture
+def app_config(tmp_path):
+    return {'EXPORT_JOBS_DIR': str(tmp_path / 'exports')}
+
+
+@pytest.fixture
+def pesajes(app):
+    base = datetime(2026, 3, 10, 8, 0)
+    db.session.add_all([
+        Pesaje(peso_kg=10 + i, nro_op='OP1354', molde='TAPA', fecha_hora=base + timedelta(minutes=i))
+        for i in range(25)
+    ])
+    db.session.commit()
+
+
+def esperar(client, job_id, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        data = client.get(f'/api/pesajes/exportar/jobs/{job_id}').get_json()
+        if data['estado'] in ('listo', 'error'):
+            return data
+        time.sleep(0.02)
+    raise AssertionError(f"La exportación {job_id} no terminó")
+
+
+class TestExportJobs:
+    
+    def test_crea_y_descarga(self, client, pesajes):
+        response = client.post('/api/pesajes/exportar/jobs', json={'formato': 'xlsx'})
+        
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        data = esperar(client, job_id)
+        assert data['estado'] == 'listo'
+        assert data['filas'] == data['total'] == 25
+        assert data['porcentaje'] == 100
+        
+        descarga = client.get(f'/api/pesajes/exportar/jobs/{job_id}/descarga')
+        assert descarga.status_code == 200
+        assert 'filename=pesajes.xlsx' in descarga.headers['Content-Disposition']
+        ws = openpyxl.load_workbook(io.BytesIO(descarga.data)).active
+        assert ws.max_row == 26
+    
+    def test_descarga_parcial_con_range(self, client, pesajes):
+        job_id = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv'}).get_json()['job_id']
+        data = esperar(client, job_id)
+        completo = client.get(f'/api/pesajes/exportar/jobs/{job_id}/descarga').data
+        
+        parcial = client.get(f'/api/pesajes/exportar/jobs/{job_id}/descarga', headers={'Range': 'bytes=10-'})
+        assert parcial.status_code == 206
+        assert parcial.headers['Content-Range'] == f"bytes 10-{data['bytes'] - 1}/{data['bytes']}"
+        assert parcial.data == completo[10:]
+    
+    def test_misma_exportacion_se_reutiliza(self, client, pesajes):
+        primero = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv', 'fecha_inicio': '2026-03-01'})
+        job_id = primero.get_json()['job_id']
+        esperar(client, job_id)
+        
+        repetido = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv', 'fecha_inicio': '2026-03-01'})
+        assert repetido.status_code == 200
+        assert repetido.get_json()['job_id'] == job_id
+        assert repetido.get_json()['reutilizado'] is True
+        
+        # Otro formato u otro rango es otro trabajo
+        otro = client.post('/api/pesajes/exportar/jobs', json={'formato': 'ndjson', 'fecha_inicio': '2026-03-01'})
+        assert otro.get_json()['job_id'] != job_id
+    
+    def test_datos_nuevos_invalidan_el_cache(self, client, pesajes):
+        job_id = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv'}).get_json()['job_id']
+        esperar(client, job_id)
+        
+        db.session.add(Pesaje(peso_kg=99, nro_op='OP1355', fecha_hora=datetime(2026, 3, 11, 9, 0)))
+        db.session.commit()
+        
+        nuevo = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv'}).get_json()
+        assert nuevo['job_id'] != job_id
+        assert esperar(client, nuevo['job_id'])['filas'] == 26
+    
+    def test_emite_progreso(self, client, pesajes, monkeypatch):
+        eventos = []
+        monkeypatch.setattr(export_jobs.socketio, 'emit', lambda evento, data: eventos.append((evento, data)))
+        job_id = client.post('/api/pesajes/exportar/jobs', json={'formato': 'ndjson'}).get_json()['job_id']
+        esperar(client, job_id)
+        limite = time.monotonic() + 5
+        while not (eventos and eventos[-1][1]['estado'] == 'listo') and time.monotonic() < limite:
+            time.sleep(0.01)  # El evento final se emite después de marcar 'listo'
+        
+        assert eventos and all(evento == 'export_progress' for evento, _ in eventos)
+        assert eventos[-1][1]['job_id'] == job_id
+        assert eventos[-1][1]['estado'] == 'listo'
+    
+    def test_consulta_purga_trabajos_vencidos(self, client, pesajes):
+        job_id = client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv'}).get_json()['job_id']
+        esperar(client, job_id)
+        job = export_jobs.get_export_jobs()._jobs[job_id]
+        job.terminado_ts -= 3601
+        
+        assert client.get(f'/api/pesajes/exportar/jobs/{job_id}').status_code == 404
+        assert not os.path.exists(job.path)
+    
+    def test_huerfanos_solo_vencidos(self, client, pesajes, tmp_path):
+        directorio = tmp_path / 'exports'
+        directorio.mkdir()
+        viejo = directorio / f"{'a' * 32}.csv"
+        reciente = directorio / f"{'b' * 32}.xlsx.part"  # Trabajo en curso de otro proceso
+        ajeno = directorio / 'notas.csv'
+        for archivo in (viejo, reciente, ajeno):
+            archivo.write_text('x')
+        hace_dos_horas = time.time() - 7200
+        os.utime(viejo, (hace_dos_horas, hace_dos_horas))
+        os.utime(ajeno, (hace_dos_horas, hace_dos_horas))
+        
+        client.post('/api/pesajes/exportar/jobs', json={'formato': 'csv'})
+        
+        assert not viejo.exists()
+        assert reciente.exists()
+        assert ajeno.exists()
+    
+    def test_validaciones(self, client):
+        assert client.post('/api/pesajes/exportar/jobs', json={'formato': 'pdf'}).status_code == 400
+        assert client.post('/api/pesajes/exportar/jobs', json={'fecha_fin': '10/03/2026'}).status_code == 400
+        assert client.get('/api/pesajes/exportar/jobs/desconocido').status_code == 404
+        assert client.get('/api/pesajes/exportar/jobs/desconocido/descarga').status_code == 404
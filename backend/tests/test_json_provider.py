@@ -0,0 +1,68 @@
+"""
+Tests del proveedor JSON (orjson con respaldo a json estándar).
+"""
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+import json
+import pytest
+from flask import Flask, jsonify
+from app.utils import json_provider
+from app.utils.json_provider import AppJSONProvider, SocketJSON
+
+PAYLOAD = {
+    'naive': datetime(2026, 1, 3, 8, 15, 0),
+    'micro': datetime(2026, 1, 3, 8, 15, 0, 5),
+    'peru': datetime(2026, 1, 3, 8, 15, tzinfo=timezone(timedelta(hours=-5))),
+    'fecha': date(2026, 1, 3),
+    'decimal': Decimal('12.50'),
+    'texto': 'MOLDE ÑANDÚ',
+    'nada': None,
+}
+
+ESPERADO = {
+    'naive': '2026-01-03T08:15:00',
+    'micro': '2026-01-03T08:15:00.000005',
+    'peru': '2026-01-03T08:15:00-05:00',
+    'fecha': '2026-01-03',
+    'decimal': '12.50',
+    'texto': 'MOLDE ÑANDÚ',
+    'nada': None,
+}
+
+
+@pytest.fixture(params=['orjson', 'json'])
+def app(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip('orjson no instalado')
+    
+    app = Flask(__name__)
+    app.json = AppJSONProvider(app)
+    
+    @app.route('/payload')
+    def payload():
+        return jsonify(PAYLOAD)
+    
+    return app
+
+
+class TestAppJSONProvider:
+    
+    def test_fechas_en_iso_8601(self, app):
+        with app.app_context():
+            assert json.loads(app.json.dumps(PAYLOAD)) == ESPERADO
+    
+    def test_response(self, app):
+        response = app.test_client().get('/payload')
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data) == ESPERADO
+    
+    def test_socket_json_sin_app_context(self, app):
+        assert json.loads(SocketJSON.dumps(PAYLOAD)) == ESPERADO
+        assert SocketJSON.loads('{"estacion": "linea1"}') == {'estacion': 'linea1'}
+    
+    def test_dumps_bytes_mismo_resultado_en_ambos(self, app):
+        # Con orjson o sin él (no es dependencia obligatoria) el contenido es el mismo
+        assert json.loads(json_provider.dumps_bytes(PAYLOAD)) == ESPERADO
+        assert json.loads(json_provider.dumps_bytes(PAYLOAD, indent=True)) == ESPERADO
@@ -0,0 +1,80 @@
+"""
+Tests del motor de migraciones versionadas.
+"""
+import pytest
+from flask import Flask
+from sqlalchemy import exc, inspect, text
+from app import db
+from app.migrations import LATEST_VERSION, backfill, current_version, run_migrations
+import app.models  # noqa: F401  (registra los modelos en db.metadata)
+from app.models.op_cerrada import OpCerrada  # noqa: F401
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'migraciones.db'}"
+    db.init_app(app)
+    with app.app_context():
+        yield app
+        db.engine.dispose()
+
+
+def _columns(table):
+    return {c['name'] for c in inspect(db.engine).get_columns(table)}
+
+
+class TestRunMigrations:
+    
+    def test_base_nueva_queda_al_dia(self, app):
+        assert run_migrations(db) == list(range(1, LATEST_VERSION + 1))
+        assert current_version(db.engine) == LATEST_VERSION
+        assert inspect(db.engine).has_table('ops_cerradas')
+        assert run_migrations(db) == []
+    
+    def test_base_legacy_aplica_pendientes(self, app):
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE pesajes (id INTEGER PRIMARY KEY, peso_kg FLOAT NOT NULL, "
+                "fecha_hora DATETIME NOT NULL, molde VARCHAR(100), maquina VARCHAR(50), "
+                "nro_op VARCHAR(20), turno VARCHAR(20), fecha_orden_trabajo DATE, "
+                "nro_orden_trabajo VARCHAR(20), lote_salida_pieza_color_id INTEGER, observaciones TEXT)"
+            ))
+            conn.execute(text("INSERT INTO pesajes (peso_kg, fecha_hora) VALUES (12.5, '2026-01-03 08:00:00')"))
+        
+        assert run_migrations(db) == list(range(1, LATEST_VERSION + 1))
+        assert {'sincronizado', 'deleted_at', 'qr_data_original'} <= _columns('pesajes')
+        with db.engine.connect() as conn:
+            assert conn.execute(text("SELECT sincronizado, sticker_impreso FROM pesajes")).one() == (0, 0)
+        
+        # Segunda corrida: no-op
+        assert run_migrations(db) == []
+    
+    def test_current_version_base_nueva(self, app):
+        assert current_version(db.engine) is None
+    
+    def test_error_de_base_no_es_base_nueva(self, app, tmp_path):
+        (tmp_path / 'migraciones.db').write_bytes(b'no es una base sqlite' * 100)
+        with pytest.raises(exc.DatabaseError):
+            current_version(db.engine)
+        with pytest.raises(exc.DatabaseError):
+            run_migrations(db)
+
+
+class TestBackfill:
+    
+    def test_backfill_por_lotes(self, app):
+        run_migrations(db)
+        with db.engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO pesajes (peso_kg, fecha_hora) VALUES " +
+                ", ".join(["(1, '2026-01-03 08:00:00')"] * 25)
+            ))
+        
+        backfill('pesajes', 'observaciones = :obs', 'observaciones IS NULL',
+                 {'obs': 'migrado'}, batch_size=10)(db, db.engine)
+        
+        with db.engine.connect() as conn:
+            assert conn.execute(text(
+                "SELECT COUNT(*) FROM pesajes WHERE observaciones = 'migrado'"
+            )).scalar() == 25
@@ -0,0 +1,165 @@
+"""
+Tests de los totales por (nro_op, molde, color) mantenidos por triggers
+(app/services/pesaje_agregados.py) y de las lecturas de avance / OPs.
+"""
+from collections import defaultdict
+from datetime import datetime
+import pytest
+from app import db
+from app.models.op_cerrada import OpCerrada
+from app.models.pesaje import Pesaje
+from app.models.pesaje_agregado import PesajeAgregado
+from app.services.pesaje_agregados import rebuild_aggregates
+
+
+@pytest.fixture
+def pesajes(app):
+    db.session.add_all([
+        Pesaje(peso_kg=10.0, nro_op='OP1', molde='TAPA', color='ROJO', fecha_hora=datetime(2026, 3, 10, 8, 0)),
+        Pesaje(peso_kg=12.5, nro_op='OP1', molde='TAPA', color='ROJO', fecha_hora=datetime(2026, 3, 10, 9, 0)),
+        Pesaje(peso_kg=7.0, nro_op='OP1', molde='TAPA', color='AZUL', fecha_hora=datetime(2026, 3, 10, 8, 30)),
+        Pesaje(peso_kg=20.0, nro_op='OP2', molde='BALDE', color='ROJO', fecha_hora=datetime(2026, 3, 11, 8, 0)),
+        Pesaje(peso_kg=3.0, nro_op=None, molde=None, color=None, fecha_hora=datetime(2026, 3, 11, 9, 0)),
+    ])
+    db.session.commit()
+
+
+def agregados():
+    return {
+        (a.nro_op, a.molde, a.color): (round(a.total_kg, 6), a.total_bolsas, a.ultimo_pesaje)
+        for a in PesajeAgregado.query.all()
+    }
+
+
+def esperado():
+    """Mismos totales calculados en Python desde los pesajes activos."""
+    grupos = defaultdict(lambda: [0.0, 0, None])
+    for p in Pesaje.active():
+        g = grupos[(p.nro_op or '', p.molde or '', p.color or '')]
+        g[0] += p.peso_kg
+        g[1] += 1
+        g[2] = max(g[2], p.fecha_hora) if g[2] else p.fecha_hora
+    return {k: (round(kg, 6), n, ultimo) for k, (kg, n, ultimo) in grupos.items()}
+
+
+class TestTriggers:
+    
+    def test_insert(self, pesajes):
+        assert agregados() == esperado()
+        assert agregados()[('OP1', 'TAPA', 'ROJO')] == (22.5, 2, datetime(2026, 3, 10, 9, 0))
+        assert ('', '', '') in agregados()
+    
+    def test_insert_batch(self, client, pesajes):
+        items = [{'peso_kg': 1.5, 'nro_op': 'OP2', 'molde': 'BALDE', 'color': 'ROJO'} for _ in range(4)]
+        assert client.post('/api/pesajes/batch', json={'items': items}).status_code == 201
+        assert agregados() == esperado()
+        assert agregados()[('OP2', 'BALDE', 'ROJO')][:2] == (26.0, 5)
+    
+    def test_edicion_mueve_de_grupo(self, client, pesajes):
+        p = Pesaje.query.filter_by(peso_kg=12.5).one()
+        response = client.put(f'/api/pesajes/{p.id}', json={'color': 'AZUL', 'peso_kg': 13.0})
+        
+        assert response.status_code == 200
+        assert agregados() == esperado()
+        assert agregados()[('OP1', 'TAPA', 'ROJO')] == (10.0, 1, datetime(2026, 3, 10, 8, 0))
+        assert agregados()[('OP1', 'TAPA', 'AZUL')][:2] == (20.0, 2)
+    
+    def test_edicion_sin_columnas_de_totales(self, client, pesajes):
+        antes = agregados()
+        p = Pesaje.query.filter_by(peso_kg=10.0).one()
+        client.put(f'/api/pesajes/{p.id}', json={'observaciones': 'ok', 'operador': 'JUAN'})
+        assert agregados() == antes
+    
+    def test_soft_delete_recalcula_ultimo(self, client, pesajes):
+        p = Pesaje.query.filter_by(peso_kg=12.5).one()
+        assert client.delete(f'/api/pesajes/{p.id}').status_code == 204
+        
+        assert agregados() == esperado()
+        assert agregados()[('OP1', 'TAPA', 'ROJO')] == (10.0, 1, datetime(2026, 3, 10, 8, 0))
+    
+    def test_bulk_delete_borra_grupos_vacios(self, client, pesajes):
+        ids = [p.id for p in Pesaje.query.filter_by(nro_op='OP1')]
+        client.post('/api/pesajes/bulk-delete', json={'ids': ids})
+        
+        assert agregados() == esperado()
+        assert not any(k[0] == 'OP1' for k in agregados())
+    
+    def test_rollback_no_deja_totales(self, pesajes):
+        antes = agregados()
+        db.session.add(Pesaje(peso_kg=99, nro_op='OP9', molde='X', color='Y'))
+        db.session.flush()
+        db.session.rollback()
+        assert agregados() == antes
+    
+    def test_rebuild(self, pesajes):
+        db.session.query(PesajeAgregado).delete()
+        db.session.commit()
+        
+        with db.engine.begin() as conn:
+            assert rebuild_aggregates(conn) == len(esperado())
+        assert agregados() == esperado()
+
+
+class TestLecturas:
+    
+    def test_resumen(self, client, pesajes):
+        data = client.get('/api/avance/resumen').get_json()
+        
+        assert data['total_registros'] == 5
+        assert data['total_global_kg'] == 52.5
+        tapa = next(m for m in data['grupos_por_molde'] if m['molde'] == 'TAPA')
+        assert [(c['color'], c['total_kg'], c['total_bolsas']) for c in tapa['colores']] == [
+            ('ROJO', 22.5, 2), ('AZUL', 7.0, 1)
+        ]
+        assert 'pesajes' not in tapa['colores'][0]
+        assert any(m['molde'] == 'SIN MOLDE' for m in data['grupos_por_molde'])
+    
+    def test_resumen_excluye_ops_cerradas(self, client, pesajes):
+        db.session.add(OpCerrada(nro_op='OP1'))
+        db.session.commit()
+        
+        data = client.get('/api/avance/resumen').get_json()
+        assert data['total_registros'] == 2
+        assert {m['molde'] for m in data['grupos_por_molde']} == {'BALDE', 'SIN MOLDE'}
+    
+    def test_detalle_de_grupo(self, client, pesajes):
+        items = client.get('/api/avance/pesajes?molde=TAPA&color=ROJO').get_json()
+        assert [p['peso_kg'] for p in items] == [12.5, 10.0]
+        
+        sin_molde = client.get('/api/avance/pesajes?molde=SIN MOLDE&color=SIN COLOR').get_json()
+        assert [p['peso_kg'] for p in sin_molde] == [3.0]
+        
+        assert client.get('/api/avance/pesajes?molde=TAPA').status_code == 400
+    
+    def test_resumen_con_detalle_en_una_consulta(self, app, client, pesajes):
+        consultas = []
+        listener = lambda *args: consultas.append(args[2])
+        db.event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            data = client.get('/api/avance/resumen?detalle=1').get_json()
+        finally:
+            db.event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        assert sum('FROM pesajes ' in sql for sql in consultas) == 1
+        for molde in data['grupos_por_molde']:
+            for color in molde['colores']:
+                esperado = client.get(
+                    '/api/avance/pesajes', query_string={'molde': molde['molde'], 'color': color['color']}
+                ).get_json()
+                assert color['pesajes'] == esperado
+                assert len(esperado) == color['total_bolsas']
+    
+    def test_ops_activas(self, client, pesajes):
+        ops = client.get('/api/ops/activas').get_json()
+        
+        assert [(o['nro_op'], o['molde'], o['total_kg'], o['total_bolsas']) for o in ops] == [
+            ('OP2', 'BALDE', 20.0, 1), ('OP1', 'TAPA', 29.5, 3)
+        ]
+        assert ops[1]['ultimo_pesaje'] == '2026-03-10T09:00:00'
+    
+    def test_ops_cerradas_con_totales(self, client, pesajes):
+        client.post('/api/ops/cerrar', json={'nro_op': 'OP1', 'molde': 'TAPA'})
+        
+        cerradas = client.get('/api/ops/cerradas').get_json()
+        assert [(o['nro_op'], o['total_kg'], o['total_bolsas']) for o in cerradas] == [('OP1', 29.5, 3)]
+        assert [o['nro_op'] for o in client.get('/api/ops/activas').get_json()] == ['OP2']
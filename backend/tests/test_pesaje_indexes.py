@@ -0,0 +1,84 @@
+"""
+Verifica con EXPLAIN QUERY PLAN que las consultas calientes de pesajes usan
+sus índices (ver Pesaje.__table_args__).
+"""
+from datetime import datetime
+import pytest
+from flask import Flask
+from sqlalchemy import func, text, tuple_
+from app import db
+from app.migrations import run_migrations
+import app.models  # noqa: F401
+from app.models.pesaje import Pesaje
+from app.models.op_cerrada import OpCerrada
+
+
+@pytest.fixture(params=['sin_stats', 'con_stats'])
+def app(request, tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'planes.db'}"
+    db.init_app(app)
+    with app.app_context():
+        run_migrations(db)
+        # ~5% pendientes de sync, ~2% eliminados, 40 OPs
+        db.session.execute(db.insert(Pesaje), [
+            {'peso_kg': 10.0, 'nro_op': f'OP{i % 40}', 'sincronizado': i % 20 != 0,
+             'deleted_at': None if i % 50 else datetime(2026, 1, 3)}
+            for i in range(3000)
+        ])
+        db.session.commit()
+        if request.param == 'con_stats':
+            db.session.execute(text('ANALYZE'))
+            db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _plan(query) -> str:
+    sql = str(query.statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return '\n'.join(row[-1] for row in rows)
+
+
+class TestQueryPlans:
+    
+    def test_listado_ordenado_por_fecha(self, app):
+        plan = _plan(Pesaje.active().order_by(Pesaje.fecha_hora.desc()).limit(20))
+        assert 'ix_pesajes_activos_fecha' in plan
+        assert 'TEMP B-TREE' not in plan
+    
+    def test_exportacion_por_rango(self, app):
+        query = Pesaje.active().filter(
+            Pesaje.fecha_hora >= '2026-01-01', Pesaje.fecha_hora <= '2026-01-31'
+        ).order_by(Pesaje.fecha_hora.desc())
+        plan = _plan(query)
+        assert 'ix_pesajes_activos_fecha (deleted_at=? AND fecha_hora>? AND fecha_hora<?)' in plan
+        assert 'TEMP B-TREE' not in plan
+    
+    def test_pendientes_sync_usa_indice_parcial(self, app):
+        assert 'ix_pesajes_pendientes_sync' in _plan(Pesaje.pendientes_sync())
+    
+    def test_totales_por_op(self, app):
+        query = db.session.query(func.sum(Pesaje.peso_kg), func.count(Pesaje.id)).filter(
+            Pesaje.nro_op == 'OP7', Pesaje.deleted_at.is_(None)
+        )
+        assert 'ix_pesajes_nro_op (nro_op=? AND deleted_at=?)' in _plan(query)
+    
+    def test_avance_excluye_ops_cerradas(self, app):
+        cerradas = db.session.query(OpCerrada.nro_op)
+        query = Pesaje.active().filter(
+            db.or_(Pesaje.nro_op.is_(None), Pesaje.nro_op.notin_(cerradas))
+        ).order_by(Pesaje.fecha_hora.desc())
+        plan = _plan(query)
+        assert 'ix_pesajes_activos_fecha' in plan
+        assert 'SCAN pesajes\n' not in plan + '\n'
+    
+    def test_pagina_por_cursor(self, app):
+        # Mismo query que arma app.utils.pagination.keyset_page
+        query = Pesaje.active().filter(
+            tuple_(Pesaje.fecha_hora, Pesaje.id) < tuple_(datetime(2026, 1, 3), 1500)
+        ).order_by(Pesaje.fecha_hora.desc(), Pesaje.id.desc()).limit(21)
+        plan = _plan(query)
+        assert 'ix_pesajes_activos_fecha (deleted_at=? AND fecha_hora<?)' in plan
+        assert 'TEMP B-TREE' not in plan
@@ -0,0 +1,78 @@
+"""
+Tests de creación de pesajes en lote (POST /api/pesajes/batch).
+"""
+from app import db
+from app.models.pesaje import Pesaje
+
+
+class TestPesajesBatch:
+    
+    def test_crea_lote(self, client):
+        items = [{'peso_kg': 10 + i, 'nro_op': 'OP1354', 'molde': 'TAPA'} for i in range(5)]
+        response = client.post('/api/pesajes/batch', json={'items': items})
+        
+        assert response.status_code == 201
+        data = response.get_json()
+        assert data['creados'] == 5
+        assert data['errores'] == 0
+        ids = [r['id'] for r in data['resultados']]
+        assert len(set(ids)) == 5
+        assert [db.session.get(Pesaje, i).peso_kg for i in ids] == [10, 11, 12, 13, 14]
+    
+    def test_items_invalidos_se_reportan(self, client):
+        items = [{'peso_kg': 5}, {'nro_op': 'OP1'}, {'peso_kg': 'abc'}, {'peso_kg': '7.5'}]
+        response = client.post('/api/pesajes/batch', json=items)
+        
+        data = response.get_json()
+        assert response.status_code == 201
+        assert data['creados'] == 2
+        assert [r['status'] for r in data['resultados']] == ['ok', 'error', 'error', 'ok']
+        assert Pesaje.query.count() == 2
+    
+    def test_conserva_fecha_hora_original(self, client):
+        items = [{'peso_kg': 5, 'fecha_hora': '2026-01-03T08:15:00'}, {'peso_kg': 6}]
+        data = client.post('/api/pesajes/batch', json={'items': items}).get_json()
+        
+        pesaje = db.session.get(Pesaje, data['resultados'][0]['id'])
+        assert pesaje.fecha_hora.isoformat() == '2026-01-03T08:15:00'
+    
+    def test_lote_vacio_o_sin_validos(self, client):
+        assert client.post('/api/pesajes/batch', json={'items': []}).status_code == 400
+        assert client.post('/api/pesajes/batch', json=[{'nro_op': 'X'}]).status_code == 400
+    
+    def test_rechaza_pesos_no_finitos_o_no_positivos(self, client):
+        items = [{'peso_kg': 'nan'}, {'peso_kg': 'inf'}, {'peso_kg': '-inf'}, {'peso_kg': 0},
+                 {'peso_kg': -2}, {'peso_kg': 3}]
+        data = client.post('/api/pesajes/batch', json=items).get_json()
+        
+        assert data['creados'] == 1
+        assert [r['status'] for r in data['resultados']] == ['error'] * 5 + ['ok']
+        assert all(r['error'] == 'peso_kg inválido' for r in data['resultados'][:5])
+        assert [p.peso_kg for p in Pesaje.query.all()] == [3]
+    
+    def test_fecha_hora_ilegible_es_error_del_item(self, client):
+        items = [{'peso_kg': 5, 'fecha_hora': 'ayer'}, {'peso_kg': 6, 'fecha_hora': 123}, {'peso_kg': 7}]
+        data = client.post('/api/pesajes/batch', json=items).get_json()
+        
+        assert [r['status'] for r in data['resultados']] == ['error', 'error', 'ok']
+        assert data['resultados'][0]['error'] == 'fecha_hora inválida'
+        assert Pesaje.query.count() == 1
+    
+    def test_fallo_del_insert_hace_rollback(self, client, monkeypatch):
+        def falla(*args, **kwargs):
+            raise RuntimeError('disco lleno')
+        
+        monkeypatch.setattr(db.session, 'commit', falla)
+        response = client.post('/api/pesajes/batch', json=[{'peso_kg': 5}])
+        monkeypatch.undo()
+        
+        assert response.status_code == 500
+        assert Pesaje.query.count() == 0
+        # La sesión quedó utilizable
+        assert client.post('/api/pesajes/batch', json=[{'peso_kg': 5}]).status_code == 201
+    
+    def test_post_individual_rechaza_fecha_hora_ilegible(self, client):
+        response = client.post('/api/pesajes', json={'peso_kg': 5, 'fecha_hora': 'ayer'})
+        
+        assert response.status_code == 400
+        assert Pesaje.query.count() == 0
@@ -0,0 +1,86 @@
+"""
+Tests de la paginación por cursor de /api/pesajes y /api/pesajes/buscar.
+"""
+from datetime import datetime, timedelta
+import pytest
+from app import db
+from app.models.pesaje import Pesaje
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_page
+
+
+@pytest.fixture
+def pesajes(app):
+    """25 pesajes; de a 5 comparten fecha_hora para probar desempates por id."""
+    base = datetime(2026, 1, 3, 8, 0, 0)
+    db.session.execute(db.insert(Pesaje), [
+        {'peso_kg': 10.0 + i, 'nro_op': 'OP1354' if i % 2 else 'OP2000',
+         'fecha_hora': base + timedelta(minutes=i // 5)}
+        for i in range(25)
+    ])
+    db.session.commit()
+    return [p.id for p in Pesaje.query.order_by(Pesaje.fecha_hora.desc(), Pesaje.id.desc())]
+
+
+def _recorrer(client, url):
+    ids, cursor = [], None
+    while True:
+        sep = '&' if '?' in url else '?'
+        data = client.get(f"{url}{sep}cursor={cursor}" if cursor else url).get_json()
+        ids += [p['id'] for p in data['items']]
+        cursor = data['next_cursor']
+        if not data['has_more']:
+            assert cursor is None
+            return ids
+
+
+class TestCursor:
+    
+    def test_roundtrip(self):
+        token = encode_cursor(datetime(2026, 1, 3, 8, 0, 0, 123), 42)
+        assert decode_cursor(token) == (datetime(2026, 1, 3, 8, 0, 0, 123), 42)
+    
+    def test_cursor_invalido(self, client):
+        assert client.get('/api/pesajes?cursor=xyz').status_code == 400
+
+
+class TestPaginacion:
+    
+    def test_listado_recorre_todo_sin_repetir(self, client, pesajes):
+        assert _recorrer(client, '/api/pesajes?per_page=7') == pesajes
+    
+    def test_busqueda_con_filtro(self, client, pesajes):
+        ids = _recorrer(client, '/api/pesajes/buscar?nro_op=1354&per_page=4')
+        assert len(ids) == 12
+        assert ids == [i for i in pesajes if i in set(ids)]
+    
+    def test_total_opcional(self, client, pesajes):
+        assert 'total' not in client.get('/api/pesajes?per_page=5').get_json()
+        data = client.get('/api/pesajes/buscar?nro_op=2000&incluir_total=1').get_json()
+        assert data['total'] == 13
+    
+    def test_modo_legacy_por_pagina(self, client, pesajes):
+        data = client.get('/api/pesajes?page=2&per_page=10').get_json()
+        assert data['page'] == 2
+        assert data['pages'] == 3
+        assert [p['id'] for p in data['items']] == pesajes[10:20]
+    
+    @pytest.mark.parametrize('per_page', ['0', '-3'])
+    def test_per_page_no_positivo_se_acota_a_1(self, client, pesajes, per_page):
+        data = client.get(f'/api/pesajes?per_page={per_page}').get_json()
+        assert data['per_page'] == 1
+        assert [p['id'] for p in data['items']] == pesajes[:1]
+        assert data['has_more']
+        
+        legacy = client.get(f'/api/pesajes?page=1&per_page={per_page}').get_json()
+        assert len(legacy['items']) == 1
+    
+    @pytest.mark.parametrize('app_config', [{'PESAJES_PER_PAGE_MAX': 10}])
+    def test_per_page_con_tope(self, client, pesajes):
+        data = client.get('/api/pesajes/buscar?per_page=100000').get_json()
+        assert data['per_page'] == 10
+        assert len(data['items']) == 10
+        assert data['has_more']
+    
+    def test_keyset_page_rechaza_per_page_invalido(self, app):
+        with pytest.raises(ValueError):
+            keyset_page(db.session, db.select(Pesaje.id, Pesaje.fecha_hora), Pesaje, 0)
@@ -0,0 +1,107 @@
+"""
+Tests de reconexión con backoff y redescubrimiento del puerto.
+"""
+import os
+import time
+from types import SimpleNamespace
+import pytest
+from app.services import port_discovery
+from app.services.port_discovery import UsbIdentity, find_port, identify_port
+from app.services.scale_manager import ScaleManager
+from app.services.scale_service import ScaleService
+from app.services.scale_simulator import ScaleSimulator, synthetic_lines
+
+
+def _puerto(device, vid=0x1A86, pid=0x7523, serial_number=None):
+    return SimpleNamespace(device=device, vid=vid, pid=pid, serial_number=serial_number)
+
+
+@pytest.fixture
+def puertos(monkeypatch):
+    lista = []
+    monkeypatch.setattr(port_discovery.list_ports, 'comports', lambda: list(lista))
+    return lista
+
+
+class TestPortDiscovery:
+    """Tests de búsqueda por identidad USB"""
+    
+    def test_identifica_y_reencuentra(self, puertos):
+        puertos.append(_puerto('COM4', serial_number='A1'))
+        identity = identify_port('COM4')
+        assert identity == UsbIdentity(0x1A86, 0x7523, 'A1')
+        
+        # Windows re-enumera el adaptador
+        puertos[:] = [_puerto('COM3', serial_number='B2'), _puerto('COM7', serial_number='A1')]
+        assert find_port(identity) == 'COM7'
+    
+    def test_vid_pid_ambiguo_sin_serie(self, puertos):
+        puertos[:] = [_puerto('COM5'), _puerto('COM7')]
+        assert find_port(UsbIdentity(0x1A86, 0x7523)) is None
+    
+    def test_excluye_puertos_de_otras_estaciones(self, puertos):
+        puertos[:] = [_puerto('COM5')]
+        assert find_port(UsbIdentity(0x1A86, 0x7523), exclude={'COM5'}) is None
+    
+    def test_identidad_vacia(self, puertos):
+        puertos.append(_puerto('COM5'))
+        assert find_port(UsbIdentity()) is None
+    
+    def test_servicio_cambia_de_puerto(self, puertos):
+        service = ScaleService(port='COM4', read_timeout=0.05)
+        service.usb_identity = UsbIdentity(0x1A86, 0x7523, 'A1')
+        puertos.append(_puerto('COM9', serial_number='A1'))
+        
+        assert service._rediscover_port()
+        assert service.port == 'COM9'
+    
+    def test_no_toma_el_adaptador_identico_de_otra_estacion(self, puertos):
+        # Dos adaptadores CH340 sin número de serie; se desenchufa el de linea1
+        manager = ScaleManager({'linea1': {'port': 'COM4'}, 'linea2': {'port': 'COM5'}})
+        linea1, linea2 = manager.get('linea1'), manager.get('linea2')
+        for service in (linea1, linea2):
+            service.usb_identity = UsbIdentity(0x1A86, 0x7523)
+        puertos[:] = [_puerto('COM5')]
+        
+        assert not linea1._rediscover_port()
+        assert linea1.port == 'COM4'
+        
+        # Reaparece re-enumerado: ahora sí es el único candidato libre
+        puertos.append(_puerto('COM8'))
+        assert linea1._rediscover_port()
+        assert linea1.port == 'COM8'
+        assert manager.ports_in_use() == {'COM8', 'COM5'}
+
+
+class TestBackoff:
+    """Tests de las esperas entre reintentos"""
+    
+    def test_primer_reintento_rapido_y_luego_exponencial(self):
+        service = ScaleService(port='loop://')
+        service.reconnect_first, service.reconnect_base, service.reconnect_max = 0.2, 1.0, 8.0
+        delays = service._reconnect_delays()
+        
+        assert 0 <= next(delays) <= 0.2
+        esperados = [1.0, 2.0, 4.0, 8.0, 8.0, 8.0]
+        for tope in esperados:
+            assert tope / 2 <= next(delays) <= tope
+    
+    @pytest.mark.skipif(os.name != 'posix', reason='requiere pty')
+    def test_reconecta_tras_desconexion(self):
+        lines = synthetic_lines('net_ticket', seed=1)
+        with ScaleSimulator(lines, rate=50, disconnect_every=0.3, disconnect_for=0.2) as sim:
+            service = ScaleService(port=sim.port, read_timeout=0.05)
+            service.reconnect_first = 0.05
+            service.reconnect_base = 0.1
+            assert service.connect()
+            service.start_listening(lambda weight: None)
+            try:
+                deadline = time.time() + 5
+                while service.metrics.reconnects < 1 and time.time() < deadline:
+                    time.sleep(0.05)
+            finally:
+                service.stop_listening()
+                service.disconnect()
+        
+        assert service.metrics.reconnects >= 1
+        assert service.metrics.downtime_total > 0
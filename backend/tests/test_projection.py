@@ -0,0 +1,42 @@
+"""
+Tests de la capa de lectura por proyección (app/utils/projection.py).
+"""
+from datetime import date, datetime
+import pytest
+from app import db
+from app.models.pesaje import Pesaje, PESAJE_COMPLETO, PESAJE_LISTADO
+
+
+@pytest.fixture
+def pesajes(app):
+    db.session.add_all([
+        Pesaje(peso_kg=25.4, nro_op='OP1354', molde='TAPA', color='ROJO',
+               fecha_orden_trabajo=date(2026, 1, 3), fecha_impresion=datetime(2026, 1, 3, 9, 30),
+               sticker_impreso=True, operador='JUAN'),
+        Pesaje(peso_kg=12.0, nro_op='OP1354', molde='TAPA', color='AZUL'),
+    ])
+    db.session.commit()
+
+
+class TestProjection:
+    
+    def test_completo_igual_a_to_dict(self, app, pesajes):
+        esperado = [p.to_dict() for p in Pesaje.active().order_by(Pesaje.id)]
+        assert PESAJE_COMPLETO.all(db.session, Pesaje.active().order_by(Pesaje.id)) == esperado
+    
+    def test_listado_solo_columnas_de_la_ui(self, client, pesajes):
+        item = client.get('/api/pesajes').get_json()['items'][0]
+        assert set(item) == set(PESAJE_LISTADO.keys)
+        assert 'qr_data_original' not in item
+    
+    def test_campos_completo(self, app, client, pesajes):
+        item = client.get('/api/pesajes/buscar?campos=completo').get_json()['items'][0]
+        esperado = db.session.get(Pesaje, item['id']).to_dict()
+        assert item == app.json.loads(app.json.dumps(esperado))
+    
+    def test_avance_resumen(self, client, pesajes):
+        data = client.get('/api/avance/resumen?detalle=1').get_json()
+        assert data['total_registros'] == 2
+        colores = data['grupos_por_molde'][0]['colores']
+        assert [c['color'] for c in colores] == ['ROJO', 'AZUL']
+        assert set(colores[0]['pesajes'][0]) == {'id', 'peso_kg', 'fecha_hora', 'nro_op', 'nro_orden_trabajo'}
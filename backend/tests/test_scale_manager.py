@@ -0,0 +1,81 @@
+"""
+Tests del gestor de múltiples balanzas.
+"""
+import pytest
+from app import socketio
+from app.services import scale_manager
+from app.services.scale_manager import ScaleManager, parse_stations
+
+
+class TestParseStations:
+    """Tests del formato de SCALE_STATIONS"""
+    
+    def test_varias_estaciones(self):
+        assert parse_stations('linea1=COM4, linea2=COM5@19200') == {
+            'linea1': {'port': 'COM4'},
+            'linea2': {'port': 'COM5', 'baud_rate': 19200},
+        }
+    
+    def test_vacio(self):
+        assert parse_stations('') == {}
+    
+    def test_entrada_invalida(self):
+        with pytest.raises(ValueError):
+            parse_stations('linea1')
+
+
+class TestScaleManager:
+    """Cada estación tiene su propio servicio"""
+    
+    def test_servicio_por_estacion(self):
+        manager = ScaleManager({'linea1': {'port': 'loop://'}, 'linea2': {'port': 'loop://'}})
+        
+        linea1 = manager.get('linea1')
+        linea2 = manager.get('linea2')
+        assert linea1 is not linea2
+        assert linea1.station_id == 'linea1'
+        assert manager.get() is linea1
+        assert [s['estacion'] for s in manager.get_status()] == ['linea1', 'linea2']
+    
+    def test_lecturas_independientes(self):
+        manager = ScaleManager({'linea1': {'port': 'loop://'}, 'linea2': {'port': 'loop://'}})
+        for service in manager.services():
+            assert service.connect()
+        try:
+            manager.get('linea1').serial_connection.write(b'G 1.5\r\n')
+            manager.get('linea2').serial_connection.write(b'G 7.5\r\n')
+            assert manager.get('linea1').read_weight() == 1.5
+            assert manager.get('linea2').read_weight() == 7.5
+        finally:
+            manager.stop_all()
+    
+    def test_estacion_desconocida(self):
+        manager = ScaleManager({'linea1': {'port': 'loop://'}})
+        with pytest.raises(ValueError):
+            manager.get('linea9')
+
+
+class TestEventosEstacion:
+    """Eventos Socket.IO de suscripción por estación"""
+    
+    @pytest.fixture
+    def socket_client(self, app, monkeypatch):
+        monkeypatch.setattr(scale_manager, '_scale_manager', ScaleManager({'linea1': {'port': 'loop://'}}))
+        return socketio.test_client(app)
+    
+    @pytest.mark.parametrize('evento', ['suscribir_estacion', 'desuscribir_estacion',
+                                        'suscribir_peso_raw', 'desuscribir_peso_raw'])
+    def test_estacion_desconocida_emite_error(self, socket_client, evento):
+        socket_client.emit(evento, {'estacion': 'linea9'})
+        
+        recibidos = socket_client.get_received()
+        assert [r['name'] for r in recibidos] == ['error']
+        error = recibidos[0]['args'][0]
+        assert error['evento'] == evento
+        assert error['estacion'] == 'linea9'
+        assert 'linea1' in error['error']
+        assert socket_client.is_connected()
+    
+    def test_estacion_valida_sin_error(self, socket_client):
+        socket_client.emit('suscribir_estacion', {'estacion': 'linea1', 'raw': True})
+        assert socket_client.get_received() == []
@@ -0,0 +1,58 @@
+"""
+Tests de las métricas de ingesta de la balanza.
+"""
+from app.services.scale_metrics import ScaleMetrics
+from app.services.scale_service import ScaleService
+
+
+class TestScaleMetrics:
+    """Tests de los contadores"""
+    
+    def test_lineas_por_segundo(self):
+        metrics = ScaleMetrics()
+        for i in range(50):
+            metrics.record_line(10, now=100.0 + i * 0.1)  # 10 líneas/s durante 5 s
+        
+        assert metrics.lines_read == 50
+        assert metrics.bytes_received == 500
+        # Segundos completos 100-104 en una ventana de 10 s
+        assert metrics.lines_per_second(now=105.0) == 5.0
+        assert metrics.lines_per_second(now=200.0) == 0.0
+    
+    def test_histograma_latencia(self):
+        metrics = ScaleMetrics()
+        for seconds in (0.00005, 0.0003, 0.0003, 2.0):
+            metrics.record_latency(seconds)
+        
+        buckets = {b['le_ms']: b['count'] for b in metrics.latency_histogram()}
+        assert buckets[0.1] == 1
+        assert buckets[0.5] == 2
+        assert buckets[None] == 1
+        assert metrics.latency_summary()['count'] == 4
+    
+    def test_downtime_y_reconexiones(self):
+        metrics = ScaleMetrics()
+        metrics.mark_down()
+        assert metrics.current_downtime >= 0
+        metrics.mark_up()
+        
+        assert metrics.reconnects == 1
+        assert metrics.current_downtime == 0.0
+        assert metrics.downtime_total >= 0
+    
+    def test_parseo_por_protocolo(self):
+        service = ScaleService(port='loop://', read_timeout=0.05, protocol='net_ticket')
+        assert service.connect()
+        try:
+            service.serial_connection.write(b'2.7kg NET\r\nG 2.1\r\n-----\r\n')
+            service.read_weight()
+            service.read_weight()
+            service.read_weight()
+        finally:
+            service.disconnect()
+        
+        metrics = service.get_metrics()
+        assert metrics['lines_read'] == 3
+        assert metrics['ignored_lines'] == 1
+        assert metrics['parse_ok'] == {'net_ticket': 1}
+        assert metrics['parse_fail'] == {'net_ticket': 1}
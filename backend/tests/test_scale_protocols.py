@@ -0,0 +1,108 @@
+"""
+Tests del registro de protocolos de balanza.
+"""
+import pytest
+from app.services.scale_protocols import (
+    ProtocolDetector,
+    ScaleProtocol,
+    get_protocol,
+    is_ignored_line,
+    list_protocols,
+    parse_cascade,
+)
+
+
+class TestProtocolos:
+    """Tests de los parsers incluidos"""
+    
+    @pytest.mark.parametrize('nombre, linea, esperado', [
+        ('net_ticket', b'   2.7kg NET\r\n', 2.7),
+        ('ticket_numerado', b'1.     2.1\r\n', 2.1),
+        ('kg_suffix', b'2.1 kg\r\n', 2.1),
+        ('bare_number', b'  12.35  \r\n', 12.35),
+        ('gn_prefixed', b'N 3.25\r\n', 3.25),
+        ('any_decimal', b'ST,GS,+0004.50\r\n', 4.5),
+    ])
+    def test_parse_formato(self, nombre, linea, esperado):
+        assert get_protocol(nombre).parse(linea) == esperado
+    
+    def test_no_reconoce_otro_formato(self):
+        assert get_protocol('net_ticket').parse(b'G 2.1\r\n') is None
+    
+    def test_bytes_no_ascii_usan_camino_lento(self):
+        """Bytes basura intercalados se ignoran como en el parser legacy"""
+        assert get_protocol('net_ticket').parse(b'2.\xff7kg NET\r\n') == 2.7
+    
+    def test_protocolo_desconocido(self):
+        with pytest.raises(ValueError):
+            get_protocol('no_existe')
+
+
+class TestCascade:
+    """Tests del modo cascade (todos los protocolos en orden)"""
+    
+    def test_prioriza_el_mas_especifico(self):
+        protocol, weight = parse_cascade(b'2.7kg NET\r\n')
+        assert protocol.name == 'net_ticket'
+        assert weight == 2.7
+    
+    def test_linea_sin_peso(self):
+        assert parse_cascade(b'TARA\r\n') is None
+    
+    def test_lineas_ignoradas(self):
+        assert is_ignored_line(b'----------\r\n')
+        assert is_ignored_line(b'S/N 000123\r\n')
+        assert is_ignored_line(b'\r\n')
+        assert not is_ignored_line(b'2.7kg NET\r\n')
+    
+    def test_registro_ordenado(self):
+        nombres = [p.name for p in list_protocols()]
+        assert nombres[0] == 'net_ticket'
+        assert nombres[-1] == 'any_decimal'
+    
+    def test_protocolo_nuevo_no_requiere_tocar_el_loop(self):
+        protocol = ScaleProtocol('test_w', 'W:<peso>', rb'W:(\d+\.\d+)')
+        assert protocol.parse(b'W:7.25\r\n') == 7.25
+
+
+class TestDetector:
+    """Tests de la detección automática de protocolo"""
+    
+    def test_detecta_y_fija_protocolo(self):
+        detector = ProtocolDetector(sample_size=4)
+        for _ in range(4):
+            assert detector.feed(b'   2.7kg NET\r\n') == 2.7
+        
+        assert detector.protocol.name == 'net_ticket'
+        assert detector.confidence == 1.0
+        assert not detector.detecting
+    
+    def test_confianza_parcial(self):
+        detector = ProtocolDetector(sample_size=4)
+        for linea in (b'G 2.1\r\n', b'G 2.2\r\n', b'G 2.3\r\n', b'TARA\r\n'):
+            detector.feed(linea)
+        
+        assert detector.protocol.name == 'gn_prefixed'
+        assert detector.confidence == 0.75
+    
+    def test_redetecta_tras_fallos_consecutivos(self):
+        detector = ProtocolDetector(sample_size=2, max_failures=3)
+        detector.feed(b'G 2.1\r\n')
+        detector.feed(b'G 2.1\r\n')
+        assert detector.protocol.name == 'gn_prefixed'
+        
+        # La balanza cambia de formato
+        for _ in range(3):
+            assert detector.feed(b'1.     2.1\r\n') is None
+        assert detector.detecting
+        
+        detector.feed(b'1.     2.1\r\n')
+        detector.feed(b'1.     2.2\r\n')
+        assert detector.protocol.name == 'ticket_numerado'
+    
+    def test_sin_aciertos_sigue_muestreando(self):
+        detector = ProtocolDetector(sample_size=2)
+        detector.feed(b'TARA\r\n')
+        detector.feed(b'TARA\r\n')
+        assert detector.detecting
+        assert detector.confidence is None
@@ -0,0 +1,106 @@
+"""
+Tests del grabador de capturas crudas.
+"""
+import time
+from datetime import datetime, timedelta
+import pytest
+from app.services import scale_recorder
+from app.services.scale_recorder import CaptureRecorder, iter_capture, replay
+from app.services.scale_simulator import load_capture
+from app.services.scale_service import ScaleService
+
+
+class TestCaptureRecorder:
+    """Tests de escritura y lectura de capturas"""
+    
+    def test_graba_y_lee(self, tmp_path):
+        recorder = CaptureRecorder(str(tmp_path), station_id='linea1')
+        antes = time.time()
+        recorder.record(b'2.7kg NET\r\n')
+        recorder.record(b'\xff\x00 binario\r\n')
+        recorder.close()
+        
+        lineas = list(iter_capture(recorder.path))
+        assert [l.raw for l in lineas] == [b'2.7kg NET\r\n', b'\xff\x00 binario\r\n']
+        assert all(l.station_id == 'linea1' for l in lineas)
+        assert antes - 1 <= lineas[0].wall_time <= time.time() + 1
+        assert lineas[0].monotonic_ns <= lineas[1].monotonic_ns
+    
+    def test_append_de_varias_sesiones(self, tmp_path):
+        for peso in (b'1.0\r\n', b'2.0\r\n'):
+            recorder = CaptureRecorder(str(tmp_path))
+            recorder.record(peso)
+            recorder.close()
+        
+        assert [l.raw for l in iter_capture(recorder.path)] == [b'1.0\r\n', b'2.0\r\n']
+    
+    def test_registro_truncado_se_ignora(self, tmp_path):
+        recorder = CaptureRecorder(str(tmp_path))
+        recorder.record(b'1.0\r\n')
+        recorder.record(b'2.0\r\n')
+        recorder.close()
+        with open(recorder.path, 'r+b') as f:
+            f.truncate(f.seek(0, 2) - 2)
+        
+        assert [l.raw for l in iter_capture(recorder.path)] == [b'1.0\r\n']
+    
+    def test_archivo_invalido(self, tmp_path):
+        archivo = tmp_path / 'otro.bin'
+        archivo.write_bytes(b'no es captura')
+        with pytest.raises(ValueError):
+            list(iter_capture(str(archivo)))
+    
+    def test_replay_y_simulador(self, tmp_path):
+        recorder = CaptureRecorder(str(tmp_path))
+        recorder.record(b'1.0\r\n', monotonic_ns=0)
+        recorder.record(b'2.0\r\n', monotonic_ns=1_000_000)
+        recorder.close()
+        
+        assert list(replay(recorder.path, speed=0)) == [b'1.0\r\n', b'2.0\r\n']
+        assert load_capture(recorder.path) == [b'1.0\r\n', b'2.0\r\n']
+    
+    def test_scale_service_graba_lineas(self, tmp_path):
+        service = ScaleService(port='loop://', read_timeout=0.05)
+        service.recorder = CaptureRecorder(str(tmp_path))
+        assert service.connect()
+        service.serial_connection.write(b'G 4.2\r\n')
+        assert service.read_weight() == 4.2
+        service.disconnect()
+        
+        assert [l.raw for l in iter_capture(service.recorder.path)] == [b'G 4.2\r\n']
+    
+    def test_cambio_de_dia(self, tmp_path, monkeypatch):
+        recorder = CaptureRecorder(str(tmp_path), station_id='linea1')
+        recorder.record(b'1.0\r\n')
+        primero = recorder.path
+        
+        class Manana(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return datetime.now(tz) + timedelta(days=1)
+        
+        monkeypatch.setattr(scale_recorder, 'datetime', Manana)
+        recorder._rollover_at = time.monotonic()  # Pasó la medianoche
+        recorder.record(b'2.0\r\n')
+        recorder.close()
+        
+        assert recorder.path != primero
+        assert [l.raw for l in iter_capture(primero)] == [b'1.0\r\n']
+        assert [l.raw for l in iter_capture(recorder.path)] == [b'2.0\r\n']
+    
+    def test_disconnect_espera_al_lector(self, tmp_path):
+        service = ScaleService(port='loop://', read_timeout=0.05)
+        service.recorder = CaptureRecorder(str(tmp_path))
+        assert service.connect()
+        lecturas = []
+        service.start_listening(lecturas.append)
+        service.serial_connection.write(b'G 4.2\r\n')
+        limite = time.monotonic() + 2
+        while not lecturas and time.monotonic() < limite:
+            time.sleep(0.01)
+        lector = service._listener_thread
+        service.disconnect()
+        
+        assert not lector.is_alive()
+        assert service.recorder._file is None
+        assert [l.raw for l in iter_capture(service.recorder.path)] == [b'G 4.2\r\n']
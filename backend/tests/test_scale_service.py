@@ -0,0 +1,140 @@
+"""
+Tests para ScaleService usando el puerto loopback de pyserial (loop://).
+"""
+import time
+import pytest
+from app.services.scale_service import (
+    ScaleService,
+    READ_MODE_BLOCKING,
+    READ_MODE_POLLING,
+    MAX_LINE_BYTES,
+)
+from app.services.weight_stabilizer import WeightStabilizer
+
+
+@pytest.fixture
+def service():
+    service = ScaleService(port='loop://', baud_rate=9600,
+                           read_mode=READ_MODE_BLOCKING, read_timeout=0.05)
+    assert service.connect()
+    yield service
+    service.stop_listening()
+    service.disconnect()
+
+
+class TestLecturaBlocking:
+    """Tests del lector en modo blocking"""
+    
+    def test_lee_linea_completa(self, service):
+        """Una línea con terminador se parsea de inmediato"""
+        service.serial_connection.write(b'2.7kg NET\r\n')
+        assert service.read_weight() == 2.7
+    
+    def test_acumula_linea_parcial(self, service):
+        """Los bytes sin terminador se acumulan hasta que llega el \\n"""
+        service.serial_connection.write(b'3.4kg')
+        assert service.read_weight() is None
+        service.serial_connection.write(b' NET\r\n')
+        assert service.read_weight() == 3.4
+    
+    def test_linea_sin_terminador_se_entrega_en_silencio(self, service):
+        """Si el puerto queda en silencio, la línea pendiente se entrega"""
+        service.serial_connection.write(b'  5.0  ')
+        assert service.read_weight() is None
+        assert service.read_weight() == 5.0
+    
+    def test_terminador_solo_cr(self, service):
+        """Las balanzas que terminan con \r entregan una línea por trama"""
+        service.serial_connection.write(b'1.5kg NET\r2.5kg NET\r3.5')
+        assert service.read_weight() == 1.5
+        assert service.read_weight() == 2.5
+        assert service._partial_line == b'3.5'
+    
+    def test_descarta_buffer_sin_terminador(self, service):
+        """Sin terminador ni silencio el buffer no crece sin límite"""
+        service.serial_connection.write(b'x' * (MAX_LINE_BYTES + 10))
+        assert service.read_weight() is None
+        assert service._partial_line == b''
+        assert service.metrics.ignored_lines == 1
+    
+    def test_latencia_desde_el_primer_byte(self, service):
+        """La línea se fecha con la llegada de su primer byte, no con la del terminador"""
+        service.serial_connection.write(b'3.4kg')
+        assert service.read_weight() is None
+        time.sleep(0.1)
+        service.serial_connection.write(b' NET\r\n')
+        assert service.read_weight() == 3.4
+        assert time.perf_counter() - service._line_started_at >= 0.1
+    
+    def test_escucha_reporta_latencia(self, service):
+        """El loop entrega pesos al callback y registra la latencia"""
+        recibidos = []
+        service.start_listening(recibidos.append)
+        service.serial_connection.write(b'1.5kg NET\r\n2.5kg NET\r\n')
+        
+        deadline = time.time() + 2
+        while len(recibidos) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        
+        assert recibidos == [1.5, 2.5]
+        status = service.get_status()
+        assert status['read_mode'] == READ_MODE_BLOCKING
+        assert status['latency']['count'] == 2
+        assert status['latency']['max_ms'] < 50
+
+
+    def test_escucha_avisa_fin_de_meseta(self, service):
+        """on_unstable solo se llama cuando el peso sale de la tolerancia, no por vibración"""
+        reloj = iter(i * 0.1 for i in range(100))
+        service.stabilizer = WeightStabilizer(window=5, tolerance=0.02, min_dwell=0.0,
+                                              clock=lambda: next(reloj))
+        eventos = []
+        lecturas = [2.5] * 5 + [2.51, 2.49, 2.5, 2.51] + [4.0]
+        service.serial_connection.write(b''.join(b'%.2fkg NET\r\n' % p for p in lecturas))
+        
+        # Mismo camino que el loop de escucha, sin hilo
+        for _ in lecturas:
+            service._dispatch_weight(service.read_weight(),
+                                     lambda peso: eventos.append(('peso', peso)),
+                                     on_stable=lambda peso: eventos.append(('estable', peso)),
+                                     on_unstable=lambda peso: eventos.append(('inestable', peso)))
+        
+        assert [e for e in eventos if e[0] != 'peso'] == [('estable', 2.5), ('inestable', 4.0)]
+        assert len(eventos) == len(lecturas) + 2
+
+
+class TestLecturaPolling:
+    """El modo polling legacy sigue disponible"""
+    
+    def test_polling_lee_linea(self):
+        service = ScaleService(port='loop://', baud_rate=9600,
+                               read_mode=READ_MODE_POLLING)
+        assert service.connect()
+        try:
+            assert service.read_weight() is None
+            service.serial_connection.write(b'G 4.2\r\n')
+            assert service.read_weight() == 4.2
+        finally:
+            service.disconnect()
+
+
+class TestDeteccionProtocolo:
+    """La detección automática se refleja en get_status()"""
+    
+    def test_status_incluye_protocolo_detectado(self):
+        service = ScaleService(port='loop://', baud_rate=9600,
+                               read_mode=READ_MODE_BLOCKING, read_timeout=0.05,
+                               protocol='auto')
+        assert service.connect()
+        try:
+            assert service.get_status()['protocol'] is None
+            for _ in range(10):
+                service.serial_connection.write(b'G 4.2\r\n')
+                assert service.read_weight() == 4.2
+            
+            status = service.get_status()
+            assert status['protocol_mode'] == 'auto'
+            assert status['protocol'] == 'gn_prefixed'
+            assert status['protocol_confidence'] == 1.0
+        finally:
+            service.disconnect()
@@ -0,0 +1,91 @@
+"""
+Tests de la balanza simulada sobre pty.
+"""
+import itertools
+import os
+import time
+import pytest
+from app.services.scale_service import ScaleService
+from app.services.scale_simulator import ScaleSimulator, load_capture, synthetic_lines, synthetic_weights
+from app.services.weight_stabilizer import WeightStabilizer
+
+pytestmark = pytest.mark.skipif(os.name != 'posix', reason='requiere pty')
+
+
+def _esperar(condicion, timeout=3.0):
+    deadline = time.time() + timeout
+    while not condicion() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+class TestSyntheticWeights:
+    """Pesos sintéticos (sin pty)"""
+    
+    @pytest.mark.parametrize('rate', [10, 500, 5000])
+    def test_meseta_supera_min_dwell_a_cualquier_tasa(self, rate):
+        stabilizer = WeightStabilizer(window=5, tolerance=0.02, min_dwell=0.5)
+        pesos = itertools.islice(synthetic_weights(seed=1, rate=rate), 3 * (rate + 40))
+        estables = [p for i, p in enumerate(pesos) if stabilizer.push(p, timestamp=i / rate) is not None]
+        assert len([p for p in estables if p > 0]) >= 2
+    
+    def test_sin_rate_conserva_hold_lines(self):
+        pesos = list(itertools.islice(synthetic_weights(seed=1, empty_lines=1, settle_lines=1, hold_lines=3), 5))
+        assert pesos[0] == 0.0
+        assert pesos[2] == pesos[3] == pesos[4]
+
+
+class TestScaleSimulator:
+    """El simulador alimenta a ScaleService por un pty real"""
+    
+    def test_lecturas_sinteticas(self):
+        lines = synthetic_lines('gn_prefixed', seed=1)
+        with ScaleSimulator(lines, rate=500) as sim:
+            service = ScaleService(port=sim.port, read_timeout=0.05, protocol='auto')
+            assert service.connect()
+            recibidos = []
+            service.start_listening(recibidos.append)
+            try:
+                _esperar(lambda: len(recibidos) >= 50)
+            finally:
+                service.stop_listening()
+                service.disconnect()
+        
+        assert len(recibidos) >= 50
+        assert service.get_status()['protocol'] == 'gn_prefixed'
+    
+    def test_reproduce_captura(self, tmp_path):
+        captura = tmp_path / 'captura.txt'
+        captura.write_text(
+            "RAW BINARY: b'   2.7kg NET\\r\\n'  ->  TEXT: '   2.7kg NET'\n"
+            "RAW BINARY: b'---------\\r\\n'  ->  TEXT: '---------'\n"
+            "3.1kg NET\n"
+        )
+        lines = load_capture(str(captura))
+        assert lines == [b'   2.7kg NET\r\n', b'---------\r\n', b'3.1kg NET\r\n']
+        
+        with ScaleSimulator(lines, rate=100, start_delay=0.3) as sim:
+            service = ScaleService(port=sim.port, read_timeout=0.05, protocol='net_ticket')
+            assert service.connect()
+            recibidos = []
+            service.start_listening(recibidos.append)
+            try:
+                _esperar(lambda: len(recibidos) >= 2)
+            finally:
+                service.stop_listening()
+                service.disconnect()
+        
+        assert recibidos == [2.7, 3.1]
+    
+    def test_desconexion_simulada(self):
+        lines = synthetic_lines('net_ticket', seed=1)
+        with ScaleSimulator(lines, rate=50, disconnect_every=0.2, disconnect_for=0.2) as sim:
+            service = ScaleService(port=sim.port, read_timeout=0.05)
+            assert service.connect()
+            try:
+                with pytest.raises(Exception):
+                    deadline = time.time() + 3
+                    while time.time() < deadline:
+                        service.read_weight()
+            finally:
+                service.disconnect()
+            assert sim.disconnects >= 1
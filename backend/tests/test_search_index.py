@@ -0,0 +1,74 @@
+"""
+Tests del índice de búsqueda por subcadena (FTS5 trigram en SQLite).
+"""
+import pytest
+from flask import Flask
+from sqlalchemy import text
+from app import db
+from app.migrations import run_migrations
+import app.models  # noqa: F401
+from app.models.pesaje import Pesaje
+from app.services.search_index import substring_filter
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'busqueda.db'}"
+    db.init_app(app)
+    with app.app_context():
+        run_migrations(db)
+        db.session.add_all([
+            Pesaje(peso_kg=10, nro_op='OP1354', molde='CERNIDOR ROMANO', nro_orden_trabajo='0012'),
+            Pesaje(peso_kg=11, nro_op='OP2001', molde='TAPA ROSCA', nro_orden_trabajo='0013'),
+            Pesaje(peso_kg=12, nro_op='OP1399', molde='BALDE 20L', nro_orden_trabajo='0112'),
+        ])
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+def _buscar(**terms):
+    criterio = substring_filter(Pesaje, db.session, terms)
+    return sorted(p.nro_op for p in Pesaje.active().filter(criterio))
+
+
+class TestSubstringFilter:
+    
+    def test_subcadena_y_prefijo(self, app):
+        assert _buscar(nro_op='13') == ['OP1354', 'OP1399']
+        assert _buscar(nro_op='op13') == ['OP1354', 'OP1399']  # Sin distinguir mayúsculas
+        assert _buscar(molde='romano') == ['OP1354']
+        assert _buscar(nro_orden_trabajo='011') == ['OP1399']
+    
+    def test_varias_columnas(self, app):
+        assert _buscar(nro_op='OP1', molde='BALDE') == ['OP1399']
+    
+    def test_sin_terminos(self, app):
+        assert substring_filter(Pesaje, db.session, {'nro_op': ''}) is None
+    
+    def test_sincronizado_en_update_y_delete(self, app):
+        pesaje = Pesaje.query.filter_by(nro_op='OP2001').one()
+        pesaje.molde = 'BALDE 4L'
+        db.session.commit()
+        assert _buscar(molde='BALDE') == ['OP1399', 'OP2001']
+        assert _buscar(molde='ROSCA') == []
+        
+        pesaje.soft_delete()
+        db.session.commit()
+        assert _buscar(molde='BALDE') == ['OP1399']
+        
+        db.session.delete(Pesaje.query.filter_by(nro_op='OP1399').one())
+        db.session.commit()
+        assert db.session.execute(text(
+            "SELECT rowid FROM pesajes_fts WHERE molde LIKE '%BALDE 20%'"
+        )).all() == []
+    
+    def test_termino_comun_usa_ilike(self, app, monkeypatch):
+        from app.services import search_index
+        
+        monkeypatch.setattr(search_index, 'FTS_MAX_MATCHES', 1)
+        criterio = substring_filter(Pesaje, db.session, {'nro_op': 'OP1'})
+        assert 'LIKE' in str(criterio.compile(db.engine)).upper()
+        assert _buscar(nro_op='OP1') == ['OP1354', 'OP1399']
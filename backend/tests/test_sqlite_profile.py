@@ -0,0 +1,41 @@
+"""
+Tests del perfil de rendimiento SQLite.
+"""
+from sqlalchemy import create_engine
+from app.config import Config
+from app.utils import sqlite_profile
+
+
+def _config(uri):
+    config = {k: getattr(Config, k) for k in dir(Config) if k.isupper()}
+    config['SQLALCHEMY_DATABASE_URI'] = uri
+    return config
+
+
+class TestEngineOptions:
+    
+    def test_archivo_usa_pool(self):
+        options = sqlite_profile.engine_options(_config('sqlite:///pesajes.db'))
+        assert options['pool_size'] == Config.SQLITE_POOL_SIZE
+        assert options['connect_args']['check_same_thread'] is False
+    
+    def test_memoria_y_postgres_sin_opciones(self):
+        assert sqlite_profile.engine_options(_config('sqlite:///:memory:')) == {}
+        assert sqlite_profile.engine_options(_config('sqlite://')) == {}
+        assert sqlite_profile.engine_options(_config('postgresql://u:p@localhost/db')) == {}
+
+
+class TestPragmas:
+    
+    def test_pragmas_en_cada_conexion(self, tmp_path):
+        uri = f"sqlite:///{tmp_path / 'perfil.db'}"
+        config = _config(uri)
+        engine = create_engine(uri, **sqlite_profile.engine_options(config))
+        sqlite_profile.install(engine, config)
+        
+        valores = sqlite_profile.describe(engine)
+        assert valores['journal_mode'] == 'wal'
+        assert valores['synchronous'] == 1  # NORMAL
+        assert valores['cache_size'] == -Config.SQLITE_CACHE_SIZE_KB
+        assert valores['busy_timeout'] == Config.SQLITE_BUSY_TIMEOUT_MS
+        engine.dispose()
@@ -0,0 +1,93 @@
+"""
+Tests del emisor con coalescing de pesos.
+
+Se avanza el emisor con pump() y un reloj falso (sin hilo ni sleeps); solo
+test_hilo_emisor usa el hilo real.
+"""
+import time
+import pytest
+from app.services.weight_broadcaster import CoalescingEmitter
+
+
+class RelojFalso:
+    def __init__(self):
+        self.ahora = 1000.0
+    
+    def __call__(self):
+        return self.ahora
+
+
+@pytest.fixture
+def emitidos():
+    return []
+
+
+@pytest.fixture
+def reloj():
+    return RelojFalso()
+
+
+@pytest.fixture
+def emitter(emitidos, reloj):
+    return CoalescingEmitter(emitidos.append, max_rate_hz=20, clock=reloj, background=False)
+
+
+class TestCoalescingEmitter:
+    """Tests de coalescing, rate limit y descarte de repetidos"""
+    
+    def test_primer_valor_sale_de_inmediato(self, emitter, emitidos):
+        emitter.submit(2.5)
+        assert emitter.pump() == 0
+        assert emitidos == [2.5]
+    
+    def test_rafaga_se_reduce_al_ultimo_valor(self, emitter, emitidos, reloj):
+        emitter.submit(1.0)
+        emitter.pump()
+        for i in range(100):
+            emitter.submit(2.0 + i / 100)
+        assert emitter.pump() == pytest.approx(0.05)
+        
+        reloj.ahora += 0.05
+        emitter.pump()
+        assert emitidos == [1.0, 2.99]
+        stats = emitter.get_stats()
+        assert stats['received'] == 101
+        assert stats['coalesced'] == 99
+        assert stats['emitted'] == 2
+    
+    def test_descarta_repetidos(self, emitter, emitidos, reloj):
+        for _ in range(3):
+            emitter.submit(3.0)
+            emitter.pump()
+            reloj.ahora += 0.08
+        
+        assert emitidos == [3.0]
+        assert emitter.get_stats()['duplicates'] == 2
+    
+    def test_respeta_tasa_maxima(self, emitter, emitidos, reloj):
+        emitter.submit(0.0)
+        emitter.pump()
+        reloj.ahora += 0.01
+        emitter.submit(1.0)
+        # 20 Hz: a lo sumo una emisión cada 50 ms
+        assert emitter.pump() == pytest.approx(0.04)
+        assert emitidos == [0.0]
+        
+        reloj.ahora += 0.04
+        assert emitter.pump() == 0
+        assert emitidos == [0.0, 1.0]
+    
+    def test_hilo_emisor(self, emitidos):
+        emitter = CoalescingEmitter(emitidos.append, max_rate_hz=20)
+        try:
+            emitter.submit(2.5)
+            deadline = time.monotonic() + 5
+            while not emitidos and time.monotonic() < deadline:
+                time.sleep(0.005)
+        finally:
+            emitter.close()
+        assert emitidos == [2.5]
+    
+    def test_tasa_invalida(self):
+        with pytest.raises(ValueError):
+            CoalescingEmitter(print, max_rate_hz=0)
@@ -0,0 +1,65 @@
+"""
+Tests del estabilizador de peso (ring buffer).
+"""
+import pytest
+from app.services.weight_stabilizer import WeightStabilizer
+
+
+def _alimentar(stabilizer, lecturas, intervalo=0.1):
+    """Empuja lecturas espaciadas `intervalo` segundos y retorna las estables."""
+    estables = []
+    for i, peso in enumerate(lecturas):
+        valor = stabilizer.push(peso, timestamp=i * intervalo)
+        if valor is not None:
+            estables.append(valor)
+    return estables
+
+
+class TestWeightStabilizer:
+    """Tests de la detección de peso estable"""
+    
+    def test_lecturas_oscilando_no_son_estables(self):
+        stabilizer = WeightStabilizer(window=3, tolerance=0.02, min_dwell=0.0)
+        assert _alimentar(stabilizer, [2.0, 2.5, 2.1, 2.6, 2.2, 2.7]) == []
+    
+    def test_emite_una_vez_por_meseta(self):
+        stabilizer = WeightStabilizer(window=3, tolerance=0.02, min_dwell=0.0)
+        estables = _alimentar(stabilizer, [1.0, 2.4, 2.5, 2.5, 2.5, 2.51, 2.5, 2.5])
+        assert estables == [2.5]
+    
+    def test_respeta_tiempo_minimo(self):
+        stabilizer = WeightStabilizer(window=3, tolerance=0.02, min_dwell=0.5)
+        # Ventana llena en t=0.2 pero la meseta empezó en t=0.0: estable en t=0.5
+        estables = []
+        for i in range(8):
+            valor = stabilizer.push(3.0, timestamp=i * 0.1)
+            if valor is not None:
+                estables.append((i, valor))
+        assert estables == [(5, 3.0)]
+    
+    def test_se_rearma_al_cambiar_el_peso(self):
+        stabilizer = WeightStabilizer(window=2, tolerance=0.02, min_dwell=0.0)
+        estables = _alimentar(stabilizer, [2.5, 2.5, 2.5, 0.0, 0.0, 3.1, 3.1])
+        assert estables == [2.5, 0.0, 3.1]
+    
+    def test_fin_de_meseta_solo_al_salir_de_la_tolerancia(self):
+        stabilizer = WeightStabilizer(window=3, tolerance=0.02, min_dwell=0.0)
+        assert _alimentar(stabilizer, [2.5, 2.5, 2.5]) == [2.5]
+        # Vibración dentro de la tolerancia: la meseta sigue (la UI mantiene F2 habilitado)
+        for i, peso in enumerate([2.51, 2.49, 2.51, 2.5], start=3):
+            assert stabilizer.push(peso, timestamp=i * 0.1) is None
+            assert not stabilizer.plateau_ended
+        assert stabilizer.push(2.8, timestamp=0.8) is None
+        assert stabilizer.plateau_ended
+        assert stabilizer.push(2.8, timestamp=0.9) is None
+        assert not stabilizer.plateau_ended
+    
+    def test_reset_vacia_el_buffer(self):
+        stabilizer = WeightStabilizer(window=3, tolerance=0.02, min_dwell=0.0)
+        _alimentar(stabilizer, [2.5, 2.5])
+        stabilizer.reset()
+        assert stabilizer.push(2.5, timestamp=1.0) is None
+    
+    def test_window_invalida(self):
+        with pytest.raises(ValueError):
+            WeightStabilizer(window=0)
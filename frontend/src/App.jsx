@@ -14,6 +14,7 @@ function App() {
   
   // Weight state
   const [peso, setPeso] = useState(0);
+  const [pesoEstable, setPesoEstable] = useState(false);
   
   // QR and form data
   const [qrInput, setQrInput] = useState('');
@@ -59,14 +60,29 @@ function App() {
   }, []);
 
   // WebSocket: escuchar peso en vivo desde la balanza
+  // 'peso' solo actualiza el valor mostrado: la vibración dentro de la tolerancia
+  // no invalida la meseta. El backend avisa con 'peso_inestable' cuando termina.
   useEffect(() => {
     const handlePeso = (data) => {
       if (data.peso_kg !== null) {
         setPeso(data.peso_kg);
       }
     };
+    const handlePesoEstable = (data) => {
+      if (data.peso_kg !== null) {
+        setPeso(data.peso_kg);
+        setPesoEstable(true);
+      }
+    };
+    const handlePesoInestable = () => setPesoEstable(false);
     socket.on('peso', handlePeso);
-    return () => socket.off('peso', handlePeso);
+    socket.on('peso_estable', handlePesoEstable);
+    socket.on('peso_inestable', handlePesoInestable);
+    return () => {
+      socket.off('peso', handlePeso);
+      socket.off('peso_estable', handlePesoEstable);
+      socket.off('peso_inestable', handlePesoInestable);
+    };
   }, []);
 
   // WebSocket: escuchar actualizaciones de pesajes
@@ -83,6 +99,10 @@ function App() {
     const handleBalanzaStatus = (data) => {
       const wasConnected = connected;
       setConnected(data.connected);
+      if (!data.connected) {
+        // Al reconectar el estabilizador arranca de cero: esperar una meseta nueva
+        setPesoEstable(false);
+      }
       if (data.listening !== undefined) {
         setListening(data.listening);
       }
@@ -107,7 +127,7 @@ function App() {
     };
     window.addEventListener('keydown', handleKeyDown);
     return () => window.removeEventListener('keydown', handleKeyDown);
-  }, [peso, formData, cooldown, activeTab]);
+  }, [peso, pesoEstable, formData, cooldown, activeTab]);
 
   const checkStatus = async () => {
     try {
@@ -121,7 +141,7 @@ function App() {
 
   const loadPesajes = async () => {
     try {
-      const { data } = await pesajesApi.listar(1, 15);
+      const { data } = await pesajesApi.listar(15);
       setPesajes(data.items || []);
     } catch (err) {
       console.error('Error loading pesajes:', err);
@@ -226,6 +246,10 @@ function App() {
       showToast('⚠️ Peso inválido (mínimo 1 kg)', 'error');
       return;
     }
+    if (!pesoEstable) {
+      showToast('⏳ Esperando peso estable...', 'error');
+      return;
+    }
     if (!formData.nro_op) {
       showToast('⚠️ Escanea un QR primero', 'error');
       return;
@@ -728,11 +752,13 @@ function App() {
                       ? 'Conectar balanza para capturar peso'
                       : cooldown
                         ? '⏳ Cooldown... espera'
-                        : '📡 En vivo — Presiona F2 para aceptar'
+                        : pesoEstable
+                          ? '✅ Estable — Presiona F2 para aceptar'
+                          : '📡 En vivo — Estabilizando...'
                     }
                   </div>
                 </div>
-                {activeTab === 'pesar' && listening && !cooldown && peso >= 1.0 && formData.nro_op && (
+                {activeTab === 'pesar' && listening && !cooldown && pesoEstable && peso >= 1.0 && formData.nro_op && (
                   <button
                     className="btn btn-primary"
                     onClick={handleAceptarPeso}
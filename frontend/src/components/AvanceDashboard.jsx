@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { avanceApi } from '../services/api';
 import socket from '../services/socket';
 import './AvanceDashboard.css';
@@ -31,6 +31,10 @@ const COLOR_MAP = {
   'SANDIA':       'pattern',
 };
 
+// Clave de un grupo (molde, color): JSON de la tupla, sin separador que
+// pueda aparecer en los nombres
+const grupoKey = (molde, color) => JSON.stringify([molde, color]);
+
 // Componente de punto de color
 const ColorDot = ({ color }) => {
   const hex = COLOR_MAP[color];
@@ -51,9 +55,22 @@ function AvanceDashboard() {
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [bigMode, setBigMode] = useState(false);
-  // expanded: { molde: bool } para nivel 1, { "molde|color": bool } para nivel 2
+  // expanded: { molde: bool } para nivel 1, { grupoKey(molde, color): bool } para nivel 2
   const [expandedMoldes, setExpandedMoldes] = useState({});
   const [expandedColors, setExpandedColors] = useState({});
+  // Pesajes por grupoKey(molde, color), cargados solo para los colores abiertos
+  const [detalles, setDetalles] = useState({});
+  const expandedColorsRef = useRef({});
+  expandedColorsRef.current = expandedColors;
+
+  const loadDetalle = async (molde, color) => {
+    try {
+      const { data } = await avanceApi.pesajes(molde, color);
+      setDetalles(prev => ({ ...prev, [grupoKey(molde, color)]: data }));
+    } catch (err) {
+      console.error('Error cargando pesajes del grupo:', err);
+    }
+  };
 
   const loadData = async () => {
     try {
@@ -72,12 +89,19 @@ function AvanceDashboard() {
           const merged = {};
           data.grupos_por_molde.forEach((m) => {
             m.colores.forEach((c) => {
-              const key = `${m.molde}|${c.color}`;
+              const key = grupoKey(m.molde, c.color);
               merged[key] = prev[key] !== undefined ? prev[key] : false;
             });
           });
           return merged;
         });
+        // Refrescar el detalle de los colores abiertos
+        Object.entries(expandedColorsRef.current).forEach(([key, open]) => {
+          if (open) {
+            const [molde, color] = JSON.parse(key);
+            loadDetalle(molde, color);
+          }
+        });
       }
     } catch (err) {
       console.error('Error cargando avance:', err);
@@ -95,7 +119,14 @@ function AvanceDashboard() {
   }, []);
 
   const toggleMolde = (molde) => setExpandedMoldes(prev => ({ ...prev, [molde]: !prev[molde] }));
-  const toggleColor = (key) => setExpandedColors(prev => ({ ...prev, [key]: !prev[key] }));
+  const toggleColor = (molde, color) => {
+    const key = grupoKey(molde, color);
+    const abrir = !expandedColors[key];
+    setExpandedColors(prev => ({ ...prev, [key]: abrir }));
+    if (abrir) {
+      loadDetalle(molde, color);
+    }
+  };
 
   const setAll = (val) => {
     if (!resumen?.grupos_por_molde) return;
@@ -103,10 +134,15 @@ function AvanceDashboard() {
     const colors = {};
     resumen.grupos_por_molde.forEach(m => {
       moldes[m.molde] = val;
-      m.colores.forEach(c => { colors[`${m.molde}|${c.color}`] = val; });
+      m.colores.forEach(c => { colors[grupoKey(m.molde, c.color)] = val; });
     });
     setExpandedMoldes(moldes);
     setExpandedColors(colors);
+    if (val) {
+      resumen.grupos_por_molde.forEach(m => {
+        m.colores.forEach(c => loadDetalle(m.molde, c.color));
+      });
+    }
   };
 
   const formatTime = (iso) => {
@@ -149,12 +185,13 @@ function AvanceDashboard() {
             {isMoldeOpen && (
               <div className="molde-body">
                 {moldeGroup.colores.map((colorGroup) => {
-                  const colorKey = `${moldeGroup.molde}|${colorGroup.color}`;
+                  const colorKey = grupoKey(moldeGroup.molde, colorGroup.color);
                   const isColorOpen = expandedColors[colorKey];
+                  const pesajes = detalles[colorKey] || [];
 
                   return (
                     <div key={colorKey} className={`color-group ${isColorOpen ? 'open' : ''}`}>
-                      <div className="color-header" onClick={() => toggleColor(colorKey)}>
+                      <div className="color-header" onClick={() => toggleColor(moldeGroup.molde, colorGroup.color)}>
                         <div className="color-left">
                           <span className="expand-icon">{isColorOpen ? '▼' : '▶'}</span>
                           <ColorDot color={colorGroup.color} />
@@ -170,9 +207,9 @@ function AvanceDashboard() {
                       {isColorOpen && (
                         <div className="color-body">
                           <div className="bolsas-list">
-                            {colorGroup.pesajes.map((p, i) => (
+                            {pesajes.map((p, i) => (
                               <div key={p.id} className="bolsa-row">
-                                <span className="bolsa-num">#{colorGroup.pesajes.length - i}</span>
+                                <span className="bolsa-num">#{pesajes.length - i}</span>
                                 <span className="bolsa-time">{formatTime(p.fecha_hora)}</span>
                                 <span className="bolsa-ot">OT {p.nro_orden_trabajo || '—'}</span>
                                 <span className="bolsa-peso">{p.peso_kg?.toFixed(1)} kg</span>
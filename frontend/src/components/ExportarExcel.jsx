@@ -1,5 +1,6 @@
 import { useState } from 'react';
 import { pesajesApi } from '../services/api';
+import socket from '../services/socket';
 import './GenerarOrdenTrabajo.css'; // Usamos los mismos estilos del modal
 
 export default function ExportarExcel({ onClose }) {
@@ -12,52 +13,57 @@ export default function ExportarExcel({ onClose }) {
   
   const [fechaInicio, setFechaInicio] = useState(formatDate(haceUnMes));
   const [fechaFin, setFechaFin] = useState(formatDate(hoy));
+  const [formato, setFormato] = useState('xlsx');
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState('');
 
+  const [progreso, setProgreso] = useState(null);
+
+  // Espera el fin del trabajo por 'export_progress' (y consulta el estado por si ya terminó)
+  const esperarExportacion = (jobId) => new Promise((resolve, reject) => {
+    const finalizar = (job) => {
+      if (job.estado === 'listo' || job.estado === 'error') {
+        socket.off('export_progress', handler);
+        if (job.estado === 'listo') resolve(job);
+        else reject(new Error(job.error || 'Error en la exportación'));
+        return true;
+      }
+      return false;
+    };
+    const handler = (job) => {
+      if (job.job_id !== jobId) return;
+      setProgreso(job.porcentaje);
+      finalizar(job);
+    };
+    socket.on('export_progress', handler);
+    pesajesApi.estadoExportacion(jobId)
+      .then(({ data }) => finalizar(data))
+      .catch(() => {});
+  });
+
   const handleExportar = async () => {
     try {
       setLoading(true);
       setError('');
+      setProgreso(null);
       
-      const response = await pesajesApi.exportarExcel(fechaInicio, fechaFin);
-      
-      // Crear un blob link para descargar
-      const url = window.URL.createObjectURL(new Blob([response.data]));
-      const link = document.createElement('a');
-      link.href = url;
-      
-      // Extraer nombre del archivo si viene en los headers, o usar default
-      let filename = 'pesajes.xlsx';
-      const disposition = response.headers['content-disposition'];
-      if (disposition && disposition.indexOf('attachment') !== -1) {
-          const filenameRegex = /filename[^;=\n]*=((['"]).*?\2|[^;\n]*)/;
-          const matches = filenameRegex.exec(disposition);
-          if (matches != null && matches[1]) { 
-              filename = matches[1].replace(/['"]/g, '');
-          }
+      let { data: job } = await pesajesApi.crearExportacion(fechaInicio, fechaFin, formato);
+      if (job.estado !== 'listo') {
+        job = await esperarExportacion(job.job_id);
       }
       
-      link.setAttribute('download', filename);
+      // Descarga directa del archivo generado (el navegador lo guarda sin pasar por memoria)
+      const link = document.createElement('a');
+      link.href = pesajesApi.urlDescargaExportacion(job.job_id);
+      link.setAttribute('download', job.archivo);
       document.body.appendChild(link);
       link.click();
       link.parentNode.removeChild(link);
       
       onClose();
     } catch (err) {
-      console.error('Error exportando Excel:', err);
-      // Extraer msj de error si viene en JSON a pesar de ser blob
-      if (err.response && err.response.data && err.response.data.text) {
-        try {
-          const textData = await err.response.data.text();
-          const jsonError = JSON.parse(textData);
-          if (jsonError.error) {
-             setError(jsonError.error);
-             return;
-          }
-        } catch (e) {}
-      }
-      setError('Hubo un error al generar el Excel. Intente nuevamente.');
+      console.error('Error exportando:', err);
+      setError(err.response?.data?.error || err.message || 'Hubo un error al generar la exportación. Intente nuevamente.');
     } finally {
       setLoading(false);
     }
@@ -97,6 +103,16 @@ export default function ExportarExcel({ onClose }) {
               min={fechaInicio}
             />
           </div>
+          
+          <div className="orden-trabajo-field" style={{ marginTop: '0.75rem' }}>
+            <label>Formato:</label>
+            <select value={formato} onChange={(e) => setFormato(e.target.value)} disabled={loading}>
+              <option value="xlsx">Excel (.xlsx)</option>
+              <option value="csv">CSV (.csv)</option>
+              <option value="ndjson">NDJSON (.ndjson)</option>
+              <option value="parquet">Parquet (.parquet)</option>
+            </select>
+          </div>
         </div>
         
         <div className="orden-trabajo-actions">
@@ -112,7 +128,7 @@ export default function ExportarExcel({ onClose }) {
             onClick={handleExportar}
             disabled={loading}
           >
-            {loading ? '⏳ Generando Excel...' : '📥 Descargar Excel'}
+            {loading ? `⏳ Generando archivo${progreso != null ? ` (${progreso}%)` : '...'}` : '📥 Descargar'}
           </button>
         </div>
       </div>
@@ -13,7 +13,8 @@ function GestionPesajes() {
     fecha_inicio: '',
     fecha_fin: ''
   });
-  const [pagination, setPagination] = useState({ page: 1, pages: 1, total: 0 });
+  // Paginación por cursor: cursors[n] es el cursor de la página n+1 (null = primera)
+  const [pagination, setPagination] = useState({ page: 1, cursors: [null], hasMore: false, total: 0 });
   const [selected, setSelected] = useState(new Set());
   const [toast, setToast] = useState(null);
   
@@ -28,9 +29,14 @@ function GestionPesajes() {
   const buscar = async (page = 1) => {
     setLoading(true);
     try {
-      const { data } = await pesajesApi.buscar({ ...filters, page, per_page: 30 });
+      const cursors = page === 1 ? [null] : pagination.cursors;
+      const { data } = await pesajesApi.buscar({
+        ...filters, cursor: cursors[page - 1], per_page: 30, incluir_total: true
+      });
+      const nextCursors = cursors.slice(0, page);
+      if (data.next_cursor) nextCursors.push(data.next_cursor);
       setPesajes(data.items || []);
-      setPagination({ page: data.page, pages: data.pages, total: data.total });
+      setPagination({ page, cursors: nextCursors, hasMore: data.has_more, total: data.total });
       setSelected(new Set());
     } catch (err) {
       console.error('Error buscando pesajes:', err);
@@ -309,7 +315,7 @@ function GestionPesajes() {
       </div>
 
       {/* Paginación */}
-      {pagination.pages > 1 && (
+      {(pagination.page > 1 || pagination.hasMore) && (
         <div className="gestion-pagination">
           <button
             className="btn btn-secondary btn-sm"
@@ -319,11 +325,11 @@ function GestionPesajes() {
             ← Anterior
           </button>
           <span className="page-info">
-            Página {pagination.page} de {pagination.pages}
+            Página {pagination.page} de {Math.max(1, Math.ceil(pagination.total / 30))}
           </span>
           <button
             className="btn btn-secondary btn-sm"
-            disabled={pagination.page >= pagination.pages}
+            disabled={!pagination.hasMore}
             onClick={() => buscar(pagination.page + 1)}
           >
             Siguiente →
@@ -12,8 +12,8 @@ const api = axios.create({
 
 // ===== Pesajes =====
 export const pesajesApi = {
-  listar: (page = 1, perPage = 20) => 
-    api.get(`/pesajes?page=${page}&per_page=${perPage}`),
+  listar: (perPage = 20, cursor = null) => 
+    api.get('/pesajes', { params: { per_page: perPage, ...(cursor && { cursor }) } }),
   
   buscar: (filters = {}) => {
     const params = new URLSearchParams();
@@ -23,8 +23,9 @@ export const pesajesApi = {
     if (filters.nro_ot) params.append('nro_ot', filters.nro_ot);
     if (filters.fecha_inicio) params.append('fecha_inicio', filters.fecha_inicio);
     if (filters.fecha_fin) params.append('fecha_fin', filters.fecha_fin);
-    if (filters.page) params.append('page', filters.page);
+    if (filters.cursor) params.append('cursor', filters.cursor);
     if (filters.per_page) params.append('per_page', filters.per_page);
+    if (filters.incluir_total) params.append('incluir_total', '1');
     return api.get(`/pesajes/buscar?${params.toString()}`);
   },
 
@@ -58,17 +59,28 @@ export const pesajesApi = {
   marcarSincronizado: (ids) => 
     api.post('/pesajes/marcar-sincronizado', { ids }),
     
-  exportarExcel: (fechaInicio, fechaFin) => {
+  exportarExcel: (fechaInicio, fechaFin, formato = 'xlsx') => {
     let url = '/pesajes/exportar';
     const params = new URLSearchParams();
     if (fechaInicio) params.append('fecha_inicio', fechaInicio);
     if (fechaFin) params.append('fecha_fin', fechaFin);
+    if (formato && formato !== 'xlsx') params.append('formato', formato);
     
     const qs = params.toString();
     if (qs) url += `?${qs}`;
     
     return api.get(url, { responseType: 'blob' });
-  }
+  },
+
+  // Exportación en segundo plano: avance por el evento Socket.IO 'export_progress'
+  crearExportacion: (fechaInicio, fechaFin, formato = 'xlsx') =>
+    api.post('/pesajes/exportar/jobs', {
+      formato,
+      fecha_inicio: fechaInicio || null,
+      fecha_fin: fechaFin || null
+    }),
+  estadoExportacion: (jobId) => api.get(`/pesajes/exportar/jobs/${jobId}`),
+  urlDescargaExportacion: (jobId) => `${API_BASE}/pesajes/exportar/jobs/${jobId}/descarga`
 };
 
 // ===== Balanza =====
@@ -131,7 +143,11 @@ export const ordenTrabajoApi = {
 // ===== Avance Local =====
 export const avanceApi = {
   resumen: () =>
-    api.get('/avance/resumen')
+    api.get('/avance/resumen'),
+
+  // Pesajes de un grupo molde → color (se piden al expandirlo)
+  pesajes: (molde, color) =>
+    api.get('/avance/pesajes', { params: { molde, color } })
 };
 
 // ===== OPs (Cerrar/Reabrir) =====
@@ -13,6 +13,8 @@ const socket = io(SOCKET_URL, {
 
 socket.on('connect', () => {
   console.log('[WS] ✅ Conectado al servidor');
+  // Pesos de la estación por defecto: 'peso_estable' y, con raw, las lecturas crudas ('peso')
+  socket.emit('suscribir_estacion', { raw: true });
 });
 
 socket.on('disconnect', (reason) => {